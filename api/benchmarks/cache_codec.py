@@ -0,0 +1,94 @@
+"""
+Encode/decode time and size of cached analysis payloads: legacy json.dumps text vs the
+PayloadCodec variants available in this environment. With --redis, also writes 1000 entries
+per variant and reports Redis MEMORY USAGE.
+
+    python benchmarks/cache_codec.py
+    REDIS_URL=redis://localhost:6379/15 python benchmarks/cache_codec.py --redis
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import codec as codec_module  # noqa: E402
+from utils.codec import PayloadCodec  # noqa: E402
+from benchmarks.payloads import analysis_payload  # noqa: E402
+
+
+class LegacyJSON:
+    def encode(self, data):
+        return json.dumps(data, default=str).encode()
+
+    def decode(self, raw):
+        return json.loads(raw)
+
+
+def variants():
+    yield "json text (before)", LegacyJSON()
+    serializers = [("json", codec_module.SERIALIZER_JSON)]
+    if codec_module.orjson:
+        serializers.append(("orjson", codec_module.SERIALIZER_ORJSON))
+    if codec_module.msgpack:
+        serializers.append(("msgpack", codec_module.SERIALIZER_MSGPACK))
+    compressions = [("none", None), ("zlib", codec_module.COMPRESSION_ZLIB)]
+    if codec_module.zstandard:
+        compressions.append(("zstd", codec_module.COMPRESSION_ZSTD))
+    for s_name, serializer in serializers:
+        for c_name, compression in compressions:
+            codec = PayloadCodec(compression_threshold=1 << 30 if compression is None else 1024)
+            codec.serializer = serializer
+            if compression is not None:
+                codec.compression = compression
+            yield f"{s_name}+{c_name}", codec
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--payloads", type=int, default=500)
+    parser.add_argument("--redis", action="store_true")
+    args = parser.parse_args()
+
+    random.seed(11)
+    payloads = [analysis_payload(i) for i in range(args.payloads)]
+    client = None
+    if args.redis:
+        import redis
+        from config import REDIS_URL
+        client = redis.from_url(REDIS_URL)
+
+    print(f"{'variant':>20} | {'avg bytes':>9} | {'ratio':>5} | {'encode':>9} | {'decode':>9}" + (" | redis mem/entry" if client else ""))
+    baseline = None
+    for name, codec in variants():
+        encoded, encode_times, decode_times = [], [], []
+        for payload in payloads:
+            started = time.perf_counter()
+            raw = codec.encode(payload)
+            encode_times.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            codec.decode(raw)
+            decode_times.append(time.perf_counter() - started)
+            encoded.append(raw)
+
+        size = statistics.mean(len(raw) for raw in encoded)
+        baseline = baseline or size
+        line = (f"{name:>20} | {size:9.0f} | {baseline / size:5.2f} | "
+                f"{statistics.mean(encode_times) * 1e6:7.1f}us | {statistics.mean(decode_times) * 1e6:7.1f}us")
+        if client:
+            client.flushdb()
+            for i, raw in enumerate(encoded[:1000]):
+                client.set(f"bench:{i}", raw)
+            usage = statistics.mean(client.memory_usage(f"bench:{i}") for i in range(min(len(encoded), 1000)))
+            line += f" | {usage:9.0f} B"
+        print(line)
+
+    if client:
+        client.flushdb()
+
+
+if __name__ == "__main__":
+    main()
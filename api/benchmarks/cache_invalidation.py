@@ -0,0 +1,110 @@
+"""
+Invalidation cost on a large keyspace: KEYS (old RedisService.invalidate) vs incremental
+SCAN vs tag sets. A probe coroutine PINGs Redis every 10ms from a separate connection to
+show how long other clients are blocked. Then, with Redis "down", fills the in-memory
+fallback with many tagged entries to show its tag index stays as small as the cache.
+
+Use a throwaway Redis (the benchmark FLUSHes the selected DB):
+
+    REDIS_URL=redis://localhost:6379/15 python benchmarks/cache_invalidation.py --keys 2000000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import redis.asyncio as aioredis
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import REDIS_URL  # noqa: E402
+from services.redis_service import redis_service  # noqa: E402
+from utils.cache_keys import cache_tag  # noqa: E402
+
+LOAD_BATCH = 10000
+
+
+async def load(client, total: int, tagged_user: str, tagged_every: int):
+    """Fill the keyspace; every Nth key belongs to one user and is tagged with it"""
+    tag_key = f"tag:{cache_tag('user', tagged_user)}"
+    for start in range(0, total, LOAD_BATCH):
+        async with client.pipeline(transaction=False) as pipe:
+            for i in range(start, min(start + LOAD_BATCH, total)):
+                if i % tagged_every == 0:
+                    key = f"analysis:{tagged_user}:{i}"
+                    pipe.sadd(tag_key, key)
+                else:
+                    key = f"analysis:other:{i}"
+                pipe.set(key, "x" * 64)
+            await pipe.execute()
+
+
+async def probe(client, stop: asyncio.Event, samples: list):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.ping()
+        samples.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(0.01)
+
+
+async def timed(name: str, probe_client, operation):
+    samples: list = []
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(probe_client, stop, samples))
+    started = time.perf_counter()
+    deleted = await operation()
+    elapsed = (time.perf_counter() - started) * 1000
+    stop.set()
+    await probe_task
+    print(f"{name:>6}: deleted {deleted:>7} keys in {elapsed:9.1f}ms | other clients blocked up to {max(samples or [0]):8.1f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--keys", type=int, default=2_000_000)
+    parser.add_argument("--tagged-every", type=int, default=1000)
+    parser.add_argument("--fallback-keys", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    client = aioredis.from_url(REDIS_URL, decode_responses=True, socket_timeout=None)
+    probe_client = aioredis.from_url(REDIS_URL, decode_responses=True, socket_timeout=None)
+    await redis_service.connect()
+    # RedisService expects binary replies (see its connection pool)
+    redis_service.redis_client = aioredis.from_url(REDIS_URL, socket_timeout=None)
+
+    async def keys_invalidate():
+        keys = await client.keys("analysis:bench-user:*")
+        return await client.delete(*keys) if keys else 0
+
+    for name, operation in [
+        ("KEYS", keys_invalidate),
+        ("SCAN", lambda: redis_service.invalidate("analysis:bench-user:*")),
+        ("tags", lambda: redis_service.invalidate_tags(cache_tag("user", "bench-user"))),
+    ]:
+        await client.flushdb()
+        print(f"loading {args.keys} keys...", end=" ", flush=True)
+        await load(client, args.keys, "bench-user", args.tagged_every)
+        print(f"{await client.dbsize()} in DB")
+        await timed(name, probe_client, operation)
+
+    await client.flushdb()
+    await redis_service.close()
+    await fallback_tags(args.fallback_keys)
+
+
+async def fallback_tags(total: int):
+    """Tagged writes while Redis is down: evicted entries must leave the tag index too"""
+    redis_service.redis_client = None
+    started = time.perf_counter()
+    for i in range(total):
+        await redis_service.set_cached(f"analysis:fallback:{i}", {"i": i}, 3600,
+                                       tags=[cache_tag("user", f"u{i % 1000}"), cache_tag("analysis", str(i))])
+    elapsed = time.perf_counter() - started
+    cache = redis_service._memory_cache
+    indexed = sum(len(keys) for keys in redis_service._memory_tags.values())
+    print(f"fallback: {total} tagged sets in {elapsed:.1f}s | {len(cache)} entries cached, "
+          f"{cache.evictions} evicted | tag index: {len(redis_service._memory_tags)} tags, {indexed} keys")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,79 @@
+"""
+Time-to-first-token for the live interview WebSocket under many concurrent sessions.
+
+Run the API locally (Firebase unset so the test user is used), create an interview for
+that user, then:
+
+    python benchmarks/followup_ttft.py --interview-id <uuid> --sessions 50 --turns 3
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import websockets
+
+UTTERANCES = [
+    "I designed the caching layer in front of our Postgres database using Redis.",
+    "We used consistent hashing so nodes could be added without a full reshuffle.",
+    "The hardest part was invalidation when users updated their profiles.",
+]
+
+
+async def run_session(url: str, turns: int, ttfts: list, totals: list, errors: list):
+    try:
+        async with websockets.connect(url) as ws:
+            for turn in range(turns):
+                started = time.perf_counter()
+                first = None
+                await ws.send(json.dumps({"type": "utterance", "text": UTTERANCES[turn % len(UTTERANCES)]}))
+                while True:
+                    message = json.loads(await ws.recv())
+                    if message["type"] == "token" and first is None:
+                        first = time.perf_counter()
+                        ttfts.append((first - started) * 1000)
+                    elif message["type"] == "followup":
+                        totals.append((time.perf_counter() - started) * 1000)
+                        break
+                    elif message["type"] == "error":
+                        errors.append(message.get("detail"))
+                        return
+    except Exception as e:
+        errors.append(str(e))
+
+
+def summarize(name: str, samples: list):
+    if not samples:
+        print(f"{name}: no samples")
+        return
+    ordered = sorted(samples)
+    p95 = ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)]
+    print(f"{name}: n={len(samples)} p50={statistics.median(samples):.0f}ms p95={p95:.0f}ms max={ordered[-1]:.0f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="ws://localhost:8000")
+    parser.add_argument("--interview-id", required=True)
+    parser.add_argument("--token", default="test-token")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=3)
+    args = parser.parse_args()
+
+    url = f"{args.url}/ws/interview/{args.interview_id}?token={args.token}"
+    ttfts, totals, errors = [], [], []
+
+    started = time.perf_counter()
+    await asyncio.gather(*(run_session(url, args.turns, ttfts, totals, errors) for _ in range(args.sessions)))
+    elapsed = time.perf_counter() - started
+
+    print(f"{args.sessions} sessions x {args.turns} turns in {elapsed:.1f}s, {len(errors)} errors")
+    summarize("time to first token", ttfts)
+    summarize("full follow-up", totals)
+    if errors:
+        print("first error:", errors[0])
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,52 @@
+"""
+Memory growth of the in-process fallback cache: the old unbounded dict vs TTLLRUCache.
+
+Simulates a long-running worker caching many distinct analysis payloads:
+
+    python benchmarks/memory_cache.py --entries 20000 --budget-mb 64
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.memory_cache import TTLLRUCache  # noqa: E402
+from benchmarks.payloads import analysis_payload  # noqa: E402
+
+
+def measure(name: str, store, entries: int, payloads: list):
+    tracemalloc.start()
+    started = time.perf_counter()
+    for i in range(entries):
+        # Fresh objects per entry, as if each had just been deserialized
+        store(f"analysis:{i}", json.loads(payloads[i % len(payloads)]))
+    elapsed = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:>22}: {entries / elapsed:9.0f} sets/s | retained {current / 2**20:8.1f} MiB | peak {peak / 2**20:8.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=20000)
+    parser.add_argument("--budget-mb", type=int, default=64)
+    args = parser.parse_args()
+
+    random.seed(7)
+    payloads = [json.dumps(analysis_payload(i)) for i in range(200)]
+
+    unbounded = {}
+    measure("dict (before)", lambda k, v: unbounded.__setitem__(k, v), args.entries, payloads)
+    del unbounded
+
+    cache = TTLLRUCache(args.budget_mb * 2**20)
+    measure(f"TTLLRUCache {args.budget_mb}MiB", lambda k, v: cache.set(k, v, 3600), args.entries, payloads)
+    print("cache stats:", cache.stats())
+
+
+if __name__ == "__main__":
+    main()
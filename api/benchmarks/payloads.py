@@ -0,0 +1,42 @@
+# Synthetic but realistically shaped analysis payloads for benchmarks
+import random
+
+VOCABULARY = (
+    "experience building scalable distributed systems python react node kubernetes docker aws "
+    "design team led improved performance reduced latency migrated service api database postgres "
+    "redis caching microservices testing ci cd pipeline ownership mentoring stakeholders delivered "
+    "product features customers metrics reliability monitoring on-call incident architecture strong "
+    "candidate should deepen knowledge of system design interview practice recommended projects role "
+    "company culture values collaboration fast-paced startup senior engineer requirements preferred"
+).split()
+
+
+def words(n: int) -> str:
+    return " ".join(random.choice(VOCABULARY) for _ in range(n))
+
+
+def analysis_payload(i: int) -> dict:
+    """A full analysis as cached by the API: synthesis plus resume/job sub-analyses"""
+    return {
+        "analysis_id": f"analysis-{i}",
+        "user_id": f"user-{i % 97}",
+        "match_score": random.randint(30, 95),
+        "summary": words(120),
+        "strengths": [words(8) for _ in range(6)],
+        "skill_gaps": [words(6) for _ in range(6)],
+        "recommendations": [words(20) for _ in range(5)],
+        "interview_focus_areas": [words(5) for _ in range(5)],
+        "resume_analysis": {
+            "skills": [words(1) for _ in range(30)],
+            "experience_summary": words(200),
+            "match_details": {"required_matched": [words(2) for _ in range(8)], "missing": [words(2) for _ in range(4)]},
+            "projects_relevance": words(80),
+        },
+        "job_analysis": {
+            "required_skills": [words(1) for _ in range(20)],
+            "preferred_skills": [words(1) for _ in range(10)],
+            "company_culture": {"values": [words(2) for _ in range(5)], "work_style": words(30)},
+            "summary": words(150),
+        },
+        "created_at": "2025-01-01T12:00:00",
+    }
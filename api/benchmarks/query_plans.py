@@ -0,0 +1,180 @@
+"""
+EXPLAIN ANALYZE timings for every query SupabaseService issues (as the SQL PostgREST runs for
+it), on millions of synthetic rows, before and after migrations/0002_indexes.sql.
+
+Needs a throwaway local Postgres; everything is created in a `bench` schema that is dropped
+first:
+
+    DATABASE_URL=postgresql://postgres@localhost/postgres python benchmarks/query_plans.py \\
+        --users 20000 --analyses 1000000
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+import asyncpg
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from migrate import load_migrations, split_statements  # noqa: E402
+
+RUNS = 5
+
+# name -> (sql, param names); params are resolved from a heavy user's data in pick_params()
+QUERIES = {
+    "get_user": ("SELECT * FROM users WHERE firebase_uid = $1 LIMIT 1", ["firebase_uid"]),
+    "get_analysis": ("SELECT * FROM analyses WHERE id = $1", ["analysis_id"]),
+    "get_interview": ("SELECT * FROM interviews WHERE id = $1", ["interview_id"]),
+    "get_interview_questions": (
+        "SELECT * FROM questions WHERE interview_id = $1 ORDER BY order_index", ["interview_id"]),
+    "get_interview_responses": (
+        "SELECT r.*, q.interview_id, q.content, q.order_index FROM responses r "
+        "JOIN questions q ON q.id = r.question_id WHERE q.interview_id = $1 ORDER BY r.created_at", ["interview_id"]),
+    "get_user_analyses (first page)": (
+        "SELECT id, created_at, status, match_score, job_title, company FROM analyses "
+        "WHERE user_id = $1 ORDER BY created_at DESC, id DESC LIMIT 21", ["user_id"]),
+    "get_user_analyses (deep page)": (
+        "SELECT id, created_at, status, match_score, job_title, company FROM analyses "
+        "WHERE user_id = $1 AND (created_at < $2 OR (created_at = $2 AND id < $3)) "
+        "ORDER BY created_at DESC, id DESC LIMIT 21", ["user_id", "cursor_created_at", "cursor_id"]),
+    "get_user_interviews": (
+        "SELECT id, analysis_id, created_at, status, overall_score FROM interviews "
+        "WHERE user_id = $1 ORDER BY created_at DESC, id DESC LIMIT 6", ["user_id"]),
+    "get_analysis_interviews": (
+        "SELECT * FROM interviews WHERE analysis_id = $1 ORDER BY created_at DESC", ["analysis_id"]),
+    "get_analysis_detail": (
+        "SELECT a.*, (SELECT json_agg(i ORDER BY i.created_at DESC) FROM interviews i WHERE i.analysis_id = a.id), "
+        "(SELECT u.firebase_uid FROM users u WHERE u.id = a.user_id) FROM analyses a WHERE a.id = $1", ["analysis_id"]),
+    "get_interview_detail": (
+        "SELECT i.*, (SELECT json_agg(q ORDER BY q.order_index) FROM questions q WHERE q.interview_id = i.id), "
+        "(SELECT u.firebase_uid FROM users u WHERE u.id = i.user_id) FROM interviews i WHERE i.id = $1", ["interview_id"]),
+    "get_user_stats": ("SELECT * FROM user_stats WHERE user_id = $1", ["user_id"]),
+    "update_interview": ("UPDATE interviews SET status = 'completed' WHERE id = $1", ["interview_id"]),
+}
+
+
+async def load(conn, users: int, analyses: int, questions: int):
+    # The user_stats triggers stay on, so get_user_stats reads real aggregates (and the load
+    # time includes their cost, as production writes do)
+    started = time.perf_counter()
+    await conn.execute(f"""
+        INSERT INTO users (email, firebase_uid)
+        SELECT 'user' || g || '@bench.test', 'uid-' || g FROM generate_series(1, {users}) g
+    """)
+    # Skewed ownership: a few users with very long histories
+    await conn.execute(f"""
+        WITH u AS (SELECT array_agg(id ORDER BY firebase_uid) AS ids FROM users)
+        INSERT INTO analyses (user_id, job_description, resume_text, status, match_score, job_title, company,
+                              synthesis_result, created_at)
+        SELECT u.ids[1 + floor({users} * power(random(), 3))::int], repeat('job description ', 200),
+               repeat('resume line ', 300), 'completed', (random() * 100)::int, 'Engineer', 'Acme',
+               jsonb_build_object('summary', repeat('x', 2000), 'skill_gaps', jsonb_build_array('k8s', 'go')),
+               NOW() - random() * INTERVAL '730 days'
+        FROM generate_series(1, {analyses}) g, u
+    """)
+    await conn.execute("""
+        INSERT INTO interviews (user_id, analysis_id, status, overall_score, created_at)
+        SELECT user_id, id, 'completed', (random() * 100)::int, created_at + INTERVAL '1 hour' FROM analyses
+    """)
+    await conn.execute(f"""
+        INSERT INTO questions (interview_id, content, order_index, created_at)
+        SELECT i.id, 'Question ' || k, k, i.created_at FROM interviews i, generate_series(0, {questions - 1}) k
+    """)
+    await conn.execute("""
+        INSERT INTO responses (question_id, transcript, feedback, created_at)
+        SELECT id, 'An answer', '{"score": 7}'::jsonb, created_at + INTERVAL '1 minute' FROM questions
+    """)
+    await conn.execute("ANALYZE")
+    counts = await conn.fetchrow("""
+        SELECT (SELECT count(*) FROM analyses) a, (SELECT count(*) FROM interviews) i,
+               (SELECT count(*) FROM questions) q, (SELECT count(*) FROM responses) r,
+               (SELECT count(*) FROM user_stats) user_stats
+    """)
+    print(f"loaded {dict(counts)} in {time.perf_counter() - started:.0f}s")
+
+
+async def pick_params(conn) -> dict:
+    user_id, = await conn.fetchrow("SELECT user_id FROM analyses GROUP BY user_id ORDER BY count(*) DESC LIMIT 1")
+    rows = await conn.fetch(
+        "SELECT id, created_at FROM analyses WHERE user_id = $1 ORDER BY created_at DESC, id DESC", user_id)
+    middle = rows[len(rows) // 2]
+    interview_id, = await conn.fetchrow("SELECT id FROM interviews WHERE analysis_id = $1", middle["id"])
+    firebase_uid, = await conn.fetchrow("SELECT firebase_uid FROM users WHERE id = $1", user_id)
+    print(f"heaviest user has {len(rows)} analyses")
+    return {
+        "user_id": user_id,
+        "firebase_uid": firebase_uid,
+        "analysis_id": middle["id"],
+        "interview_id": interview_id,
+        "cursor_created_at": middle["created_at"],
+        "cursor_id": middle["id"],
+    }
+
+
+async def explain(conn, sql: str, args: list) -> tuple:
+    """Median execution time (ms) over RUNS and the top plan node"""
+    times, node = [], None
+    for _ in range(RUNS):
+        # Writes are measured inside a rolled-back transaction
+        tx = conn.transaction()
+        await tx.start()
+        try:
+            raw = await conn.fetchval(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}", *args)
+        finally:
+            await tx.rollback()
+        plan = json.loads(raw)[0]
+        times.append(plan["Execution Time"])
+        node = plan["Plan"]
+        while node.get("Plans") and node["Node Type"] in ("Limit", "Sort", "Aggregate", "ModifyTable"):
+            node = node["Plans"][0]
+    label = node["Node Type"] + (f" on {node['Index Name']}" if node.get("Index Name") else "")
+    return statistics.median(times), label
+
+
+async def run_all(conn, params: dict) -> dict:
+    results = {}
+    for name, (sql, names) in QUERIES.items():
+        results[name] = await explain(conn, sql, [params[n] for n in names])
+    return results
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--analyses", type=int, default=1_000_000)
+    parser.add_argument("--questions", type=int, default=5, help="questions per interview")
+    args = parser.parse_args()
+    if not args.database_url:
+        sys.exit("DATABASE_URL is not set")
+
+    conn = await asyncpg.connect(args.database_url)
+    await conn.execute("DROP SCHEMA IF EXISTS bench CASCADE; CREATE SCHEMA bench")
+    await conn.execute("SET search_path TO bench, public")
+
+    initial, indexes = load_migrations()[:2]
+    await conn.execute(initial.sql)
+    await load(conn, args.users, args.analyses, args.questions)
+    params = await pick_params(conn)
+
+    before = await run_all(conn, params)
+    started = time.perf_counter()
+    for statement in split_statements(indexes.sql):
+        await conn.execute(statement)
+    await conn.execute("ANALYZE")
+    print(f"built {indexes.name} in {time.perf_counter() - started:.0f}s\n")
+    after = await run_all(conn, params)
+
+    print(f"{'query':>32} | {'before':>10} | {'after':>10} | plan after")
+    for name in QUERIES:
+        print(f"{name:>32} | {before[name][0]:8.2f}ms | {after[name][0]:8.2f}ms | {after[name][1]}")
+
+    await conn.execute("DROP SCHEMA bench CASCADE")
+    await conn.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
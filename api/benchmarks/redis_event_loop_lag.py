@@ -0,0 +1,89 @@
+"""
+Event-loop lag and throughput of cache reads: blocking redis client inside async code
+(the old RedisService) vs the pooled asyncio client.
+
+Requires a running Redis (REDIS_URL, default redis://localhost:6379):
+
+    python benchmarks/redis_event_loop_lag.py --concurrency 200 --requests 20000
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+import redis
+import redis.asyncio as aioredis
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import REDIS_URL  # noqa: E402
+
+PAYLOAD = json.dumps({"match_score": 82, "skill_gaps": ["kubernetes"] * 20, "summary": "x" * 2000})
+
+
+async def monitor_lag(samples: list, stop: asyncio.Event, interval: float = 0.005):
+    """Measure how late a periodic timer fires; blocking calls show up as lag"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append((time.perf_counter() - started - interval) * 1000)
+
+
+async def run(name: str, get, concurrency: int, total: int):
+    lag: list = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(monitor_lag(lag, stop))
+    remaining = total
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await get("bench:payload")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await monitor
+
+    ordered = sorted(lag) or [0.0]
+    # A fully blocked loop yields a single sample spanning the whole run
+    print(
+        f"{name:>14}: {total / elapsed:8.0f} ops/s | loop lag p50={statistics.median(ordered):6.2f}ms "
+        f"p99={ordered[int(len(ordered) * 0.99) - 1]:7.2f}ms max={ordered[-1]:7.2f}ms (n={len(lag)})"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--pool-size", type=int, default=50)
+    args = parser.parse_args()
+
+    sync_client = redis.from_url(REDIS_URL, decode_responses=True)
+    sync_client.set("bench:payload", PAYLOAD)
+
+    async def sync_get(key):
+        # What RedisService did before: a blocking call inside an async method
+        return json.loads(sync_client.get(key))
+
+    pool = aioredis.BlockingConnectionPool.from_url(REDIS_URL, decode_responses=True, max_connections=args.pool_size)
+    async_client = aioredis.Redis(connection_pool=pool)
+
+    async def async_get(key):
+        return json.loads(await async_client.get(key))
+
+    print(f"{args.requests} GETs, {args.concurrency} concurrent callers")
+    await run("blocking", sync_get, args.concurrency, args.requests)
+    await run("asyncio pool", async_get, args.concurrency, args.requests)
+
+    sync_client.delete("bench:payload")
+    await pool.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,106 @@
+"""
+Concurrent request throughput on one worker: blocking PostgREST calls inside async handlers
+(the old supabase-py based SupabaseService) vs the pooled httpx.AsyncClient service.
+
+Runs against a local PostgREST-compatible stand-in that answers every query after a fixed
+latency, so no Supabase project is needed:
+
+    python benchmarks/supabase_concurrency.py --concurrency 100 --requests 2000 --latency-ms 20
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+USER_ROW = {"id": "7f1c2d9e-0000-4000-8000-000000000001", "firebase_uid": "bench-user", "email": "bench@example.com"}
+
+
+def serve_stand_in(latency: float, port) -> None:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like PostgREST
+        disable_nagle_algorithm = True
+        def do_GET(self):
+            time.sleep(latency)
+            body = json.dumps([USER_ROW]).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    ThreadingHTTPServer.daemon_threads = True
+    ThreadingHTTPServer.request_queue_size = 1024
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    port.value = server.server_address[1]
+    server.serve_forever()
+
+
+def start_stand_in(latency: float):
+    """Run the stand-in in its own process so it doesn't compete for this process's GIL"""
+    port = multiprocessing.Value("i", 0)
+    process = multiprocessing.Process(target=serve_stand_in, args=(latency, port), daemon=True)
+    process.start()
+    while not port.value:
+        time.sleep(0.01)
+    return process, port.value
+
+
+async def run(name: str, get_user, concurrency: int, total: int):
+    remaining = total
+
+    async def handler():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            assert await get_user("bench-user")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(handler() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    print(f"{name:>16}: {total / elapsed:8.0f} req/s | {elapsed * 1000 / total * concurrency:7.1f}ms avg per request")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    server, port = start_stand_in(args.latency_ms / 1000)
+    url = f"http://127.0.0.1:{port}"
+    os.environ.update({"SUPABASE_URL": url, "SUPABASE_KEY": "bench-key"})
+    os.environ.setdefault("SUPABASE_POOL_SIZE", str(args.concurrency))
+    from services.supabase_service import SupabaseService  # noqa: E402 - reads the env above
+
+    # What SupabaseService did before: supabase-py's sync httpx client called from async code
+    sync_client = httpx.Client(base_url=f"{url}/rest/v1", headers={"apikey": "bench-key"})
+
+    async def blocking_get_user(firebase_uid):
+        response = sync_client.get("/users", params={"select": "*", "firebase_uid": f"eq.{firebase_uid}"})
+        return response.json()[0]
+
+    service = SupabaseService()
+
+    print(f"{args.requests} get_user calls, {args.concurrency} concurrent handlers, {args.latency_ms:.0f}ms DB latency")
+    await run("blocking (before)", blocking_get_user, args.concurrency, min(args.requests, 200))
+    await run("async (after)", service.get_user, args.concurrency, args.requests)
+
+    sync_client.close()
+    await service.close()
+    server.terminate()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
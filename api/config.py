@@ -12,17 +12,94 @@ GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 GEMINI_MODEL = "gemini-2.0-flash-exp"
 HF_MODEL = "meta-llama/Llama-3.2-3B-Instruct"
 GROQ_MODEL = "llama-3.3-70b-versatile"
+PROMPT_VERSION = os.getenv("PROMPT_VERSION", "v1")  # bump to invalidate LLM outputs tagged with the old version
 
 # Redis Configuration
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+REDIS_POOL_SIZE = int(os.getenv("REDIS_POOL_SIZE", "50"))  # max connections per worker
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", "2"))  # seconds to wait for a free connection
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "1"))
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", "1"))
+# Connection supervisor: health-check while connected, reprobe with exponential backoff while not
+REDIS_HEALTH_CHECK_INTERVAL = float(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "5"))
+REDIS_FAILURE_THRESHOLD = int(os.getenv("REDIS_FAILURE_THRESHOLD", "2"))  # failed pings before falling back
+REDIS_REPROBE_MIN_DELAY = float(os.getenv("REDIS_REPROBE_MIN_DELAY", "1"))
+REDIS_REPROBE_MAX_DELAY = float(os.getenv("REDIS_REPROBE_MAX_DELAY", "30"))
+REDIS_WARM_ON_RECOVERY = os.getenv("REDIS_WARM_ON_RECOVERY", "true").lower() == "true"  # copy fallback entries into Redis
+
+# Direct Postgres connection (Supabase "connection string"), used by migrate.py
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+# Persistence backend: "supabase" (PostgREST over HTTP) or "postgres" (asyncpg straight to DATABASE_URL,
+# e.g. a local database for offline benchmarks, or one co-located with the API)
+DATABASE_BACKEND = os.getenv("DATABASE_BACKEND", "supabase").lower()
+DATABASE_POOL_SIZE = int(os.getenv("DATABASE_POOL_SIZE", "20"))  # max connections per worker (postgres backend)
+DATABASE_TIMEOUT = float(os.getenv("DATABASE_TIMEOUT", "5"))  # per statement
+
+# Supabase (PostgREST over a pooled async HTTP client)
+SUPABASE_POOL_SIZE = int(os.getenv("SUPABASE_POOL_SIZE", "20"))  # max connections per worker
+SUPABASE_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", "5"))  # per call
+SUPABASE_CONNECT_TIMEOUT = float(os.getenv("SUPABASE_CONNECT_TIMEOUT", "2"))
+
+# Write-behind outbox for completed analyses (Redis hash, flushed to Supabase in batches)
+ANALYSIS_OUTBOX_FLUSH_INTERVAL = float(os.getenv("ANALYSIS_OUTBOX_FLUSH_INTERVAL", "1"))  # seconds
+ANALYSIS_OUTBOX_BATCH_SIZE = int(os.getenv("ANALYSIS_OUTBOX_BATCH_SIZE", "50"))
+ANALYSIS_OUTBOX_MAX_BACKOFF = float(os.getenv("ANALYSIS_OUTBOX_MAX_BACKOFF", "60"))  # seconds
 
 # Rate Limiting
-RATE_LIMIT_PER_USER = "5/day"  # 5 analyses per user per day
-RATE_LIMIT_GLOBAL = "100/hour"  # Global API protection
+RATE_LIMIT_PER_USER = os.getenv("RATE_LIMIT_PER_USER", "5/day")  # 5 analyses per user per day
+RATE_LIMIT_GLOBAL = os.getenv("RATE_LIMIT_GLOBAL", "100/hour")  # Global API protection
+# Global limit is enforced from per-worker token buckets leased out of a shared Redis budget
+RATE_LIMIT_LEASE_FRACTION = int(os.getenv("RATE_LIMIT_LEASE_FRACTION", "20"))  # lease limit/N tokens at a time
+RATE_LIMIT_RECONCILE_INTERVAL = float(os.getenv("RATE_LIMIT_RECONCILE_INTERVAL", "1"))  # seconds
+RATE_LIMIT_LEASE_TIMEOUT = float(os.getenv("RATE_LIMIT_LEASE_TIMEOUT", "0.1"))  # seconds a request waits for a lease before falling back
+# Splits the global limit while Redis is down; set to the worker count across all instances
+RATE_LIMIT_WORKERS = int(os.getenv("RATE_LIMIT_WORKERS", os.getenv("WEB_CONCURRENCY", "4")))
 
 # Cache TTL (in seconds)
 CACHE_TTL_ANALYSIS = 3600 * 24  # 24 hours
 CACHE_TTL_INTERVIEW = 3600 * 2  # 2 hours
+CACHE_TTL_USER = 3600 * 24  # firebase_uid -> user row; effectively immutable
+
+# Stale-while-revalidate: past the soft TTL an entry is still served while one worker refreshes it;
+# the Redis TTL is the hard limit, after which it is recomputed inline
+CACHE_SOFT_TTL_ANALYSIS = int(os.getenv("CACHE_SOFT_TTL_ANALYSIS", str(3600 * 6)))
+CACHE_REFRESH_LOCK_TTL = int(os.getenv("CACHE_REFRESH_LOCK_TTL", "300"))  # longer than a full LLM pipeline
+CACHE_MISS_WAIT = float(os.getenv("CACHE_MISS_WAIT", "60"))  # max wait for another worker's recompute
+
+# Cached payloads above this size (bytes) are compressed (zstd if installed, else zlib)
+CACHE_COMPRESSION_THRESHOLD = int(os.getenv("CACHE_COMPRESSION_THRESHOLD", "1024"))
+
+# In-process fallback cache budget (serialized bytes), used while Redis is unavailable
+MEMORY_CACHE_MAX_BYTES = int(os.getenv("MEMORY_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Per-process L1 cache in front of Redis, invalidated across workers via pub/sub
+L1_CACHE_MAX_BYTES = int(os.getenv("L1_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+L1_CACHE_TTLS = {  # key prefix -> L1 TTL in seconds; prefixes not listed skip L1
+    "analysis": 300,
+    "interview_context": 60,
+    "user": 600,
+}
+
+# Interview Question Bank
+INTERVIEW_QUESTION_COUNT = 5
+QUESTION_BANK_MIN_PER_SKILL = int(os.getenv("QUESTION_BANK_MIN_PER_SKILL", "3"))  # coverage needed to skip the LLM
+QUESTION_BANK_MAX_PER_SKILL = int(os.getenv("QUESTION_BANK_MAX_PER_SKILL", "50"))
+QUESTION_BANK_TTL = 3600 * 24 * 30  # 30 days, refreshed on every write
+
+# Feedback Generation (map-reduce over long transcripts)
+FEEDBACK_CHUNK_CHARS = int(os.getenv("FEEDBACK_CHUNK_CHARS", "6000"))  # transcripts up to this size use one call
+FEEDBACK_MAP_CONCURRENCY = int(os.getenv("FEEDBACK_MAP_CONCURRENCY", "4"))
+
+# Follow-up Context Window (bounded prompts for live interviews)
+FOLLOWUP_WINDOW_TURNS = int(os.getenv("FOLLOWUP_WINDOW_TURNS", "6"))  # turns kept verbatim
+FOLLOWUP_MAX_TURN_CHARS = 600
+FOLLOWUP_MAX_SUMMARY_CHARS = 1200
+
+# Interview Question Prefetch (speculative generation after /analyze)
+INTERVIEW_PREFETCH_ENABLED = os.getenv("INTERVIEW_PREFETCH_ENABLED", "true").lower() == "true"
+INTERVIEW_PREFETCH_CONCURRENCY = int(os.getenv("INTERVIEW_PREFETCH_CONCURRENCY", "4"))
+INTERVIEW_PREFETCH_MAX_PENDING = int(os.getenv("INTERVIEW_PREFETCH_MAX_PENDING", "64"))
 
 # Firebase Configuration
 FIREBASE_PROJECT_ID = os.getenv("FIREBASE_PROJECT_ID")
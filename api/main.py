@@ -1,23 +1,32 @@
-from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, BackgroundTasks, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 import logging
 import traceback
 import json
-from typing import Dict, Any, Optional
+import time
+import asyncio
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
 from models import (
     AnalysisRequest, AnalysisResponse,
     InterviewRequest, InterviewResponse,
+    AnswerRequest, AnswerResponse,
     FollowupRequest, FollowupResponse,
     FeedbackRequest, FeedbackResponse
 )
-from middleware.rate_limiter import rate_limit, verify_firebase_token
-from services.langgraph_service import langgraph_service
+from middleware.rate_limiter import rate_limit, verify_firebase_token, verify_id_token, get_rate_limit_stats, close_rate_limiters
+from services.langgraph_service import langgraph_service, coerce_score
+from services.prefetch_service import interview_prefetch_service
+from services.redis_service import redis_service
+from services.context_window import context_window
+from utils.latency import LatencyRecorder
+from utils.cache_keys import CacheKeys, cache_tag
+from utils.pagination import encode_cursor, decode_cursor
 # from services.crew_service import crew_service
-from config import DEBUG
+from config import DEBUG, RATE_LIMIT_PER_USER, RATE_LIMIT_GLOBAL, CACHE_TTL_INTERVIEW
 import uuid
 
 # Configure logging
@@ -27,6 +36,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Time from receiving a candidate utterance to streaming the first follow-up token
+followup_ttft = LatencyRecorder()
+
 # Create FastAPI app
 app = FastAPI(
     title="Prepify.ai API",
@@ -45,6 +57,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def user_request_scope(request: Request, call_next):
+    # Memoizes firebase_uid -> user row across auth and the handler within one request
+    request_scope()
+    return await call_next(request)
+
+@app.on_event("startup")
+async def startup():
+    await redis_service.connect()
+    analysis_outbox.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await close_rate_limiters()
+    await analysis_outbox.stop()
+    await redis_service.close()
+    await supabase_service.close()
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -59,9 +89,26 @@ async def global_exception_handler(request: Request, exc: Exception):
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "service": "prepify-api"}
+    return {"status": "healthy", "service": "prepify-api", "redis": redis_service.connection_stats["state"]}
+
+# Metrics endpoint
+@app.get("/metrics")
+async def metrics():
+    """Performance counters; per worker, except interview_prefetch.fleet (summed in Redis)"""
+    return {
+        "interview_prefetch": await interview_prefetch_service.get_stats(),
+        "followup_ttft": followup_ttft.snapshot(),
+        "redis": redis_service.get_connection_stats(),
+        "cache": redis_service.get_cache_stats(),
+        "rate_limits": get_rate_limit_stats(),
+        "user_resolver": user_resolver.get_stats(),
+        "analysis_outbox": await analysis_outbox.get_stats()
+    }
 
 from services.supabase_service import supabase_service
+from services.repository import ANALYSIS_TEXT_FIELDS
+from services.user_resolver import user_resolver, request_scope
+from services.outbox_service import analysis_outbox
 
 # Auth sync endpoint
 class UserSyncRequest(BaseModel):
@@ -99,7 +146,7 @@ async def sync_user(
             picture = None
         
         # Check if user exists in Supabase
-        existing_user = await supabase_service.get_user(user_id)
+        existing_user = await user_resolver.resolve(user_id)
         
         if existing_user:
             logger.info(f"User already exists in Supabase: {user_id}")
@@ -112,7 +159,7 @@ async def sync_user(
         
         # Create new user in Supabase
         logger.info(f"Creating new user in Supabase: {user_id}")
-        new_user = await supabase_service.create_user({
+        new_user = await user_resolver.create_user({
             "firebase_uid": user_id,
             "email": email,
             "full_name": name,
@@ -138,8 +185,7 @@ async def sync_user(
 
 # Analysis endpoint
 @app.post("/analyze", response_model=AnalysisResponse, dependencies=[
-    Depends(rate_limit("5/day", per_user=True)),
-    Depends(rate_limit("100/hour", global_limit=True))
+    Depends(rate_limit(user_limit=RATE_LIMIT_PER_USER, global_limit=RATE_LIMIT_GLOBAL))
 ])
 async def analyze(
     request: AnalysisRequest,
@@ -159,7 +205,7 @@ async def analyze(
             raise HTTPException(status_code=400, detail="Job description is required")
             
         # Resolve Supabase User ID
-        supabase_user = await supabase_service.get_user(user_id)
+        supabase_user = await user_resolver.resolve(user_id)
         if not supabase_user:
             # Should have been created by middleware, but just in case
             raise HTTPException(status_code=404, detail="User not found in database")
@@ -184,15 +230,23 @@ async def analyze(
             "linkedin_url": request.social_profiles.get("linkedin", "") if request.social_profiles else "",
             "status": "completed",
             "match_score": final_report.get("match_score", 0),
+            # Denormalized for list views, which don't read synthesis_result
+            "job_title": final_report.get("position_title"),
+            "company": final_report.get("company_name"),
             "synthesis_result": final_report
         }
         
-        saved_analysis = await supabase_service.create_analysis(analysis_data)
-        if not saved_analysis:
-             raise HTTPException(status_code=500, detail="Failed to save analysis to database")
-        
+        # Write-behind: the row is durable in the outbox and reaches Supabase in the background
+        saved_analysis = await analysis_outbox.enqueue(analysis_data)
         analysis_id = saved_analysis['id']
         
+        # Start generating interview questions before the user asks for them
+        interview_prefetch_service.schedule(
+            analysis_id,
+            final_report.get("skill_gaps", []),
+            final_report.get("interview_focus_areas", [])
+        )
+        
         response = AnalysisResponse(
             analysis_id=analysis_id,
             match_score=final_report.get("match_score", 0.0),
@@ -224,13 +278,15 @@ async def generate_interview(
         logger.info(f"Generating interview for user {user_id}, analysis_id: {request.analysis_id}")
         
         # Resolve Supabase User ID
-        supabase_user = await supabase_service.get_user(user_id)
+        supabase_user = await user_resolver.resolve(user_id)
         if not supabase_user:
             raise HTTPException(status_code=404, detail="User not found")
         db_user_id = supabase_user['id']
         
-        # Get analysis from Supabase
+        # Get analysis from Supabase, or from the outbox if it hasn't been flushed yet
         analysis = await supabase_service.get_analysis(request.analysis_id)
+        if not analysis:
+            analysis = await analysis_outbox.get(request.analysis_id)
         
         if not analysis:
             raise HTTPException(status_code=404, detail="Analysis not found")
@@ -238,38 +294,34 @@ async def generate_interview(
         # Verify ownership
         if analysis.get("user_id") != db_user_id:
             raise HTTPException(status_code=403, detail="Access denied")
+        
+        # The interview row references the analysis, so it must be in Supabase first
+        if not await analysis_outbox.ensure_flushed(request.analysis_id):
+            raise HTTPException(status_code=503, detail="Analysis is still being saved, please retry")
             
         synthesis_result = analysis.get("synthesis_result", {})
         skill_gaps = synthesis_result.get("skill_gaps", [])
         focus_areas = synthesis_result.get("interview_focus_areas", [])
         
-        # Generate questions using LangGraph Service
-        questions = await langgraph_service.generate_interview_questions(skill_gaps, focus_areas)
+        # Use the speculatively prefetched set if ready, otherwise generate now
+        questions = await interview_prefetch_service.consume(request.analysis_id)
+        if not questions:
+            questions = await langgraph_service.generate_interview_questions(skill_gaps, focus_areas)
         
         # Save interview to Supabase
         interview_data = {
             "user_id": db_user_id,
             "analysis_id": request.analysis_id,
             "status": "created",
-            "overall_score": 0
+            "overall_score": None  # NULL until scored, so user_stats doesn't average it in
         }
-        saved_interview = await supabase_service.create_interview(interview_data)
+        # Interview and questions are written atomically in one round trip
+        saved_interview = await supabase_service.create_interview_with_questions(interview_data, questions)
         if not saved_interview:
              raise HTTPException(status_code=500, detail="Failed to create interview")
         
         interview_id = saved_interview['id']
         
-        # Save questions
-        questions_data = []
-        for i, q in enumerate(questions):
-            questions_data.append({
-                "interview_id": interview_id,
-                "content": q,
-                "order_index": i
-            })
-            
-        await supabase_service.add_questions(questions_data)
-        
         response = InterviewResponse(
             interview_id=interview_id,
             initial_questions=questions
@@ -293,23 +345,16 @@ async def get_interview_data(
     Retrieve interview data and questions
     """
     try:
-        # Resolve Supabase User ID
-        supabase_user = await supabase_service.get_user(user_id)
-        if not supabase_user:
-            raise HTTPException(status_code=404, detail="User not found")
-        db_user_id = supabase_user['id']
-        
-        # Get interview
-        interview = await supabase_service.get_interview(interview_id)
+        # Interview, questions and owner in one query
+        interview, owned = await supabase_service.get_interview_detail(interview_id, user_id)
         if not interview:
             raise HTTPException(status_code=404, detail="Interview not found")
             
         # Verify ownership
-        if interview.get("user_id") != db_user_id:
+        if not owned:
             raise HTTPException(status_code=403, detail="Access denied")
             
-        # Get questions
-        questions = await supabase_service.get_interview_questions(interview_id)
+        questions = interview.pop("questions", [])
         
         return {
             "interview": interview,
@@ -321,6 +366,96 @@ async def get_interview_data(
         logger.error(f"Error retrieving interview: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to retrieve interview: {str(e)}")
 
+async def score_answer_task(interview_id: str, response_id: str, question: str, answer: str) -> Optional[Dict[str, Any]]:
+    """
+    Score one answer and persist the result on its responses row; None if scoring failed.
+    Single-flight across workers: a caller that finds the background scorer still running
+    waits for its result instead of scoring the answer again.
+    """
+    async def compute() -> Dict[str, Any]:
+        feedback = await langgraph_service.score_answer(question, answer)
+        if not feedback:
+            raise RuntimeError("no usable score returned")
+        await supabase_service.update_response(response_id, {"feedback": feedback})
+        return feedback
+    
+    try:
+        return await redis_service.get_or_compute(
+            f"{CacheKeys.ANSWER_SCORE}:{response_id}", compute,
+            soft_ttl=CACHE_TTL_INTERVIEW, ttl=CACHE_TTL_INTERVIEW,
+            tags=[cache_tag("interview", interview_id)]
+        )
+    except Exception as e:
+        logger.error(f"Error scoring response {response_id}: {e}")
+        return None
+
+@app.post("/interview/answer", response_model=AnswerResponse)
+async def submit_answer(
+    request: AnswerRequest,
+    background_tasks: BackgroundTasks,
+    user_id: str = Depends(verify_firebase_token)
+):
+    """
+    Record a candidate's answer as the interview progresses and score it in the background
+    """
+    try:
+        if not request.transcript.strip():
+            raise HTTPException(status_code=400, detail="Answer transcript is required")
+        
+        # Interview, its questions and an ownership check in one query
+        interview, owned = await supabase_service.get_interview_detail(request.interview_id, user_id)
+        if not interview:
+            raise HTTPException(status_code=404, detail="Interview not found")
+        if not owned:
+            raise HTTPException(status_code=403, detail="Access denied")
+        
+        questions = interview.get("questions") or []
+        question = next((q for q in questions if q.get("id") == request.question_id), None)
+        if not question:
+            raise HTTPException(status_code=404, detail="Question not found in this interview")
+        
+        saved_response = await supabase_service.create_response({
+            "question_id": request.question_id,
+            "transcript": request.transcript
+        })
+        if not saved_response:
+            raise HTTPException(status_code=500, detail="Failed to save answer")
+        
+        background_tasks.add_task(score_answer_task, request.interview_id, saved_response['id'], question["content"], request.transcript)
+        
+        return AnswerResponse(response_id=saved_response['id'], status="scoring")
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error submitting answer: {e}")
+        raise HTTPException(status_code=500, detail=f"Answer submission failed: {str(e)}")
+
+async def score_interview_responses(interview_id: str, question_ids: List[str]) -> Tuple[List[Tuple[str, Dict[str, Any]]], int, int]:
+    """
+    Per-answer scores for an interview's latest answer to each question, scoring (or waiting
+    on) any still pending. Returns (scored answers, questions without an answer, answers that
+    could not be scored).
+    """
+    latest: Dict[str, Dict[str, Any]] = {}
+    for response in await supabase_service.get_interview_responses(interview_id):
+        latest[response.get("question_id")] = response  # oldest first, so resubmissions win
+    
+    async def ensure_scored(response: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if response.get("feedback"):
+            return response["feedback"]
+        question = (response.get("questions") or {}).get("content", "")
+        return await score_answer_task(interview_id, response["id"], question, response.get("transcript") or "")
+    
+    responses = list(latest.values())
+    results = await asyncio.gather(*(ensure_scored(r) for r in responses))
+    answers = [
+        (f"{(r.get('questions') or {}).get('content', '')}\n{r.get('transcript') or ''}", result)
+        for r, result in zip(responses, results) if result
+    ]
+    unanswered = len([qid for qid in question_ids if qid not in latest])
+    return answers, unanswered, len(responses) - len(answers)
+
 @app.post("/feedback/analyze", response_model=FeedbackResponse)
 async def analyze_feedback(
     request: FeedbackRequest,
@@ -332,36 +467,56 @@ async def analyze_feedback(
     try:
         logger.info(f"Analyzing feedback for user {user_id}, interview_id: {request.interview_id}")
         
-        # Resolve Supabase User ID
-        supabase_user = await supabase_service.get_user(user_id)
-        if not supabase_user:
-            raise HTTPException(status_code=404, detail="User not found")
-        db_user_id = supabase_user['id']
-        
-        # Verify ownership
-        interview = await supabase_service.get_interview(request.interview_id)
+        # Interview, its questions and an ownership check in one query
+        interview, owned = await supabase_service.get_interview_detail(request.interview_id, user_id)
         if not interview:
             raise HTTPException(status_code=404, detail="Interview not found")
-        if interview.get("user_id") != db_user_id:
+        if not owned:
             raise HTTPException(status_code=403, detail="Access denied")
-            
-        # Generate feedback
-        feedback = await langgraph_service.generate_feedback(request.transcript)
         
-        # Update interview in Supabase
+        # Per-answer scores are only a shortcut when they cover the whole interview; answers
+        # given only in the live transcript, or that failed to score, must still count
+        answers, unanswered, failed = await score_interview_responses(
+            request.interview_id, [q["id"] for q in interview.get("questions", [])]
+        )
+        if answers and not unanswered and not failed:
+            feedback = await langgraph_service.aggregate_answer_feedback(answers)
+        elif request.transcript.strip():
+            if answers:
+                logger.info(
+                    f"Interview {request.interview_id}: {unanswered} unanswered and {failed} unscored "
+                    f"questions, scoring the full transcript instead"
+                )
+            feedback = await langgraph_service.generate_feedback(request.transcript)
+        elif failed:
+            raise HTTPException(status_code=502, detail=f"{failed} answer(s) could not be scored, please retry")
+        elif answers:
+            feedback = await langgraph_service.aggregate_answer_feedback(answers)
+        else:
+            raise HTTPException(status_code=400, detail="No answers or transcript to score")
+        
+        score = coerce_score(feedback.get("overall_score"))
+        if score is None:
+            # Completing the interview with an invented 0 would drag the user's average_score down
+            raise HTTPException(status_code=502, detail="Feedback could not be scored, please retry")
+        
+        # Update interview in Supabase (overall_score is an INTEGER column)
         updates = {
             "status": "completed",
-            "overall_score": feedback.get("overall_score", 0),
+            "overall_score": round(score),
             "feedback_summary": json.dumps(feedback),
             "transcript": request.transcript
         }
         await supabase_service.update_interview(request.interview_id, updates)
         
+        # The live-interview session is finished; drop its cached context everywhere
+        await redis_service.invalidate_tags(cache_tag("interview", request.interview_id))
+        
         # Return response
         response = FeedbackResponse(
             feedback_id=request.interview_id,
             summary=feedback.get("summary", ""),
-            overall_score=feedback.get("overall_score", 0),
+            overall_score=score,
             strong_points=feedback.get("strong_points", []),
             areas_to_improve=feedback.get("areas_to_improve", []),
             detailed_analysis=feedback.get("detailed_analysis", "")
@@ -386,7 +541,7 @@ async def get_feedback(
     """
     try:
         # Resolve Supabase User ID
-        supabase_user = await supabase_service.get_user(user_id)
+        supabase_user = await user_resolver.resolve(user_id)
         if not supabase_user:
             raise HTTPException(status_code=404, detail="User not found")
         db_user_id = supabase_user['id']
@@ -424,8 +579,131 @@ async def get_feedback(
         logger.error(f"Error retrieving feedback: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to retrieve feedback: {str(e)}")
 
-# Follow-up question endpoint (for real-time interview)
-# ... (keep commented out for now)
+# Follow-up question endpoints (for real-time interview)
+async def get_interview_session(interview_id: str, db_user_id: str) -> Dict[str, Any]:
+    """Load the server-side interview session context, building it on first use"""
+    context = await redis_service.get_interview_context(interview_id)
+    if context:
+        if context.get("user_id") != db_user_id:
+            raise HTTPException(status_code=403, detail="Access denied")
+        return context
+    
+    interview = await supabase_service.get_interview_with_analysis(interview_id)
+    if not interview:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    if interview.get("user_id") != db_user_id:
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    analysis = interview.get("analyses")
+    questions = interview.get("questions") or []
+    
+    context = {
+        "user_id": db_user_id,
+        "analysis": (analysis or {}).get("synthesis_result") or {},
+        "questions": [q.get("content") for q in questions],
+        "history": []
+    }
+    await redis_service.store_interview_context(interview_id, context)
+    return context
+
+@app.post("/interview/followup", response_model=FollowupResponse)
+async def generate_followup(
+    request: FollowupRequest,
+    user_id: str = Depends(verify_firebase_token)
+):
+    """
+    Generate a follow-up question from the client-supplied conversation history
+    """
+    try:
+        supabase_user = await user_resolver.resolve(user_id)
+        if not supabase_user:
+            raise HTTPException(status_code=404, detail="User not found")
+        
+        context = await get_interview_session(request.interview_id, supabase_user['id'])
+        followup = await langgraph_service.generate_followup_question(context, request.conversation_history)
+        context_window.schedule_summary(
+            request.interview_id, context, request.conversation_history,
+            langgraph_service.summarize_conversation
+        )
+        
+        return FollowupResponse(followup_question=followup)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error generating follow-up: {e}")
+        raise HTTPException(status_code=500, detail=f"Follow-up generation failed: {str(e)}")
+
+WS_CLOSE_CODES = {401: 4401, 403: 4403, 404: 4404}
+
+@app.websocket("/ws/interview/{interview_id}")
+async def interview_followup_ws(websocket: WebSocket, interview_id: str, token: str = ""):
+    """
+    Live interview channel. Send {"type": "utterance", "text": "..."} for each candidate turn;
+    the follow-up question streams back as {"type": "token"} messages followed by {"type": "followup"}.
+    Browsers cannot set headers on WebSockets, so the Firebase ID token is passed as ?token=.
+    """
+    await websocket.accept()
+    try:
+        user_id = await verify_id_token(token)
+        supabase_user = await user_resolver.resolve(user_id)
+        if not supabase_user:
+            raise HTTPException(status_code=404, detail="User not found")
+        context = await get_interview_session(interview_id, supabase_user['id'])
+    except HTTPException as e:
+        await websocket.send_json({"type": "error", "detail": e.detail})
+        await websocket.close(code=WS_CLOSE_CODES.get(e.status_code, 1011))
+        return
+    
+    try:
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+            except (ValueError, KeyError):  # not JSON, or a binary frame
+                message = None
+            is_utterance = isinstance(message, dict) and message.get("type") == "utterance"
+            text = (message.get("text") or "").strip() if is_utterance else ""
+            if not text:
+                await websocket.send_json({"type": "error", "detail": "Expected {\"type\": \"utterance\", \"text\": ...}"})
+                continue
+            
+            context["history"].append({"role": "user", "content": text})
+            
+            started = time.perf_counter()
+            ttft_ms = None
+            tokens: List[str] = []
+            try:
+                async for chunk in langgraph_service.stream_followup_question(context, context["history"]):
+                    if ttft_ms is None:
+                        ttft_ms = (time.perf_counter() - started) * 1000
+                        followup_ttft.record(ttft_ms)
+                    tokens.append(chunk)
+                    await websocket.send_json({"type": "token", "content": chunk})
+            except WebSocketDisconnect:
+                raise
+            except Exception as e:
+                logger.error(f"Error streaming follow-up for interview {interview_id}: {e}")
+                # Unanswered turn: drop it so a retry doesn't send it to the model twice
+                context["history"].pop()
+                await websocket.send_json({"type": "error", "detail": "Follow-up generation failed"})
+                continue
+            
+            followup = "".join(tokens).strip()
+            context["history"].append({"role": "assistant", "content": followup})
+            await redis_service.store_interview_context(interview_id, context)
+            context_window.schedule_summary(
+                interview_id, context, context["history"],
+                langgraph_service.summarize_conversation
+            )
+            
+            await websocket.send_json({
+                "type": "followup",
+                "followup_question": followup,
+                "ttft_ms": round(ttft_ms or 0, 1),
+                "total_ms": round((time.perf_counter() - started) * 1000, 1)
+            })
+    except WebSocketDisconnect:
+        logger.info(f"Interview WebSocket closed: {interview_id}")
 
 # Feedback analysis endpoint
 # ... (keep commented out for now)
@@ -434,34 +712,40 @@ async def get_feedback(
 @app.get("/analysis/{analysis_id}")
 async def get_analysis(
     analysis_id: str,
+    include_text: bool = False,
     user_id: str = Depends(verify_firebase_token)
 ):
     """
-    Retrieve analysis results by ID
+    Retrieve analysis results by ID. The resume and job description text are only
+    loaded (from text_blobs) with include_text=true.
     """
     try:
         logger.info(f"Retrieving analysis {analysis_id} for user {user_id}")
         
-        # Resolve Supabase User ID
-        supabase_user = await supabase_service.get_user(user_id)
-        if not supabase_user:
-            raise HTTPException(status_code=404, detail="User not found")
-        
-        db_user_id = supabase_user['id']
-        
-        # Get from Supabase
-        analysis = await supabase_service.get_analysis(analysis_id)
+        # Analysis, its interviews and its owner in one query
+        analysis, owned = await supabase_service.get_analysis_detail(analysis_id, user_id)
         
         if not analysis:
+            # Not flushed to Supabase yet: serve it from the write-behind outbox
+            pending = await analysis_outbox.get(analysis_id)
+            if pending:
+                supabase_user = await user_resolver.resolve(user_id)
+                if not supabase_user or pending.get("user_id") != supabase_user['id']:
+                    raise HTTPException(status_code=403, detail="Access denied")
+                if not include_text:
+                    pending = {k: v for k, v in pending.items() if k not in ANALYSIS_TEXT_FIELDS}
+                return {**pending, "interviews": []}
             raise HTTPException(status_code=404, detail="Analysis not found")
         
         # Verify user owns this analysis
-        if analysis.get("user_id") != db_user_id:
+        if not owned:
             raise HTTPException(status_code=403, detail="Access denied")
-            
-        # Get associated interviews
-        interviews = await supabase_service.get_analysis_interviews(analysis_id)
-        analysis["interviews"] = interviews
+        
+        if include_text:
+            analysis = await supabase_service.attach_texts(analysis)
+        else:
+            # Rows from before 0003_text_blobs.sql still carry the text inline
+            analysis = {k: v for k, v in analysis.items() if k not in ANALYSIS_TEXT_FIELDS}
         
         return analysis
         
@@ -473,23 +757,37 @@ async def get_analysis(
 
 @app.get("/analyses")
 async def get_user_analyses(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     user_id: str = Depends(verify_firebase_token)
 ):
     """
-    Retrieve all analyses for the current user
+    Page through the current user's analyses, newest first (summary columns only;
+    GET /analysis/{id} returns the full record)
     """
     try:
         # Resolve Supabase User ID
-        supabase_user = await supabase_service.get_user(user_id)
+        supabase_user = await user_resolver.resolve(user_id)
         if not supabase_user:
             raise HTTPException(status_code=404, detail="User not found")
         
         db_user_id = supabase_user['id']
         
-        # Fetch all analyses (limit 100 for now)
-        analyses = await supabase_service.get_user_analyses(db_user_id, limit=100)
+        after = None
+        if cursor:
+            after = decode_cursor(cursor)
+            if not after:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
         
-        return analyses
+        # One extra row tells us whether there is a next page
+        analyses = await supabase_service.get_user_analyses(db_user_id, limit=limit + 1, after=after)
+        has_more = len(analyses) > limit
+        analyses = analyses[:limit]
+        
+        return {
+            "items": analyses,
+            "next_cursor": encode_cursor(analyses[-1]) if has_more else None
+        }
         
     except HTTPException:
         raise
@@ -506,31 +804,27 @@ async def get_dashboard_data(
     """
     try:
         # Resolve Supabase User ID
-        supabase_user = supabase_service.get_user(user_id)
+        supabase_user = await user_resolver.resolve(user_id)
         if not supabase_user:
             raise HTTPException(status_code=404, detail="User not found")
         
         db_user_id = supabase_user['id']
         
-        # Fetch data concurrently (in a real async scenario, we'd use gather, but sequential is fine for now)
-        analyses = supabase_service.get_user_analyses(db_user_id, limit=5)
-        interviews = supabase_service.get_user_interviews(db_user_id, limit=5)
-        
-        # Calculate stats
-        total_analyses = len(analyses) # This is just recent, ideally we'd have a count query but this is a start
-        total_interviews = len(interviews)
+        # Fetch data concurrently; totals are maintained incrementally in user_stats
+        stats, analyses, interviews = await asyncio.gather(
+            supabase_service.get_user_stats(db_user_id),
+            supabase_service.get_user_analyses(db_user_id, limit=5),
+            supabase_service.get_user_interviews(db_user_id, limit=5)
+        )
         
-        avg_score = 0
-        if interviews:
-            scores = [i.get('overall_score', 0) for i in interviews if i.get('overall_score')]
-            if scores:
-                avg_score = sum(scores) / len(scores)
+        avg_score = stats["score_sum"] / stats["score_count"] if stats["score_count"] else 0
         
         return {
             "stats": {
-                "total_analyses": total_analyses, # Placeholder, should be total count
-                "total_interviews": total_interviews, # Placeholder
-                "average_score": round(avg_score, 1)
+                "total_analyses": stats["analysis_count"],
+                "total_interviews": stats["interview_count"],
+                "average_score": round(avg_score, 1),
+                "last_activity_at": stats["last_activity_at"]
             },
             "recent_analyses": analyses,
             "recent_interviews": interviews
@@ -557,7 +851,7 @@ async def get_interview_details(
             raise HTTPException(status_code=404, detail="Interview not found")
             
         # Verify ownership
-        supabase_user = await supabase_service.get_user(user_id)
+        supabase_user = await user_resolver.resolve(user_id)
         if not supabase_user or interview.get("user_id") != supabase_user['id']:
              raise HTTPException(status_code=403, detail="Access denied")
              
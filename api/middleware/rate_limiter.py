@@ -1,11 +1,14 @@
-from fastapi import Request, HTTPException, Depends
+from fastapi import Request, Response, HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import firebase_admin
 from firebase_admin import auth, credentials
 import logging
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 from config import FIREBASE_PROJECT_ID, FIREBASE_PRIVATE_KEY, FIREBASE_CLIENT_EMAIL
 from services.redis_service import redis_service
+from utils.cache_keys import CacheKeys
+from services.token_bucket import GlobalTokenBucket
+from utils.rate_limits import RateLimit, parse_rate_limit
 
 logger = logging.getLogger(__name__)
 
@@ -37,8 +40,29 @@ initialize_firebase()
 
 security = HTTPBearer()
 
+# One bucket per global limit per worker, shared by every endpoint using that limit
+_global_buckets: Dict[str, GlobalTokenBucket] = {}
+
+def get_global_bucket(rate_limit: RateLimit) -> GlobalTokenBucket:
+    bucket = _global_buckets.get(rate_limit.spec)
+    if bucket is None:
+        key = f"{CacheKeys.RATE_LIMIT_GLOBAL}:budget:{rate_limit.limit}:{rate_limit.window}"
+        bucket = _global_buckets[rate_limit.spec] = GlobalTokenBucket(rate_limit, key)
+    return bucket
+
+def get_rate_limit_stats() -> Dict[str, Any]:
+    return {spec: bucket.get_stats() for spec, bucket in _global_buckets.items()}
+
+async def close_rate_limiters():
+    for bucket in _global_buckets.values():
+        await bucket.close()
+
 async def verify_firebase_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
     """Verify Firebase token and return user ID"""
+    return await verify_id_token(credentials.credentials)
+
+async def verify_id_token(id_token: str) -> str:
+    """Verify a raw Firebase ID token (e.g. from a WebSocket query string) and return user ID"""
     try:
         # Check if Firebase is initialized
         if not firebase_admin._apps:
@@ -47,7 +71,7 @@ async def verify_firebase_token(credentials: HTTPAuthorizationCredentials = Depe
             return "test-user-123"
         
         # Verify the token
-        decoded_token = auth.verify_id_token(credentials.credentials)
+        decoded_token = auth.verify_id_token(id_token)
         user_id = decoded_token.get('uid')
         email = decoded_token.get('email')
         name = decoded_token.get('name')
@@ -58,11 +82,11 @@ async def verify_firebase_token(credentials: HTTPAuthorizationCredentials = Depe
             
         # Sync user to Supabase
         try:
-            from services.supabase_service import supabase_service
-            existing_user = await supabase_service.get_user(user_id)
+            from services.user_resolver import user_resolver
+            existing_user = await user_resolver.resolve(user_id)
             if not existing_user:
                 logger.info(f"Creating new user in Supabase: {user_id}")
-                await supabase_service.create_user({
+                await user_resolver.create_user({
                     "firebase_uid": user_id,
                     "email": email,
                     "full_name": name,
@@ -83,52 +107,71 @@ async def verify_firebase_token(credentials: HTTPAuthorizationCredentials = Depe
         raise HTTPException(status_code=401, detail="Invalid authentication token")
 
 class RateLimiter:
-    """Rate limiting decorator"""
+    """
+    Per-user sliding window checked atomically in Redis, plus a global limit served from a
+    per-worker token bucket leased from Redis (no I/O per request in the common case)
+    """
+    
+    def __init__(self, user_limit: Optional[str] = None, global_limit: Optional[str] = None):
+        self.user_limit = parse_rate_limit(user_limit) if user_limit else None
+        self.global_limit = parse_rate_limit(global_limit) if global_limit else None
+        self.global_bucket = get_global_bucket(self.global_limit) if self.global_limit else None
     
-    def __init__(self, limit: str, per_user: bool = True, global_limit: bool = False):
-        self.limit = limit
-        self.per_user = per_user
-        self.global_limit = global_limit
+    def _checks(self, user_id: Optional[str]) -> List[Tuple[str, RateLimit]]:
+        if self.user_limit and user_id:
+            return [(f"{CacheKeys.RATE_LIMIT_USER}:{user_id}:{self.user_limit.window}", self.user_limit)]
+        return []
     
-    async def __call__(self, request: Request, user_id: Optional[str] = None):
-        """Check rate limits"""
+    def _reject(self, rl: RateLimit, reset: int, scope: str):
+        raise HTTPException(
+            status_code=429,
+            detail=f"Rate limit exceeded. {scope} limit: {rl.spec}",
+            headers={"X-RateLimit-Limit": str(rl.limit), "X-RateLimit-Remaining": "0",
+                     "X-RateLimit-Reset": str(reset), "Retry-After": str(reset)}
+        )
+    
+    async def __call__(self, response: Response, user_id: Optional[str] = None):
+        """Check and consume all applicable limits"""
+        states = []
+        token = None
+        if self.global_bucket:
+            # Global first, so a full global budget doesn't burn the user's quota
+            token = await self.global_bucket.acquire()
+            if token is None:
+                self._reject(self.global_limit, self.global_bucket.reset_in(), "Global")
+            states.append({
+                "limit": self.global_limit.limit,
+                "remaining": self.global_bucket.remaining(),
+                "reset": self.global_bucket.reset_in()
+            })
         
-        # Check per-user rate limit
-        if self.per_user and user_id:
-            allowed, current_count = await redis_service.check_rate_limit(user_id, "user")
+        checks = self._checks(user_id)
+        if checks:
+            allowed, user_states = await redis_service.consume_rate_limits(checks)
             if not allowed:
-                raise HTTPException(
-                    status_code=429,
-                    detail=f"Rate limit exceeded. User limit: {self.limit}",
-                    headers={"Retry-After": "86400"}  # 24 hours
-                )
+                if token:
+                    self.global_bucket.refund(token)
+                self._reject(self.user_limit, user_states[0]["reset"], "User")
+            states.extend(user_states)
         
-        # Check global rate limit
-        if self.global_limit:
-            allowed, current_count = await redis_service.check_rate_limit("global", "global")
-            if not allowed:
-                raise HTTPException(
-                    status_code=429,
-                    detail=f"Global rate limit exceeded: {self.limit}",
-                    headers={"Retry-After": "3600"}  # 1 hour
-                )
+        if not states:
+            return True
         
+        # Report the most constrained limit
+        tightest = min(states, key=lambda state: (state["remaining"], -state["reset"]))
+        response.headers.update({
+            "X-RateLimit-Limit": str(tightest["limit"]),
+            "X-RateLimit-Remaining": str(tightest["remaining"]),
+            "X-RateLimit-Reset": str(tightest["reset"])
+        })
         return True
 
-def rate_limit(limit: str, per_user: bool = True, global_limit: bool = False):
-    """Rate limiting decorator factory"""
-    limiter = RateLimiter(limit, per_user, global_limit)
+def rate_limit(user_limit: Optional[str] = None, global_limit: Optional[str] = None):
+    """Rate limiting dependency factory, e.g. rate_limit(user_limit="5/day", global_limit="100/hour")"""
+    limiter = RateLimiter(user_limit, global_limit)
     
-    async def rate_limit_dependency(request: Request, user_id: str = Depends(verify_firebase_token)):
-        await limiter(request, user_id)
-        
-        # Increment counters after successful check
-        if per_user and user_id:
-            await redis_service.increment_counter(user_id, "user")
-        
-        if global_limit:
-            await redis_service.increment_counter("global", "global")
-        
+    async def rate_limit_dependency(response: Response, user_id: str = Depends(verify_firebase_token)):
+        await limiter(response, user_id)
         return user_id
     
     return rate_limit_dependency
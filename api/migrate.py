@@ -0,0 +1,174 @@
+"""
+Versioned schema migrations.
+
+Applies migrations/NNNN_name.sql in order, once each, recording them in schema_migrations.
+Each file runs in its own transaction unless its first line is `-- migrate: no-transaction`
+(needed for CREATE INDEX CONCURRENTLY); such files are run statement by statement.
+A Postgres advisory lock keeps concurrent deploys from racing.
+
+A failed CREATE INDEX CONCURRENTLY leaves an INVALID index behind, which IF NOT EXISTS would
+then skip forever; such indexes are dropped and rebuilt, and every index built is checked.
+
+    DATABASE_URL=postgresql://... python migrate.py            # apply pending migrations
+    DATABASE_URL=postgresql://... python migrate.py status     # list applied / pending
+"""
+import argparse
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import sys
+from typing import List, NamedTuple, Optional
+
+import asyncpg
+
+from config import DATABASE_URL
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+MIGRATION_FILE_PATTERN = re.compile(r"^(\d{4})_[\w-]+\.sql$")
+NO_TRANSACTION_MARKER = "-- migrate: no-transaction"
+ADVISORY_LOCK_ID = 0x70726570  # arbitrary ("prep"), shared by every runner of this schema
+CONCURRENT_INDEX_PATTERN = re.compile(
+    r"^CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+(?:IF\s+NOT\s+EXISTS\s+)?([\w.\"]+)\s+ON\b", re.IGNORECASE
+)
+
+
+class Migration(NamedTuple):
+    version: str
+    name: str
+    sql: str
+    checksum: str
+
+    @property
+    def transactional(self) -> bool:
+        return not self.sql.lstrip().startswith(NO_TRANSACTION_MARKER)
+
+
+def load_migrations(directory: str = MIGRATIONS_DIR) -> List[Migration]:
+    migrations = []
+    for name in sorted(os.listdir(directory)):
+        match = MIGRATION_FILE_PATTERN.match(name)
+        if not match:
+            continue
+        with open(os.path.join(directory, name)) as f:
+            sql = f.read()
+        migrations.append(Migration(match.group(1), name, sql, hashlib.sha256(sql.encode()).hexdigest()))
+    versions = [m.version for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValueError(f"Duplicate migration versions in {directory}")
+    return migrations
+
+
+def split_statements(sql: str) -> List[str]:
+    """Split a no-transaction file on `;` (such files must not contain function bodies)"""
+    lines = [line for line in sql.splitlines() if not line.strip().startswith("--")]
+    return [statement.strip() for statement in "\n".join(lines).split(";") if statement.strip()]
+
+
+async def ensure_migrations_table(conn: asyncpg.Connection) -> None:
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            checksum TEXT NOT NULL,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        )
+    """)
+
+
+async def applied_migrations(conn: asyncpg.Connection) -> dict:
+    rows = await conn.fetch("SELECT version, name, checksum FROM schema_migrations")
+    return {row["version"]: row for row in rows}
+
+
+async def index_is_valid(conn: asyncpg.Connection, index: str) -> Optional[bool]:
+    """pg_index.indisvalid for an index name (resolved on the search_path); None if it doesn't exist"""
+    return await conn.fetchval("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass($1)", index)
+
+
+async def apply_statement(conn: asyncpg.Connection, statement: str) -> None:
+    """Run one no-transaction statement, rebuilding a concurrent index a failed run left INVALID"""
+    match = CONCURRENT_INDEX_PATTERN.match(statement)
+    if not match:
+        await conn.execute(statement)
+        return
+    index = match.group(1)
+    if await index_is_valid(conn, index) is False:
+        logger.warning(f"Dropping invalid index {index} left by an interrupted build")
+        await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index}")
+    await conn.execute(statement)
+    if not await index_is_valid(conn, index):
+        raise RuntimeError(f"Index {index} is missing or invalid after CREATE INDEX CONCURRENTLY")
+
+
+async def apply_migration(conn: asyncpg.Connection, migration: Migration) -> None:
+    record = "INSERT INTO schema_migrations (version, name, checksum) VALUES ($1, $2, $3)"
+    if migration.transactional:
+        async with conn.transaction():
+            await conn.execute(migration.sql)
+            await conn.execute(record, migration.version, migration.name, migration.checksum)
+        return
+    # Statements must be idempotent (IF NOT EXISTS): a failure part-way leaves earlier ones applied
+    for statement in split_statements(migration.sql):
+        await apply_statement(conn, statement)
+    await conn.execute(record, migration.version, migration.name, migration.checksum)
+
+
+async def migrate(database_url: str, directory: str = MIGRATIONS_DIR) -> List[str]:
+    """Apply pending migrations; returns the names applied"""
+    migrations = load_migrations(directory)
+    conn = await asyncpg.connect(database_url)
+    try:
+        await conn.execute("SELECT pg_advisory_lock($1)", ADVISORY_LOCK_ID)
+        try:
+            await ensure_migrations_table(conn)
+            applied = await applied_migrations(conn)
+            for migration in migrations:
+                done = applied.get(migration.version)
+                if done and done["checksum"] != migration.checksum:
+                    logger.warning(f"{migration.name} changed after it was applied; not re-running it")
+            pending = [m for m in migrations if m.version not in applied]
+            for migration in pending:
+                logger.info(f"Applying {migration.name}")
+                await apply_migration(conn, migration)
+            return [m.name for m in pending]
+        finally:
+            await conn.execute("SELECT pg_advisory_unlock($1)", ADVISORY_LOCK_ID)
+    finally:
+        await conn.close()
+
+
+async def status(database_url: str, directory: str = MIGRATIONS_DIR) -> None:
+    conn = await asyncpg.connect(database_url)
+    try:
+        await ensure_migrations_table(conn)
+        applied = await applied_migrations(conn)
+    finally:
+        await conn.close()
+    for migration in load_migrations(directory):
+        done = applied.get(migration.version)
+        state = "pending" if not done else "CHANGED" if done["checksum"] != migration.checksum else "applied"
+        print(f"{state:>8}  {migration.name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply versioned schema migrations")
+    parser.add_argument("command", nargs="?", choices=["up", "status"], default="up")
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    args = parser.parse_args()
+    if not args.database_url:
+        sys.exit("DATABASE_URL is not set")
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if args.command == "status":
+        asyncio.run(status(args.database_url))
+        return
+    applied = asyncio.run(migrate(args.database_url))
+    print(f"Applied {len(applied)} migration(s)" + (": " + ", ".join(applied) if applied else ""))
+
+
+if __name__ == "__main__":
+    main()
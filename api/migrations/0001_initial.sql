@@ -0,0 +1,204 @@
+-- Enable UUID extension
+CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+
+-- Users table
+CREATE TABLE IF NOT EXISTS users (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    email TEXT UNIQUE NOT NULL,
+    full_name TEXT,
+    avatar_url TEXT,
+    firebase_uid TEXT UNIQUE,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Analyses table
+CREATE TABLE IF NOT EXISTS analyses (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID REFERENCES users(id) ON DELETE CASCADE,
+    job_description TEXT,
+    resume_text TEXT,
+    github_url TEXT,
+    linkedin_url TEXT,
+    status TEXT DEFAULT 'pending', -- 'pending', 'completed', 'failed'
+    match_score INTEGER,
+    job_title TEXT,
+    company TEXT,
+    synthesis_result JSONB,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Columns added after the initial release
+ALTER TABLE analyses ADD COLUMN IF NOT EXISTS job_title TEXT;
+ALTER TABLE analyses ADD COLUMN IF NOT EXISTS company TEXT;
+
+-- Interviews table
+CREATE TABLE IF NOT EXISTS interviews (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID REFERENCES users(id) ON DELETE CASCADE,
+    analysis_id UUID REFERENCES analyses(id) ON DELETE CASCADE,
+    status TEXT DEFAULT 'created', -- 'created', 'in_progress', 'completed'
+    feedback_summary TEXT,
+    overall_score INTEGER,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Questions table
+CREATE TABLE IF NOT EXISTS questions (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    interview_id UUID REFERENCES interviews(id) ON DELETE CASCADE,
+    content TEXT NOT NULL,
+    order_index INTEGER,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Responses table
+CREATE TABLE IF NOT EXISTS responses (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    question_id UUID REFERENCES questions(id) ON DELETE CASCADE,
+    audio_url TEXT,
+    transcript TEXT,
+    feedback JSONB,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Atomic parent-with-children insert in one round trip (POST /rest/v1/rpc/insert_with_children).
+-- Only the keys present in each JSON object are inserted, so column defaults still apply.
+-- SECURITY INVOKER: the caller needs INSERT on both tables, identifiers are quoted with %I.
+-- Returns {"id": <parent id>, "child_ids": [<child ids in input order>]}.
+CREATE OR REPLACE FUNCTION insert_with_children(
+    parent_table TEXT, parent JSONB, child_table TEXT, fk_column TEXT, children JSONB
+) RETURNS JSONB AS $$
+DECLARE
+    parent_id UUID;
+    child_id UUID;
+    child_ids UUID[] := '{}';
+    child JSONB;
+    cols TEXT;
+BEGIN
+    SELECT string_agg(format('%I', key), ',') INTO cols FROM jsonb_object_keys(parent) AS key;
+    EXECUTE format(
+        'INSERT INTO %1$I (%2$s) SELECT %2$s FROM jsonb_populate_record(NULL::%1$I, $1) RETURNING id',
+        parent_table, cols
+    ) INTO parent_id USING parent;
+
+    FOR child IN SELECT value FROM jsonb_array_elements(COALESCE(children, '[]'::JSONB)) LOOP
+        child := child || jsonb_build_object(fk_column, parent_id);
+        SELECT string_agg(format('%I', key), ',') INTO cols FROM jsonb_object_keys(child) AS key;
+        EXECUTE format(
+            'INSERT INTO %1$I (%2$s) SELECT %2$s FROM jsonb_populate_record(NULL::%1$I, $1) RETURNING id',
+            child_table, cols
+        ) INTO child_id USING child;
+        child_ids := child_ids || child_id;
+    END LOOP;
+
+    RETURN jsonb_build_object('id', parent_id, 'child_ids', to_jsonb(child_ids));
+END;
+$$ LANGUAGE plpgsql;
+
+-- Per-user dashboard aggregates, maintained incrementally by triggers below
+CREATE TABLE IF NOT EXISTS user_stats (
+    user_id UUID PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    analysis_count INTEGER NOT NULL DEFAULT 0,
+    interview_count INTEGER NOT NULL DEFAULT 0,
+    score_sum BIGINT NOT NULL DEFAULT 0,
+    score_count INTEGER NOT NULL DEFAULT 0,
+    last_activity_at TIMESTAMPTZ
+);
+
+CREATE OR REPLACE FUNCTION bump_user_stats(
+    p_user_id UUID, d_analyses INTEGER, d_interviews INTEGER,
+    d_score_sum BIGINT, d_score_count INTEGER, p_activity_at TIMESTAMPTZ
+) RETURNS VOID AS $$
+BEGIN
+    IF p_user_id IS NULL THEN
+        RETURN;
+    END IF;
+    UPDATE user_stats SET
+        analysis_count = analysis_count + d_analyses,
+        interview_count = interview_count + d_interviews,
+        score_sum = score_sum + d_score_sum,
+        score_count = score_count + d_score_count,
+        last_activity_at = GREATEST(last_activity_at, p_activity_at)
+    WHERE user_id = p_user_id;
+    -- Only create rows on activity; deletes may come from the users row cascading away
+    IF NOT FOUND AND p_activity_at IS NOT NULL THEN
+        INSERT INTO user_stats (user_id, analysis_count, interview_count, score_sum, score_count, last_activity_at)
+        VALUES (p_user_id, d_analyses, d_interviews, d_score_sum, d_score_count, p_activity_at)
+        ON CONFLICT (user_id) DO UPDATE SET
+            analysis_count = user_stats.analysis_count + EXCLUDED.analysis_count,
+            interview_count = user_stats.interview_count + EXCLUDED.interview_count,
+            score_sum = user_stats.score_sum + EXCLUDED.score_sum,
+            score_count = user_stats.score_count + EXCLUDED.score_count,
+            last_activity_at = GREATEST(user_stats.last_activity_at, EXCLUDED.last_activity_at);
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION analyses_user_stats() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM bump_user_stats(NEW.user_id, 1, 0, 0, 0, COALESCE(NEW.created_at, NOW()));
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM bump_user_stats(OLD.user_id, -1, 0, 0, 0, NULL);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION interviews_user_stats() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM bump_user_stats(NEW.user_id, 0, 1, COALESCE(NEW.overall_score, 0),
+                                (NEW.overall_score IS NOT NULL)::INTEGER, COALESCE(NEW.created_at, NOW()));
+    ELSIF TG_OP = 'UPDATE' THEN
+        PERFORM bump_user_stats(NEW.user_id, 0, 0,
+                                COALESCE(NEW.overall_score, 0) - COALESCE(OLD.overall_score, 0),
+                                (NEW.overall_score IS NOT NULL)::INTEGER - (OLD.overall_score IS NOT NULL)::INTEGER,
+                                NOW());
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM bump_user_stats(OLD.user_id, 0, -1, -COALESCE(OLD.overall_score, 0),
+                                -(OLD.overall_score IS NOT NULL)::INTEGER, NULL);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS analyses_user_stats ON analyses;
+CREATE TRIGGER analyses_user_stats AFTER INSERT OR DELETE ON analyses
+    FOR EACH ROW EXECUTE FUNCTION analyses_user_stats();
+
+DROP TRIGGER IF EXISTS interviews_user_stats ON interviews;
+CREATE TRIGGER interviews_user_stats AFTER INSERT OR DELETE OR UPDATE OF overall_score ON interviews
+    FOR EACH ROW EXECUTE FUNCTION interviews_user_stats();
+
+-- Recompute from scratch (initial backfill, or reconciliation if stats are ever suspected to drift)
+INSERT INTO user_stats (user_id, analysis_count, interview_count, score_sum, score_count, last_activity_at)
+SELECT u.id,
+       (SELECT COUNT(*) FROM analyses a WHERE a.user_id = u.id),
+       (SELECT COUNT(*) FROM interviews i WHERE i.user_id = u.id),
+       (SELECT COALESCE(SUM(overall_score), 0) FROM interviews i WHERE i.user_id = u.id),
+       (SELECT COUNT(overall_score) FROM interviews i WHERE i.user_id = u.id),
+       GREATEST((SELECT MAX(created_at) FROM analyses a WHERE a.user_id = u.id),
+                (SELECT MAX(created_at) FROM interviews i WHERE i.user_id = u.id))
+FROM users u
+ON CONFLICT (user_id) DO UPDATE SET
+    analysis_count = EXCLUDED.analysis_count,
+    interview_count = EXCLUDED.interview_count,
+    score_sum = EXCLUDED.score_sum,
+    score_count = EXCLUDED.score_count,
+    last_activity_at = EXCLUDED.last_activity_at;
+
+-- RLS Policies (Optional but recommended)
+ALTER TABLE users ENABLE ROW LEVEL SECURITY;
+ALTER TABLE analyses ENABLE ROW LEVEL SECURITY;
+ALTER TABLE interviews ENABLE ROW LEVEL SECURITY;
+ALTER TABLE questions ENABLE ROW LEVEL SECURITY;
+ALTER TABLE responses ENABLE ROW LEVEL SECURITY;
+ALTER TABLE user_stats ENABLE ROW LEVEL SECURITY;
+
+-- Simple policy: Users can only access their own data
+-- Note: This requires Supabase Auth to be synced or handled correctly.
+-- For now, since we are using a service role key in the backend, we bypass RLS.
+-- But if we use the anon key from frontend, we need these.
+-- Since we are doing everything via backend API for now, we can skip strict RLS setup or set it to allow all for service role.
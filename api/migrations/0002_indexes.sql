@@ -0,0 +1,17 @@
+-- migrate: no-transaction
+-- Indexes for every filter/order SupabaseService issues. CONCURRENTLY so they can be built
+-- on a live database without blocking writes (which is why this file runs outside a transaction).
+
+-- get_user_analyses / get_user_interviews: WHERE user_id = ? [AND (created_at, id) < (?, ?)]
+-- ORDER BY created_at DESC, id DESC LIMIT n; also the user_stats backfill
+CREATE INDEX CONCURRENTLY IF NOT EXISTS analyses_user_created_idx ON analyses (user_id, created_at DESC, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS interviews_user_created_idx ON interviews (user_id, created_at DESC, id DESC);
+
+-- get_analysis_interviews and the interviews(*) embed: WHERE analysis_id = ? ORDER BY created_at DESC
+CREATE INDEX CONCURRENTLY IF NOT EXISTS interviews_analysis_created_idx ON interviews (analysis_id, created_at DESC);
+
+-- get_interview_questions and the questions(*) embed: WHERE interview_id = ? ORDER BY order_index
+CREATE INDEX CONCURRENTLY IF NOT EXISTS questions_interview_order_idx ON questions (interview_id, order_index);
+
+-- get_interview_responses (join on question_id) and ON DELETE CASCADE from questions
+CREATE INDEX CONCURRENTLY IF NOT EXISTS responses_question_created_idx ON responses (question_id, created_at);
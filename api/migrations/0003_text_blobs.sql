@@ -0,0 +1,22 @@
+-- Content-addressed storage for the large analysis inputs. Resumes and job descriptions are
+-- stored once in text_blobs, keyed by the hex sha256 of their UTF-8 text, and analyses point at
+-- them by hash: a resume re-analysed against ten jobs is stored once, and analyses rows (what
+-- list scans and detail reads touch) no longer carry kilobytes of text each.
+
+CREATE TABLE IF NOT EXISTS text_blobs (
+    hash TEXT PRIMARY KEY, -- encode(sha256(convert_to(content, 'UTF8')), 'hex'); see SupabaseService.store_text_blobs
+    content TEXT NOT NULL,
+    size INTEGER NOT NULL, -- characters, for accounting without detoasting content
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+ALTER TABLE analyses ADD COLUMN IF NOT EXISTS resume_hash TEXT REFERENCES text_blobs(hash);
+ALTER TABLE analyses ADD COLUMN IF NOT EXISTS job_description_hash TEXT REFERENCES text_blobs(hash);
+
+-- Rows written before this migration keep their inline resume_text/job_description and no hash;
+-- readers use the inline text when no hash is set (Repository.attach_texts). Nothing is moved
+-- here, so this migration never rewrites analyses: a later migration can move old rows into
+-- text_blobs in batches and then drop the columns.
+
+-- Blobs are only reached through the backend's service role, like the other tables
+ALTER TABLE text_blobs ENABLE ROW LEVEL SECURITY;
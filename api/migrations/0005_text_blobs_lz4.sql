@@ -0,0 +1,8 @@
+-- text_blobs.content is compressed out of line by TOAST; lz4 is much cheaper than the default
+-- pglz on both ends. Servers built without lz4 keep pglz rather than failing the migration.
+DO $$
+BEGIN
+    ALTER TABLE text_blobs ALTER COLUMN content SET COMPRESSION lz4;
+EXCEPTION WHEN feature_not_supported THEN
+    RAISE NOTICE 'lz4 not available, text_blobs.content stays on pglz';
+END $$;
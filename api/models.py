@@ -15,6 +15,11 @@ class FollowupRequest(BaseModel):
     interview_id: str
     conversation_history: List[Dict]
 
+class AnswerRequest(BaseModel):
+    interview_id: str
+    question_id: str
+    transcript: str
+
 class FeedbackRequest(BaseModel):
     interview_id: str
     transcript: str
@@ -33,6 +38,10 @@ class InterviewResponse(BaseModel):
     interview_id: str
     initial_questions: List[str]
 
+class AnswerResponse(BaseModel):
+    response_id: str
+    status: str
+
 class FollowupResponse(BaseModel):
     followup_question: str
 
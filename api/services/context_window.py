@@ -0,0 +1,125 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from services.redis_service import redis_service
+from config import (
+    FOLLOWUP_WINDOW_TURNS,
+    FOLLOWUP_MAX_TURN_CHARS,
+    FOLLOWUP_MAX_SUMMARY_CHARS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Analysis fields that actually help when asking a follow-up question
+FOLLOWUP_CONTEXT_FIELDS = [
+    "position_title",
+    "company_name",
+    "skill_gaps",
+    "interview_focus_areas",
+    "strengths",
+]
+MAX_LIST_ITEMS = 8
+MAX_FIELD_CHARS = 200
+
+Summarizer = Callable[[str, List[Dict]], Awaitable[str]]
+
+
+def _clip(text: Any, limit: int) -> str:
+    text = str(text or "").strip()
+    return text if len(text) <= limit else text[:limit - 3].rstrip() + "..."
+
+
+class ConversationContextManager:
+    """
+    Keeps follow-up prompts bounded: the last K turns verbatim, older turns folded into a
+    rolling summary (updated incrementally in the background), and only the analysis fields
+    relevant to follow-ups.
+    """
+
+    def __init__(self):
+        self.window_turns = FOLLOWUP_WINDOW_TURNS
+        self.max_turn_chars = FOLLOWUP_MAX_TURN_CHARS
+        self.max_summary_chars = FOLLOWUP_MAX_SUMMARY_CHARS
+        self._summarizing: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def relevant_context(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Pick the follow-up relevant fields from a session/analysis dict of any shape"""
+        analysis = context.get("analysis", context) or {}
+        if isinstance(analysis.get("synthesis_result"), dict):
+            analysis = {**analysis, **analysis["synthesis_result"]}
+
+        relevant: Dict[str, Any] = {}
+        for field in FOLLOWUP_CONTEXT_FIELDS:
+            value = analysis.get(field)
+            if isinstance(value, list):
+                relevant[field] = [_clip(item, MAX_FIELD_CHARS) for item in value[:MAX_LIST_ITEMS]]
+            elif value:
+                relevant[field] = _clip(value, MAX_FIELD_CHARS)
+
+        questions = context.get("questions")
+        if isinstance(questions, list) and questions:
+            relevant["planned_questions"] = [_clip(q, MAX_FIELD_CHARS) for q in questions[:MAX_LIST_ITEMS]]
+        return relevant
+
+    def _clip_turns(self, turns: List[Dict]) -> List[Dict]:
+        return [
+            {"role": turn.get("role", "user"), "content": _clip(turn.get("content"), self.max_turn_chars)}
+            for turn in turns
+            if isinstance(turn, dict)
+        ]
+
+    def window(self, conversation_history: List[Dict]) -> List[Dict]:
+        """The last K turns, each clipped to a fixed size"""
+        return self._clip_turns(conversation_history[-self.window_turns:])
+
+    def prepare(self, context: Dict[str, Any], conversation_history: List[Dict]) -> Dict[str, Any]:
+        """Bounded prompt payload for one follow-up turn"""
+        return {
+            "context": self.relevant_context(context),
+            "earlier_conversation_summary": context.get("summary", ""),
+            "recent_turns": self.window(conversation_history),
+        }
+
+    def schedule_summary(
+        self,
+        session_id: str,
+        context: Dict[str, Any],
+        conversation_history: List[Dict],
+        summarize: Summarizer,
+    ) -> None:
+        """Fold turns that left the window into the rolling summary without blocking the caller"""
+        fold_until = len(conversation_history) - self.window_turns
+        if fold_until <= context.get("summarized_turns", 0) or session_id in self._summarizing:
+            return
+
+        self._summarizing.add(session_id)
+        task = asyncio.create_task(self._update_summary(session_id, context, conversation_history[:fold_until], summarize))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _update_summary(
+        self,
+        session_id: str,
+        context: Dict[str, Any],
+        folded_history: List[Dict],
+        summarize: Summarizer,
+    ) -> Optional[str]:
+        try:
+            new_turns = self._clip_turns(folded_history[context.get("summarized_turns", 0):])
+            if not new_turns:
+                return None
+            summary = await summarize(context.get("summary", ""), new_turns)
+            context["summary"] = _clip(summary, self.max_summary_chars)
+            context["summarized_turns"] = len(folded_history)
+            await redis_service.store_interview_context(session_id, context)
+            return context["summary"]
+        except Exception as e:
+            logger.error(f"Error updating conversation summary for {session_id}: {e}")
+            return None
+        finally:
+            self._summarizing.discard(session_id)
+
+
+# Global context window manager
+context_window = ConversationContextManager()
@@ -1,4 +1,5 @@
 import asyncio
+import hashlib
 import logging
 from typing import Dict, Any
 from datetime import datetime
@@ -11,8 +12,10 @@ from agents.job_agent import create_job_task
 from agents.social_agent import create_social_task
 from agents.synthesis_agent import create_synthesis_task
 from services.redis_service import redis_service
+from services.context_window import context_window
 from models import AnalysisResult
-from config import GROQ_API_KEY
+from utils.cache_keys import CacheKeys
+from config import GROQ_API_KEY, CACHE_SOFT_TTL_ANALYSIS
 
 # Set Groq API key as environment variable for LiteLLM
 if GROQ_API_KEY:
@@ -27,15 +30,20 @@ class CrewService:
     async def run_analysis(self, resume_text: str, job_description: str, social_urls: Dict[str, str], user_id: str) -> Dict[str, Any]:
         """Run the complete analysis using CrewAI multi-agent system"""
         
-        # Generate cache key based on input content
-        cache_key = f"analysis:{hash(resume_text + job_description + str(social_urls))}"
-        
-        # Check cache first
-        cached_result = await redis_service.get_cached(cache_key)
-        if cached_result:
-            logger.info(f"Returning cached analysis result for user {user_id}")
-            return cached_result
+        # Generate cache key based on input content (stable across workers, unlike hash())
+        content = resume_text + job_description + str(sorted(social_urls.items()))
+        cache_key = f"{CacheKeys.ANALYSIS}:{hashlib.sha256(content.encode()).hexdigest()}"
         
+        # Served stale-while-revalidate: stale results return immediately while one worker refreshes
+        return await redis_service.get_or_compute(
+            cache_key,
+            lambda: self._run_analysis(resume_text, job_description, social_urls, user_id),
+            soft_ttl=CACHE_SOFT_TTL_ANALYSIS,
+            ttl=self.cache_ttl
+        )
+
+    async def _run_analysis(self, resume_text: str, job_description: str, social_urls: Dict[str, str], user_id: str) -> Dict[str, Any]:
+        """Uncached analysis pipeline"""
         try:
             # Extract URLs
             github_url = social_urls.get("github", "")
@@ -93,9 +101,6 @@ class CrewService:
                 "expires_at": (datetime.now().timestamp() + self.cache_ttl)
             }
             
-            # Cache the final result
-            await redis_service.set_cached(cache_key, final_result, self.cache_ttl)
-            
             logger.info(f"Analysis completed successfully for user {user_id}")
             return final_result
             
@@ -196,6 +201,9 @@ class CrewService:
                 max_tokens=150
             )
             
+            # Turns that scrolled out of the window are folded into the summary off the hot path
+            context_window.schedule_summary(interview_id, context, conversation_history, gemini_service.summarize_conversation)
+            
             return followup
             
         except Exception as e:
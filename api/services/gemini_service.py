@@ -4,6 +4,7 @@ import asyncio
 import time
 from typing import Dict, List, Optional
 from config import GEMINI_API_KEY, GEMINI_MODEL
+from services.context_window import context_window
 
 logger = logging.getLogger(__name__)
 
@@ -208,12 +209,14 @@ class GeminiService:
 
     async def generate_followup_question(self, context: Dict, conversation_history: List[Dict], max_tokens: int = 150) -> str:
         """Generate follow-up question during interview"""
+        payload = context_window.prepare(context, conversation_history)
         prompt = f"""
         Based on the interview context and conversation history, generate a relevant follow-up question.
         Keep it concise and natural for a voice interview.
         
-        Context: {context}
-        Conversation History: {conversation_history}
+        Context: {payload["context"]}
+        Earlier Conversation Summary: {payload["earlier_conversation_summary"] or "None"}
+        Recent Turns: {payload["recent_turns"]}
         
         Return only the question text, no JSON formatting.
         """
@@ -221,6 +224,21 @@ class GeminiService:
         response = await self._retry_with_backoff(self.generate_content, prompt, max_tokens)
         return response.strip()
 
+    async def summarize_conversation(self, summary: str, turns: List[Dict]) -> str:
+        """Fold older interview turns into the rolling conversation summary"""
+        prompt = f"""
+        Update the running summary of a technical interview with the new turns below.
+        Keep what the candidate claimed, demonstrated or struggled with. Stay under 150 words.
+        
+        Current Summary: {summary or "None"}
+        New Turns: {turns}
+        
+        Return only the updated summary text.
+        """
+        
+        response = await self._retry_with_backoff(self.generate_content, prompt)
+        return response.strip()
+
     async def generate_feedback(self, skill_gaps: List[str], questions: List[str], transcript: str) -> Dict:
         """Generate interview feedback"""
         prompt = f"""
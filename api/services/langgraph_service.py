@@ -1,15 +1,58 @@
 import os
 import json
 import logging
-from typing import Dict, Any, List, TypedDict, Annotated
+import re
+import asyncio
+import hashlib
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple, TypedDict, Annotated
 from langgraph.graph import StateGraph, END
 from langchain_groq import ChatGroq
 from langchain_core.messages import SystemMessage, HumanMessage
-from config import GROQ_API_KEY, GROQ_MODEL
+from config import (
+    GROQ_API_KEY, GROQ_MODEL, INTERVIEW_QUESTION_COUNT,
+    FEEDBACK_CHUNK_CHARS, FEEDBACK_MAP_CONCURRENCY,
+    PROMPT_VERSION, CACHE_TTL_ANALYSIS, CACHE_SOFT_TTL_ANALYSIS
+)
+from services.question_bank_service import question_bank_service, normalize_skill
+from services.context_window import context_window
+from services.redis_service import redis_service
+from utils.cache_keys import CacheKeys, cache_tag
 import operator
 
 logger = logging.getLogger(__name__)
 
+# Transcript lines look like "assistant: ..." / "user: ..." (Vapi) or "Interviewer: ..." / "Candidate: ..."
+TRANSCRIPT_TURN_PATTERN = re.compile(r"^\s*(assistant|user|interviewer|candidate|ai|bot|q|a)\s*:\s*(.*)$", re.IGNORECASE)
+INTERVIEWER_ROLES = {"assistant", "interviewer", "ai", "bot", "q"}
+# "82", "82/100" or "8/10" - LLMs don't always return the bare number they were asked for
+SCORE_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(?:/\s*(\d+(?:\.\d+)?))?\s*$")
+
+
+def coerce_score(value: Any) -> Optional[float]:
+    """A 0-100 score from an LLM result field, or None if it can't be read as one"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return min(max(float(value), 0.0), 100.0)
+    match = SCORE_PATTERN.match(value) if isinstance(value, str) else None
+    if not match:
+        return None
+    score = float(match.group(1))
+    if match.group(2):
+        scale = float(match.group(2))
+        if not scale:
+            return None
+        score = score * 100 / scale
+    return min(max(score, 0.0), 100.0)
+
+
+class JobAnalysisParseError(Exception):
+    """LLM returned something other than the JSON we asked for"""
+
+    def __init__(self, message: str, raw: str):
+        super().__init__(message)
+        self.raw = raw
+
 # Define the state of the graph
 class GraphState(TypedDict):
     user_id: str
@@ -79,7 +122,12 @@ class LangGraphService:
         try:
             # Invoke the graph
             result = await self.workflow.ainvoke(initial_state)
-            return result["final_report"]
+            report = result["final_report"]
+            # Position and company come from the job analysis; list views show them
+            job_analysis = result.get("job_analysis") or {}
+            report.setdefault("position_title", job_analysis.get("position_title"))
+            report.setdefault("company_name", job_analysis.get("company_name"))
+            return report
         except Exception as e:
             logger.error(f"Error in LangGraph analysis: {e}")
             import traceback
@@ -87,11 +135,62 @@ class LangGraphService:
             raise
 
     async def generate_interview_questions(self, skill_gaps: List[str], focus_areas: List[str]) -> List[str]:
-        """Generate interview questions based on skill gaps and focus areas"""
-        logger.info("Generating interview questions...")
+        """Generate interview questions, serving from the question bank where coverage allows"""
+        skills = question_bank_service.normalize_skills(skill_gaps, focus_areas)
+        if not skills:
+            return await self._generate_questions_llm(skill_gaps, focus_areas)
+        
+        # Only the long tail of skills without enough banked questions goes to the LLM
+        banked = await question_bank_service.lookup(skills, INTERVIEW_QUESTION_COUNT)
+        missing = [skill for skill in skills if skill not in banked]
+        
+        if not missing:
+            logger.info(f"Serving interview questions from question bank for {len(skills)} skills")
+            return question_bank_service.assemble(skills, banked, INTERVIEW_QUESTION_COUNT)
+        
+        logger.info(f"Question bank miss for {len(missing)}/{len(skills)} skills, generating...")
+        generated = await self._generate_questions_by_skill(missing)
+        if not generated:
+            return await self._generate_questions_llm(skill_gaps, focus_areas)
+        
+        await question_bank_service.add(generated)
+        return question_bank_service.assemble(skills, {**banked, **generated}, INTERVIEW_QUESTION_COUNT)
+
+    async def _generate_questions_by_skill(self, skills: List[str]) -> Dict[str, List[str]]:
+        """Generate bankable questions for each skill, keyed by skill"""
+        per_skill = question_bank_service.min_per_skill
+        
+        prompt = f"""
+        Generate {per_skill} technical interview questions for EACH of the following skills:
+        
+        Skills: {json.dumps(skills)}
         
+        The questions should be challenging but fair, self-contained, and not specific to any one candidate.
+        
+        Return ONLY a JSON object mapping each skill (exactly as given) to an array of question strings,
+        e.g. {{"skill one": ["Question 1", "Question 2"], "skill two": [...]}}
+        """
+        
+        try:
+            response = await self.llm.ainvoke([HumanMessage(content=prompt)])
+            content = response.content.replace("```json", "").replace("```", "").strip()
+            parsed = json.loads(content)
+        except Exception as e:
+            logger.error(f"Error generating questions by skill: {e}")
+            return {}
+        
+        if not isinstance(parsed, dict):
+            return {}
+        return {
+            normalize_skill(skill): [q for q in questions if isinstance(q, str)]
+            for skill, questions in parsed.items()
+            if isinstance(questions, list)
+        }
+
+    async def _generate_questions_llm(self, skill_gaps: List[str], focus_areas: List[str]) -> List[str]:
+        """Generate a one-off set of interview questions directly from the LLM"""
         prompt = f"""
-        Generate 5 technical interview questions based on the following:
+        Generate {INTERVIEW_QUESTION_COUNT} technical interview questions based on the following:
         
         Skill Gaps: {', '.join(skill_gaps)}
         Focus Areas: {', '.join(focus_areas)}
@@ -117,8 +216,242 @@ class LangGraphService:
                 "Where do you see yourself in 5 years?"
             ]
 
+    def _followup_prompt(self, context: Dict[str, Any], conversation_history: List[Dict]) -> str:
+        # Bounded regardless of interview length: relevant analysis fields, rolling summary, last K turns
+        payload = context_window.prepare(context, conversation_history)
+        return f"""
+        You are a friendly technical interviewer running a live voice interview.
+        Based on the interview context and conversation so far, ask ONE concise, natural follow-up question
+        about the candidate's last answer.
+        
+        Interview Context:
+        {json.dumps(payload["context"], indent=2)}
+        
+        Earlier Conversation (summary):
+        {payload["earlier_conversation_summary"] or "None"}
+        
+        Recent Turns:
+        {json.dumps(payload["recent_turns"], indent=2)}
+        
+        Return only the question text, no JSON formatting.
+        """
+
+    async def summarize_conversation(self, summary: str, turns: List[Dict]) -> str:
+        """Fold older interview turns into the rolling conversation summary"""
+        prompt = f"""
+        Update the running summary of a technical interview with the new turns below.
+        Keep what the candidate claimed, demonstrated or struggled with. Stay under 150 words.
+        
+        Current Summary:
+        {summary or "None"}
+        
+        New Turns:
+        {json.dumps(turns, indent=2)}
+        
+        Return only the updated summary text.
+        """
+        response = await self.llm.ainvoke([HumanMessage(content=prompt)])
+        return response.content.strip()
+
+    async def stream_followup_question(self, context: Dict[str, Any], conversation_history: List[Dict]) -> AsyncIterator[str]:
+        """Stream a follow-up question token by token"""
+        prompt = self._followup_prompt(context, conversation_history)
+        async for chunk in self.llm.astream([HumanMessage(content=prompt)]):
+            if chunk.content:
+                yield chunk.content
+
+    async def generate_followup_question(self, context: Dict[str, Any], conversation_history: List[Dict]) -> str:
+        """Generate a complete follow-up question"""
+        prompt = self._followup_prompt(context, conversation_history)
+        response = await self.llm.ainvoke([HumanMessage(content=prompt)])
+        return response.content.strip()
+
     async def generate_feedback(self, transcript: str) -> Dict[str, Any]:
         """Generate feedback for an interview transcript"""
+        chunks = self._chunk_transcript(transcript)
+        if len(chunks) <= 1:
+            return await self._generate_feedback_single(transcript)
+        
+        # Map: score each chunk of Q/A exchanges concurrently, reduce: merge into one report
+        logger.info(f"Generating feedback with map-reduce over {len(chunks)} transcript chunks")
+        semaphore = asyncio.Semaphore(FEEDBACK_MAP_CONCURRENCY)
+        
+        async def score(chunk: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                return await self._score_transcript_chunk(chunk)
+        
+        results = await asyncio.gather(*(score(chunk) for chunk in chunks))
+        scored = [(chunk, result) for chunk, result in zip(chunks, results) if result]
+        if not any(coerce_score(result.get("score")) is not None for _, result in scored):
+            logger.warning("No transcript chunk returned a usable score, scoring the transcript in one call")
+            return await self._generate_feedback_single(transcript)
+        
+        return await self._reduce_feedback(scored)
+
+    async def score_answer(self, question: str, answer: str) -> Optional[Dict[str, Any]]:
+        """Score a single answer against its question"""
+        return await self._score_transcript_chunk(f"interviewer: {question}\ncandidate: {answer}")
+
+    async def aggregate_answer_feedback(self, answers: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, Any]:
+        """Build interview feedback from precomputed per-answer scores (overall_score None if none is usable)"""
+        return await self._reduce_feedback(answers)
+
+    def _split_transcript_turns(self, transcript: str) -> List[Tuple[str, str]]:
+        """Split a "role: text" transcript into (role, text) turns"""
+        turns: List[Tuple[str, str]] = []
+        for line in transcript.splitlines():
+            match = TRANSCRIPT_TURN_PATTERN.match(line)
+            if match:
+                role = "interviewer" if match.group(1).lower() in INTERVIEWER_ROLES else "candidate"
+                turns.append((role, match.group(2).strip()))
+            elif line.strip() and turns:
+                turns[-1] = (turns[-1][0], f"{turns[-1][1]} {line.strip()}")
+            elif line.strip():
+                turns.append(("candidate", line.strip()))
+        return turns
+
+    def _chunk_transcript(self, transcript: str) -> List[str]:
+        """Group turns into question/answer exchanges and pack them into bounded chunks"""
+        exchanges: List[List[str]] = []
+        previous_role = None
+        for role, text in self._split_transcript_turns(transcript):
+            # A new exchange starts whenever the interviewer speaks after the candidate
+            if not exchanges or (role == "interviewer" and previous_role == "candidate"):
+                exchanges.append([])
+            exchanges[-1].append(f"{role}: {text}")
+            previous_role = role
+        
+        chunks: List[str] = []
+        current = ""
+        for exchange in exchanges:
+            block = "\n".join(exchange)
+            for piece in self._split_exchange(block) if len(block) > FEEDBACK_CHUNK_CHARS else [block]:
+                if current and len(current) + len(piece) > FEEDBACK_CHUNK_CHARS:
+                    chunks.append(current)
+                    current = ""
+                current = f"{current}\n{piece}" if current else piece
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def _split_exchange(self, block: str) -> List[str]:
+        """Cut one exchange longer than the chunk budget into pieces that fit, each led by its question"""
+        lines = block.split("\n")
+        header = ""
+        if len(lines) > 1 and lines[0].startswith("interviewer: "):
+            header = lines.pop(0)[:FEEDBACK_CHUNK_CHARS // 4] + "\n"
+        body = "\n".join(lines)
+        size = FEEDBACK_CHUNK_CHARS - len(header)
+        pieces: List[str] = []
+        while body:
+            cut = len(body)
+            if cut > size:
+                # Prefer a line or word boundary in the back half; hard-cut a single unbroken run
+                cut = max(body.rfind("\n", 0, size), body.rfind(" ", 0, size))
+                if cut < size // 2:
+                    cut = size
+            pieces.append(header + body[:cut].rstrip())
+            body = body[cut:].lstrip()
+        return pieces
+
+    def _parse_json_content(self, content: str) -> Any:
+        """Parse a JSON payload that may be wrapped in markdown code fences"""
+        if "```json" in content:
+            content = content.split("```json")[1].split("```")[0]
+        elif "```" in content:
+            content = content.split("```")[1].split("```")[0]
+        return json.loads(content.strip())
+
+    async def _score_transcript_chunk(self, chunk: str) -> Optional[Dict[str, Any]]:
+        """Map step: score one slice of the interview"""
+        prompt = f"""
+        You are an expert interview coach. Score the candidate's answers in this excerpt of an interview.
+        
+        Excerpt:
+        {chunk}
+        
+        Return ONLY a JSON object:
+        {{
+            "score": 0-100,
+            "strong_points": ["point 1"],
+            "areas_to_improve": ["area 1"],
+            "notes": "Two or three sentences on how the candidate answered"
+        }}
+        """
+        
+        try:
+            response = await self.llm.ainvoke([HumanMessage(content=prompt)])
+            result = self._parse_json_content(response.content)
+            return result if isinstance(result, dict) else None
+        except Exception as e:
+            logger.error(f"Error scoring transcript chunk: {e}")
+            return None
+
+    def _merge_chunk_feedback(self, scored: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Deterministic merge of chunk results, weighted by chunk length. overall_score is None
+        when no chunk has a usable score, rather than an invented 0.
+        """
+        # Chunks whose score can't be read still contribute their points and notes
+        weighted = [(coerce_score(result.get("score")), len(chunk)) for chunk, result in scored]
+        weighted = [(score, weight) for score, weight in weighted if score is not None]
+        unscored = len(scored) - len(weighted)
+        if unscored:
+            logger.warning(f"{unscored} of {len(scored)} feedback chunks had no usable score")
+        total_weight = sum(weight for _, weight in weighted)
+        overall = sum(score * weight for score, weight in weighted) / total_weight if weighted else None
+        
+        def collect(field: str) -> List[str]:
+            items: List[str] = []
+            for _, result in scored:
+                for item in result.get(field, []) or []:
+                    if isinstance(item, str) and item not in items:
+                        items.append(item)
+            return items
+        
+        return {
+            "summary": "",
+            "overall_score": round(overall) if overall is not None else None,
+            "strong_points": collect("strong_points"),
+            "areas_to_improve": collect("areas_to_improve"),
+            "detailed_analysis": "\n\n".join(result.get("notes", "") for _, result in scored if result.get("notes"))
+        }
+
+    async def _reduce_feedback(self, scored: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, Any]:
+        """Reduce step: merge per-chunk results into the FeedbackResponse shape"""
+        merged = self._merge_chunk_feedback(scored)
+        
+        prompt = f"""
+        You are an expert interview coach. These are scores and notes for consecutive parts of one interview:
+        
+        {json.dumps([result for _, result in scored], indent=2)}
+        
+        Merge them into one overall assessment. Deduplicate and keep the most important points.
+        
+        Return ONLY a JSON object:
+        {{
+            "summary": "Brief summary of the candidate's performance",
+            "strong_points": ["point 1", "point 2"],
+            "areas_to_improve": ["area 1", "area 2"],
+            "detailed_analysis": "Detailed feedback..."
+        }}
+        """
+        
+        try:
+            response = await self.llm.ainvoke([HumanMessage(content=prompt)])
+            reduced = self._parse_json_content(response.content)
+            if isinstance(reduced, dict):
+                # The score stays the length-weighted mean of the chunk scores
+                merged.update({k: v for k, v in reduced.items() if k != "overall_score" and v})
+        except Exception as e:
+            logger.error(f"Error reducing feedback, using merged chunk results: {e}")
+        
+        if not merged["summary"] and merged["overall_score"] is not None:
+            merged["summary"] = f"Overall score {merged['overall_score']}/100 across {len(scored)} interview segments"
+        return merged
+
+    async def _generate_feedback_single(self, transcript: str) -> Dict[str, Any]:
+        """Generate feedback for a short transcript in a single call"""
         try:
             prompt = f"""
             You are an expert interview coach. Analyze the following interview transcript and provide constructive feedback.
@@ -153,7 +486,7 @@ class LangGraphService:
                 logger.error(f"Error parsing feedback JSON: {e}")
                 return {
                     "summary": "Feedback generation partially failed",
-                    "overall_score": 0,
+                    "overall_score": None,
                     "strong_points": [],
                     "areas_to_improve": [],
                     "detailed_analysis": content
@@ -163,7 +496,7 @@ class LangGraphService:
             logger.error(f"Error generating feedback: {e}")
             return {
                 "summary": "Error generating feedback",
-                "overall_score": 0,
+                "overall_score": None,
                 "strong_points": [],
                 "areas_to_improve": [],
                 "detailed_analysis": "An error occurred while analyzing the interview."
@@ -175,6 +508,23 @@ class LangGraphService:
         logger.info("Analyzing job description...")
         job_desc = state["job_description"]
         
+        # Popular JDs are analyzed once and served stale-while-revalidate
+        digest = hashlib.sha256(" ".join(job_desc.split()).lower().encode()).hexdigest()
+        try:
+            analysis = await redis_service.get_or_compute(
+                f"{CacheKeys.JOB_ANALYSIS}:{PROMPT_VERSION}:{digest}",
+                lambda: self._compute_job_analysis(job_desc),
+                soft_ttl=CACHE_SOFT_TTL_ANALYSIS,
+                ttl=CACHE_TTL_ANALYSIS,
+                tags=[cache_tag("prompt", PROMPT_VERSION)]
+            )
+            return {"job_analysis": analysis}
+        except JobAnalysisParseError as e:
+            logger.error(f"Error parsing job analysis: {e}")
+            return {"job_analysis": {"error": str(e), "raw": e.raw}}
+
+    async def _compute_job_analysis(self, job_desc: str) -> Dict[str, Any]:
+        """Uncached job description analysis; raises JobAnalysisParseError so failures aren't cached"""
         prompt = f"""
         Analyze the following job description and extract comprehensive information:
         
@@ -205,11 +555,9 @@ class LangGraphService:
         try:
             # Basic JSON parsing cleanup
             content = response.content.replace("```json", "").replace("```", "").strip()
-            analysis = json.loads(content)
-            return {"job_analysis": analysis}
+            return json.loads(content)
         except Exception as e:
-            logger.error(f"Error parsing job analysis: {e}")
-            return {"job_analysis": {"error": str(e), "raw": response.content}}
+            raise JobAnalysisParseError(str(e), response.content)
 
     async def _analyze_resume(self, state: GraphState) -> Dict[str, Any]:
         logger.info("Analyzing resume with job context...")
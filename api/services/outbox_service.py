@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from services.redis_service import redis_service
+from services.supabase_service import supabase_service
+from utils.cache_keys import CacheKeys
+from config import ANALYSIS_OUTBOX_FLUSH_INTERVAL, ANALYSIS_OUTBOX_BATCH_SIZE, ANALYSIS_OUTBOX_MAX_BACKOFF
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisOutbox:
+    """
+    Write-behind persistence for completed analyses. enqueue() stores the row, with a
+    pre-assigned id, in a Redis hash and returns; a background flusher inserts batches into
+    the database idempotently, retrying with backoff. Resume and job description text travels
+    with the queued row and is written to text_blobs just before the insert. Rows the database
+    rejects outright are moved to a dead-letter hash instead of blocking the queue.
+
+    While Redis is unavailable the row is written through to the database instead, so a worker
+    restart can't lose it; only if the database write fails too is it held in this worker's
+    memory until the flusher gets it through (lost if the worker dies first).
+    """
+
+    def __init__(self):
+        self._wake: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self.stats = {
+            "enqueued": 0,
+            "written_through": 0,   # Redis down: inserted synchronously instead of queued
+            "held_in_memory": 0,    # Redis and the database both failed: queued in this worker only
+            "flushed": 0,
+            "batches": 0,
+            "retries": 0,
+            "dead_lettered": 0,
+            "blobs_written": 0,
+            "served_from_outbox": 0,
+        }
+
+    async def enqueue(self, analysis_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Assign id/created_at and queue the row; returns it as it will be stored"""
+        row = {
+            **analysis_data,
+            "id": analysis_data.get("id") or str(uuid.uuid4()),
+            "created_at": analysis_data.get("created_at") or datetime.now(timezone.utc).isoformat(),
+        }
+        if not await redis_service.put_hash_entry(CacheKeys.ANALYSIS_OUTBOX, row["id"], row, memory_fallback=False):
+            try:
+                await self._insert([row])
+                self.stats["written_through"] += 1
+                return row
+            except Exception as e:
+                # The flusher retries it, or dead-letters it if the row itself was rejected
+                logger.error(f"Analysis {row['id']} could not be written through, holding it in memory: {e}")
+                await redis_service.put_hash_entry(CacheKeys.ANALYSIS_OUTBOX, row["id"], row)
+                self.stats["held_in_memory"] += 1
+        self.stats["enqueued"] += 1
+        if self._wake:
+            self._wake.set()
+        return row
+
+    async def get(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        """A row that has not reached Supabase yet, if any"""
+        row = await redis_service.get_hash_entry(CacheKeys.ANALYSIS_OUTBOX, analysis_id)
+        if row is not None:
+            self.stats["served_from_outbox"] += 1
+        return row
+
+    async def ensure_flushed(self, analysis_id: str) -> bool:
+        """Write a pending row now (e.g. before inserting rows that reference it)"""
+        row = await redis_service.get_hash_entry(CacheKeys.ANALYSIS_OUTBOX, analysis_id)
+        if row is None:
+            return True
+        return await self._flush_rows({analysis_id: row}) == 1
+
+    def start(self) -> None:
+        if self._flusher is None or self._flusher.done():
+            self._wake = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._flusher = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flusher after one last attempt to drain the queue"""
+        if self._flusher:
+            self._flusher.cancel()
+            self._flusher = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Final analysis outbox flush failed: {e}")
+
+    async def _run(self) -> None:
+        backoff = ANALYSIS_OUTBOX_FLUSH_INTERVAL
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=backoff)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+                backoff = ANALYSIS_OUTBOX_FLUSH_INTERVAL
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["retries"] += 1
+                backoff = min(max(backoff, ANALYSIS_OUTBOX_FLUSH_INTERVAL) * 2, ANALYSIS_OUTBOX_MAX_BACKOFF)
+                logger.warning(f"Analysis outbox flush failed, retrying in {backoff:.0f}s: {e}")
+
+    async def flush(self) -> int:
+        """Drain the outbox in batches; raises on a retryable failure"""
+        flushed = 0
+        while True:
+            rows = await redis_service.scan_hash_entries(CacheKeys.ANALYSIS_OUTBOX, ANALYSIS_OUTBOX_BATCH_SIZE)
+            if not rows:
+                return flushed
+            written = await self._flush_rows(rows, raise_retryable=True)
+            flushed += written
+            if len(rows) < ANALYSIS_OUTBOX_BATCH_SIZE:
+                return flushed
+
+    async def _flush_rows(self, rows: Dict[str, Dict[str, Any]], raise_retryable: bool = False) -> int:
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            try:
+                await self._insert(list(rows.values()))
+                await redis_service.delete_hash_entries(CacheKeys.ANALYSIS_OUTBOX, *rows)
+                self.stats["batches"] += 1
+                self.stats["flushed"] += len(rows)
+                return len(rows)
+            except Exception as e:
+                if not supabase_service.is_permanent_error(e):
+                    if raise_retryable:
+                        raise
+                    logger.error(f"Error flushing analyses: {e}")
+                    return 0
+            # Some row is bad: insert one by one so the rest get through
+            try:
+                return await self._flush_individually(rows)
+            except Exception as e:
+                if raise_retryable:
+                    raise
+                logger.error(f"Error flushing analyses: {e}")
+                return 0
+
+    async def _insert(self, rows: List[Dict[str, Any]]) -> None:
+        stored, blobs_written = await supabase_service.externalize_texts(rows)
+        self.stats["blobs_written"] += blobs_written
+        await supabase_service.insert_batch("analyses", stored)
+
+    async def _flush_individually(self, rows: Dict[str, Dict[str, Any]]) -> int:
+        written = 0
+        for analysis_id, row in rows.items():
+            try:
+                await self._insert([row])
+            except Exception as e:
+                if not supabase_service.is_permanent_error(e):
+                    raise
+                logger.error(f"Analysis {analysis_id} rejected by the database, dead-lettered: {e}")
+                await redis_service.put_hash_entry(CacheKeys.ANALYSIS_DEAD_LETTER, analysis_id, {**row, "error": str(e)})
+                self.stats["dead_lettered"] += 1
+            else:
+                written += 1
+                self.stats["flushed"] += 1
+            await redis_service.delete_hash_entries(CacheKeys.ANALYSIS_OUTBOX, analysis_id)
+        return written
+
+    async def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "pending": await redis_service.get_hash_size(CacheKeys.ANALYSIS_OUTBOX)}
+
+
+analysis_outbox = AnalysisOutbox()
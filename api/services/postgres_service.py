@@ -0,0 +1,350 @@
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import asyncpg
+
+from config import DATABASE_POOL_SIZE, DATABASE_TIMEOUT
+from services.repository import (
+    Repository, ANALYSIS_SUMMARY_COLUMNS, INTERVIEW_SUMMARY_COLUMNS, PERMANENT_SQLSTATES, text_hash
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _row(record: asyncpg.Record) -> Dict[str, Any]:
+    """A record as PostgREST would return it: timestamps as ISO 8601 strings"""
+    return {key: value.isoformat() if isinstance(value, datetime) else value for key, value in record.items()}
+
+
+def _keyset(after: Optional[Tuple[str, str]], first_param: int) -> Tuple[str, List[str]]:
+    """Extra WHERE clause and args for a page after the (created_at, id) cursor"""
+    if not after:
+        return "", []
+    return f" AND (created_at, id) < (${first_param}::text::timestamptz, ${first_param + 1}::uuid)", list(after)
+
+
+async def _init_connection(conn: asyncpg.Connection) -> None:
+    # Same value shapes as PostgREST's JSON: ids as strings, JSON(B) as Python objects
+    await conn.set_type_codec("uuid", encoder=str, decoder=str, schema="pg_catalog", format="text")
+    for json_type in ("json", "jsonb"):
+        await conn.set_type_codec(json_type, encoder=json.dumps, decoder=json.loads, schema="pg_catalog")
+
+
+class PostgresService(Repository):
+    """
+    The same schema over a direct asyncpg pool instead of PostgREST: no HTTP hop, and a
+    local Postgres (python migrate.py against it) is enough for offline benchmarks.
+    Embedded relations are built with jsonb_agg so rows match the PostgREST shapes.
+    """
+
+    def __init__(self, database_url: Optional[str]):
+        self.database_url = database_url
+        self.pool: Optional[asyncpg.Pool] = None
+        self._pool_lock = asyncio.Lock()
+        if not database_url:
+            logger.warning("DATABASE_URL not set. Database features will be disabled.")
+
+    async def _get_pool(self) -> asyncpg.Pool:
+        # Created on first use: the service is constructed at import time, outside the event loop
+        if self.pool is None:
+            async with self._pool_lock:
+                if self.pool is None:
+                    self.pool = await asyncpg.create_pool(
+                        self.database_url,
+                        min_size=1,
+                        max_size=DATABASE_POOL_SIZE,
+                        command_timeout=DATABASE_TIMEOUT,
+                        init=_init_connection,
+                        server_settings={"timezone": "UTC"}
+                    )
+                    logger.info("Postgres pool initialized")
+        return self.pool
+
+    async def close(self) -> None:
+        if self.pool:
+            await self.pool.close()
+            self.pool = None
+
+    def is_permanent_error(self, error: Exception) -> bool:
+        if type(error) is asyncpg.DataError:
+            # An argument asyncpg refused to encode (client-side, reported as SQLSTATE 22000);
+            # the server's class 22 errors are subclasses and go through PERMANENT_SQLSTATES
+            return True
+        return isinstance(error, asyncpg.PostgresError) and error.sqlstate in PERMANENT_SQLSTATES
+
+    async def _fetch(self, query: str, *args: Any) -> List[Dict[str, Any]]:
+        pool = await self._get_pool()
+        return [_row(record) for record in await pool.fetch(query, *args)]
+
+    async def _insert(self, table: str, rows: List[Dict[str, Any]], on_conflict: str = "", returning: str = "*") -> List[Dict[str, Any]]:
+        """INSERT ... SELECT from jsonb_populate_recordset, like PostgREST; columns no row sets keep their defaults"""
+        columns = ",".join(_ident(column) for column in dict.fromkeys(key for row in rows for key in row))
+        query = (
+            f"INSERT INTO {_ident(table)} ({columns}) "
+            f"SELECT {columns} FROM jsonb_populate_recordset(NULL::{_ident(table)}, $1) {on_conflict}"
+        )
+        if returning:
+            query += f" RETURNING {returning}"
+        return await self._fetch(query, rows)
+
+    async def _update(self, table: str, row_id: str, updates: Dict[str, Any]) -> None:
+        assignments = ", ".join(f"{_ident(column)} = r.{_ident(column)}" for column in updates)
+        pool = await self._get_pool()
+        await pool.execute(
+            f"UPDATE {_ident(table)} SET {assignments} "
+            f"FROM jsonb_populate_record(NULL::{_ident(table)}, $2) r WHERE {_ident(table)}.id = $1",
+            row_id, updates
+        )
+
+    async def _first(self, query: str, *args: Any) -> Optional[Dict[str, Any]]:
+        rows = await self._fetch(query, *args)
+        return rows[0] if rows else None
+
+    async def get_user(self, firebase_uid: str) -> Optional[Dict[str, Any]]:
+        if not self.database_url: return None
+        try:
+            return await self._first("SELECT * FROM users WHERE firebase_uid = $1 LIMIT 1", firebase_uid)
+        except Exception as e:
+            logger.error(f"Error fetching user: {e}")
+            return None
+
+    async def create_user(self, user_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if not self.database_url: return None
+        try:
+            data = await self._insert("users", [user_data])
+            return data[0] if data else None
+        except Exception as e:
+            logger.error(f"Error creating user: {e}")
+            return None
+
+    async def create_analysis(self, analysis_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if not self.database_url: return None
+        try:
+            rows, _ = await self.externalize_texts([analysis_data])
+            data = await self._insert("analyses", rows)
+            return data[0] if data else None
+        except Exception as e:
+            logger.error(f"Error creating analysis: {e}")
+            return None
+
+    async def insert_batch(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        if not self.database_url:
+            raise RuntimeError("DATABASE_URL not configured")
+        await self._insert(table, rows, on_conflict="ON CONFLICT (id) DO NOTHING", returning="")
+
+    async def store_text_blobs(self, texts: List[str]) -> int:
+        if not self.database_url:
+            raise RuntimeError("DATABASE_URL not configured")
+        blobs = {text_hash(text): text for text in texts if text}
+        if not blobs:
+            return 0
+        existing = await self._fetch("SELECT hash FROM text_blobs WHERE hash = ANY($1::text[])", list(blobs))
+        stored = {row["hash"] for row in existing}
+        missing = [
+            {"hash": digest, "content": text, "size": len(text)}
+            for digest, text in blobs.items() if digest not in stored
+        ]
+        if missing:
+            await self._insert("text_blobs", missing, on_conflict="ON CONFLICT (hash) DO NOTHING", returning="")
+        return len(missing)
+
+    async def get_text_blobs(self, hashes: List[str]) -> Dict[str, str]:
+        hashes = [digest for digest in set(hashes) if digest]
+        if not self.database_url or not hashes: return {}
+        try:
+            data = await self._fetch("SELECT hash, content FROM text_blobs WHERE hash = ANY($1::text[])", hashes)
+            return {row["hash"]: row["content"] for row in data}
+        except Exception as e:
+            logger.error(f"Error fetching text blobs: {e}")
+            return {}
+
+    async def get_analysis(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        if not self.database_url: return None
+        try:
+            return await self._first("SELECT * FROM analyses WHERE id = $1", analysis_id)
+        except Exception as e:
+            logger.error(f"Error fetching analysis: {e}")
+            return None
+
+    async def _get_owned(self, table: str, row_id: str, children: str, fk_column: str, child_order: str,
+                         firebase_uid: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """The row, its children as a JSON array and its owner's firebase_uid, in one statement"""
+        row = await self._first(
+            f"SELECT p.*, u.firebase_uid AS owner_firebase_uid, "
+            f"COALESCE((SELECT jsonb_agg(c ORDER BY {child_order}) FROM {children} c WHERE c.{fk_column} = p.id), '[]') AS {children} "
+            f"FROM {table} p LEFT JOIN users u ON u.id = p.user_id WHERE p.id = $1",
+            row_id
+        )
+        if not row:
+            return None, False
+        return row, row.pop("owner_firebase_uid") == firebase_uid
+
+    async def get_analysis_detail(self, analysis_id: str, firebase_uid: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+        if not self.database_url: return None, False
+        try:
+            return await self._get_owned("analyses", analysis_id, "interviews", "analysis_id", "c.created_at DESC", firebase_uid)
+        except Exception as e:
+            logger.error(f"Error fetching analysis detail: {e}")
+            return None, False
+
+    async def get_interview_detail(self, interview_id: str, firebase_uid: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+        if not self.database_url: return None, False
+        try:
+            return await self._get_owned("interviews", interview_id, "questions", "interview_id", "c.order_index", firebase_uid)
+        except Exception as e:
+            logger.error(f"Error fetching interview detail: {e}")
+            return None, False
+
+    async def get_interview_with_analysis(self, interview_id: str) -> Optional[Dict[str, Any]]:
+        if not self.database_url: return None
+        try:
+            return await self._first(
+                "SELECT i.*, "
+                "COALESCE((SELECT jsonb_agg(jsonb_build_object('content', q.content, 'order_index', q.order_index) "
+                "ORDER BY q.order_index) FROM questions q WHERE q.interview_id = i.id), '[]') AS questions, "
+                "(SELECT jsonb_build_object('synthesis_result', a.synthesis_result) FROM analyses a "
+                "WHERE a.id = i.analysis_id) AS analyses "
+                "FROM interviews i WHERE i.id = $1",
+                interview_id
+            )
+        except Exception as e:
+            logger.error(f"Error fetching interview with analysis: {e}")
+            return None
+
+    async def create_with_children(self, parent_table: str, parent: Dict[str, Any], child_table: str,
+                                   fk_column: str, children: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if not self.database_url: return None
+        try:
+            pool = await self._get_pool()
+            return await pool.fetchval(
+                "SELECT insert_with_children($1, $2, $3, $4, $5)",
+                parent_table, parent, child_table, fk_column, children
+            )
+        except Exception as e:
+            logger.error(f"Error inserting {parent_table} with {child_table}: {e}")
+            return None
+
+    async def create_interview(self, interview_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if not self.database_url: return None
+        try:
+            data = await self._insert("interviews", [interview_data])
+            return data[0] if data else None
+        except Exception as e:
+            logger.error(f"Error creating interview: {e}")
+            return None
+
+    async def get_interview(self, interview_id: str) -> Optional[Dict[str, Any]]:
+        if not self.database_url: return None
+        try:
+            return await self._first("SELECT * FROM interviews WHERE id = $1", interview_id)
+        except Exception as e:
+            logger.error(f"Error fetching interview: {e}")
+            return None
+
+    async def update_interview(self, interview_id: str, updates: Dict[str, Any]) -> bool:
+        if not self.database_url: return False
+        try:
+            await self._update("interviews", interview_id, updates)
+            return True
+        except Exception as e:
+            logger.error(f"Error updating interview: {e}")
+            return False
+
+    async def add_questions(self, questions: List[Dict[str, Any]]) -> bool:
+        if not self.database_url: return False
+        try:
+            await self._insert("questions", questions, returning="")
+            return True
+        except Exception as e:
+            logger.error(f"Error adding questions: {e}")
+            return False
+
+    async def get_interview_questions(self, interview_id: str) -> List[Dict[str, Any]]:
+        if not self.database_url: return []
+        try:
+            return await self._fetch("SELECT * FROM questions WHERE interview_id = $1 ORDER BY order_index", interview_id)
+        except Exception as e:
+            logger.error(f"Error fetching questions: {e}")
+            return []
+
+    async def create_response(self, response_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if not self.database_url: return None
+        try:
+            data = await self._insert("responses", [response_data])
+            return data[0] if data else None
+        except Exception as e:
+            logger.error(f"Error creating response: {e}")
+            return None
+
+    async def update_response(self, response_id: str, updates: Dict[str, Any]) -> bool:
+        if not self.database_url: return False
+        try:
+            await self._update("responses", response_id, updates)
+            return True
+        except Exception as e:
+            logger.error(f"Error updating response: {e}")
+            return False
+
+    async def get_interview_responses(self, interview_id: str) -> List[Dict[str, Any]]:
+        if not self.database_url: return []
+        try:
+            return await self._fetch(
+                "SELECT r.*, jsonb_build_object('interview_id', q.interview_id, 'content', q.content, "
+                "'order_index', q.order_index) AS questions "
+                "FROM responses r JOIN questions q ON q.id = r.question_id "
+                "WHERE q.interview_id = $1 ORDER BY r.created_at",
+                interview_id
+            )
+        except Exception as e:
+            logger.error(f"Error fetching interview responses: {e}")
+            return []
+
+    async def _user_page(self, table: str, columns: str, user_id: str, limit: int,
+                         after: Optional[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        clause, args = _keyset(after, 3)
+        return await self._fetch(
+            f"SELECT {columns} FROM {table} WHERE user_id = $1{clause} ORDER BY created_at DESC, id DESC LIMIT $2",
+            user_id, limit, *args
+        )
+
+    async def get_user_analyses(self, user_id: str, limit: int = 5, after: Optional[Tuple[str, str]] = None) -> List[Dict[str, Any]]:
+        if not self.database_url: return []
+        try:
+            return await self._user_page("analyses", ANALYSIS_SUMMARY_COLUMNS, user_id, limit, after)
+        except Exception as e:
+            logger.error(f"Error fetching user analyses: {e}")
+            return []
+
+    async def get_user_interviews(self, user_id: str, limit: int = 5, after: Optional[Tuple[str, str]] = None) -> List[Dict[str, Any]]:
+        if not self.database_url: return []
+        try:
+            return await self._user_page("interviews", INTERVIEW_SUMMARY_COLUMNS, user_id, limit, after)
+        except Exception as e:
+            logger.error(f"Error fetching user interviews: {e}")
+            return []
+
+    async def get_user_stats(self, user_id: str) -> Dict[str, Any]:
+        stats = {"analysis_count": 0, "interview_count": 0, "score_sum": 0, "score_count": 0, "last_activity_at": None}
+        if not self.database_url: return stats
+        try:
+            row = await self._first("SELECT * FROM user_stats WHERE user_id = $1", user_id)
+            if row:
+                stats.update(row)
+        except Exception as e:
+            logger.error(f"Error fetching user stats: {e}")
+        return stats
+
+    async def get_analysis_interviews(self, analysis_id: str) -> List[Dict[str, Any]]:
+        if not self.database_url: return []
+        try:
+            return await self._fetch("SELECT * FROM interviews WHERE analysis_id = $1 ORDER BY created_at DESC", analysis_id)
+        except Exception as e:
+            logger.error(f"Error fetching analysis interviews: {e}")
+            return []
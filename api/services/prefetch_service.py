@@ -0,0 +1,126 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Set
+from services.redis_service import redis_service
+from services.langgraph_service import langgraph_service
+from utils.cache_keys import CacheKeys, cache_tag
+from config import (
+    INTERVIEW_PREFETCH_ENABLED,
+    INTERVIEW_PREFETCH_CONCURRENCY,
+    INTERVIEW_PREFETCH_MAX_PENDING,
+    CACHE_TTL_INTERVIEW,
+    PROMPT_VERSION,
+)
+
+logger = logging.getLogger(__name__)
+
+# Counters mirrored into Redis: a set prefetched by one worker is often served by another,
+# so "wasted" and "hit_rate" are only meaningful summed across the fleet
+FLEET_COUNTERS = ("completed", "used", "awaited", "missed")
+
+
+class InterviewPrefetchService:
+    """Speculatively generates interview questions as soon as an analysis completes"""
+
+    def __init__(self):
+        self.enabled = INTERVIEW_PREFETCH_ENABLED
+        self._semaphore = asyncio.Semaphore(INTERVIEW_PREFETCH_CONCURRENCY)
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._running: Set[str] = set()
+        self.stats = {
+            "scheduled": 0,
+            "dropped": 0,     # queue full, never started
+            "completed": 0,
+            "failed": 0,
+            "used": 0,        # prefetched set served by /interview/generate
+            "awaited": 0,     # served after waiting on an in-flight prefetch
+            "missed": 0,      # /interview/generate found nothing prefetched
+        }
+
+    async def _count(self, name: str) -> None:
+        self.stats[name] += 1
+        if name in FLEET_COUNTERS:
+            await redis_service.increment_counters(CacheKeys.INTERVIEW_PREFETCH_STATS, {name: 1})
+
+    def _key(self, analysis_id: str) -> str:
+        return f"{CacheKeys.INTERVIEW_PREFETCH}:{analysis_id}"
+
+    def schedule(self, analysis_id: str, skill_gaps: List[str], focus_areas: List[str]) -> bool:
+        """Start generating questions for an analysis in the background"""
+        if not self.enabled or analysis_id in self._tasks:
+            return False
+        if len(self._tasks) >= INTERVIEW_PREFETCH_MAX_PENDING:
+            self.stats["dropped"] += 1
+            logger.warning(f"Interview prefetch queue full, skipping analysis {analysis_id}")
+            return False
+
+        task = asyncio.create_task(self._prefetch(analysis_id, skill_gaps, focus_areas))
+        self._tasks[analysis_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(analysis_id, None))
+        self.stats["scheduled"] += 1
+        return True
+
+    async def _prefetch(self, analysis_id: str, skill_gaps: List[str], focus_areas: List[str]) -> Optional[List[str]]:
+        async with self._semaphore:
+            self._running.add(analysis_id)
+            try:
+                questions = await langgraph_service.generate_interview_questions(skill_gaps, focus_areas)
+                await redis_service.set_cached(
+                    self._key(analysis_id), {"questions": questions}, CACHE_TTL_INTERVIEW,
+                    tags=[cache_tag("analysis", analysis_id), cache_tag("prompt", PROMPT_VERSION)]
+                )
+                await self._count("completed")
+                logger.info(f"Prefetched {len(questions)} interview questions for analysis {analysis_id}")
+                return questions
+            except Exception as e:
+                self.stats["failed"] += 1
+                logger.error(f"Interview prefetch failed for analysis {analysis_id}: {e}")
+                return None
+            finally:
+                self._running.discard(analysis_id)
+
+    async def consume(self, analysis_id: str) -> Optional[List[str]]:
+        """Return prefetched questions for an analysis if they are ready (or in flight here)"""
+        if not self.enabled:
+            return None
+
+        task = self._tasks.get(analysis_id)
+        if task is not None and analysis_id not in self._running:
+            # Still queued behind the concurrency cap; generating inline is faster
+            task.cancel()
+        elif task is not None:
+            # Waiting on the in-flight call is never slower than starting a new one
+            questions = await asyncio.shield(task)
+            if questions:
+                await self._count("awaited")
+                await redis_service.delete_cached(self._key(analysis_id))
+                return questions
+
+        cached = await redis_service.get_cached(self._key(analysis_id))
+        if cached and cached.get("questions"):
+            await self._count("used")
+            await redis_service.delete_cached(self._key(analysis_id))
+            return cached["questions"]
+
+        await self._count("missed")
+        return None
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """This worker's counters, plus fleet-wide prefetch efficiency (None while Redis is down)"""
+        fleet = await redis_service.get_counters(CacheKeys.INTERVIEW_PREFETCH_STATS)
+        if fleet is not None:
+            counts = {name: fleet.get(name, 0) for name in FLEET_COUNTERS}
+            served = counts["used"] + counts["awaited"]
+            fleet = {
+                **counts,
+                "wasted": max(counts["completed"] - served, 0),
+                "hit_rate": round(served / max(served + counts["missed"], 1), 3),
+            }
+        return {
+            "worker": {**self.stats, "pending": len(self._tasks)},
+            "fleet": fleet,
+        }
+
+
+# Global prefetch service instance
+interview_prefetch_service = InterviewPrefetchService()
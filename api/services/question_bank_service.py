@@ -0,0 +1,103 @@
+import re
+import logging
+from typing import Dict, List
+from services.redis_service import redis_service
+from utils.cache_keys import CacheKeys
+from config import (
+    QUESTION_BANK_MIN_PER_SKILL,
+    QUESTION_BANK_MAX_PER_SKILL,
+    QUESTION_BANK_TTL,
+)
+
+logger = logging.getLogger(__name__)
+
+# Common spellings that should share one bank entry
+SKILL_ALIASES = {
+    "k8s": "kubernetes",
+    "js": "javascript",
+    "ts": "typescript",
+    "postgres": "postgresql",
+    "golang": "go",
+    "react.js": "react",
+    "reactjs": "react",
+    "node": "node.js",
+    "nodejs": "node.js",
+    "ml": "machine learning",
+    "system design interview": "system design",
+    "systems design": "system design",
+}
+
+
+def normalize_skill(skill: str) -> str:
+    """Normalize a skill/focus area into a stable bank key"""
+    text = re.sub(r"\([^)]*\)", " ", skill.lower())
+    text = re.sub(r"[^a-z0-9+#.\s-]", " ", text)
+    text = re.sub(r"\s+", " ", text).strip(" .-")
+    return SKILL_ALIASES.get(text, text)
+
+
+class QuestionBankService:
+    """Interview questions indexed by normalized skill, grown from past LLM generations"""
+
+    def __init__(self):
+        self.min_per_skill = QUESTION_BANK_MIN_PER_SKILL
+        self.max_per_skill = QUESTION_BANK_MAX_PER_SKILL
+
+    def _key(self, skill: str) -> str:
+        return f"{CacheKeys.QUESTION_BANK}:{skill}"
+
+    def normalize_skills(self, skill_gaps: List[str], focus_areas: List[str]) -> List[str]:
+        """Deduplicated, normalized skills in priority order (gaps first)"""
+        skills = []
+        for raw in list(skill_gaps or []) + list(focus_areas or []):
+            if not isinstance(raw, str):
+                continue
+            skill = normalize_skill(raw)
+            if skill and skill not in skills:
+                skills.append(skill)
+        return skills
+
+    async def lookup(self, skills: List[str], count: int) -> Dict[str, List[str]]:
+        """Return banked questions for every skill with sufficient coverage"""
+        if not skills:
+            return {}
+
+        per_skill = max(self.min_per_skill, -(-count // len(skills)))
+        samples = await redis_service.sample_sets([self._key(s) for s in skills], per_skill)
+
+        covered = {}
+        for skill in skills:
+            members = samples.get(self._key(skill), [])
+            if len(members) >= self.min_per_skill:
+                covered[skill] = members
+        return covered
+
+    async def add(self, questions_by_skill: Dict[str, List[str]]) -> None:
+        """Grow the bank with freshly generated questions, capped per skill"""
+        keys = {self._key(normalize_skill(s)): qs for s, qs in questions_by_skill.items() if qs}
+        if not keys:
+            return
+
+        sizes = await redis_service.get_set_sizes(list(keys))
+        for key, questions in keys.items():
+            room = self.max_per_skill - sizes.get(key, 0)
+            if room <= 0:
+                continue
+            clean = [q.strip() for q in questions if isinstance(q, str) and q.strip()]
+            await redis_service.add_to_set(key, clean[:room], QUESTION_BANK_TTL)
+
+    def assemble(self, skills: List[str], questions_by_skill: Dict[str, List[str]], count: int) -> List[str]:
+        """Pick `count` questions round-robin across skills, preserving skill priority"""
+        pools = [list(questions_by_skill.get(skill, [])) for skill in skills]
+        questions: List[str] = []
+        while len(questions) < count and any(pools):
+            for pool in pools:
+                if pool and len(questions) < count:
+                    question = pool.pop(0)
+                    if question not in questions:
+                        questions.append(question)
+        return questions
+
+
+# Global question bank instance
+question_bank_service = QuestionBankService()
@@ -1,133 +1,815 @@
-import redis
+import redis.asyncio as redis
 import json
+import time
+import uuid
+import asyncio
 import hashlib
-from typing import Optional, Dict, Any
+import random
+from typing import Optional, Dict, Any, Awaitable, Callable, List, Set, Tuple
 from datetime import datetime, timedelta
 import logging
-from config import REDIS_URL, CACHE_TTL_ANALYSIS, CACHE_TTL_INTERVIEW
+from config import (
+    REDIS_URL, CACHE_TTL_ANALYSIS, CACHE_TTL_INTERVIEW,
+    REDIS_POOL_SIZE, REDIS_POOL_TIMEOUT, REDIS_SOCKET_TIMEOUT, REDIS_CONNECT_TIMEOUT,
+    MEMORY_CACHE_MAX_BYTES, L1_CACHE_MAX_BYTES, L1_CACHE_TTLS, PROMPT_VERSION,
+    CACHE_COMPRESSION_THRESHOLD, CACHE_REFRESH_LOCK_TTL, CACHE_MISS_WAIT,
+    REDIS_HEALTH_CHECK_INTERVAL, REDIS_FAILURE_THRESHOLD, REDIS_REPROBE_MIN_DELAY,
+    REDIS_REPROBE_MAX_DELAY, REDIS_WARM_ON_RECOVERY, QUESTION_BANK_TTL
+)
+from utils.memory_cache import TTLLRUCache
+from utils.codec import PayloadCodec
+from utils.rate_limits import RateLimit, LocalSlidingWindow
+from utils.cache_keys import CacheKeys, cache_tag
 
 logger = logging.getLogger(__name__)
 
+CACHE_INVALIDATION_CHANNEL = "cache:invalidate"
+INVALIDATION_SCAN_COUNT = 1000  # SCAN/SSCAN hint per round trip
+INVALIDATION_BATCH_SIZE = 500  # keys per UNLINK
+CACHE_MISS_POLL_INTERVAL = 0.25  # seconds between reads while another worker recomputes
+
+# Sliding-window limiter: one sorted set of request timestamps per limit key.
+# KEYS = limit keys; ARGV = now_ms, unique member, then (limit, window_ms) per key.
+# Returns {allowed, {{count, reset_ms}, ...}}; counts include this request when allowed.
+SLIDING_WINDOW_LUA = """
+local now = tonumber(ARGV[1])
+local member = ARGV[2]
+local allowed = 1
+local results = {}
+for i, key in ipairs(KEYS) do
+    local limit = tonumber(ARGV[1 + i * 2])
+    local window = tonumber(ARGV[2 + i * 2])
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    local count = redis.call('ZCARD', key)
+    local reset = window
+    if count > 0 then
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        reset = tonumber(oldest[2]) + window - now
+    end
+    if count >= limit then
+        allowed = 0
+    end
+    results[i] = {count, reset}
+end
+if allowed == 1 then
+    for i, key in ipairs(KEYS) do
+        local window = tonumber(ARGV[2 + i * 2])
+        redis.call('ZADD', key, now, member)
+        redis.call('PEXPIRE', key, window)
+        results[i][1] = results[i][1] + 1
+    end
+end
+return {allowed, results}
+"""
+
+# Token lease from a shared fixed-window budget. KEYS[1] = budget key for the window;
+# ARGV = requested, limit, window_seconds. Returns {granted, remaining}.
+TOKEN_LEASE_LUA = """
+local used = tonumber(redis.call('GET', KEYS[1]) or '0')
+local granted = math.min(tonumber(ARGV[1]), tonumber(ARGV[2]) - used)
+if granted < 0 then
+    granted = 0
+end
+if granted > 0 then
+    redis.call('INCRBY', KEYS[1], granted)
+    redis.call('EXPIRE', KEYS[1], tonumber(ARGV[3]) * 2)
+end
+return {granted, tonumber(ARGV[2]) - used - granted}
+"""
+
 class RedisService:
     def __init__(self):
-        # In-memory fallback cache for when Redis is unavailable
-        self._memory_cache = {}
+        # Bounded in-memory fallback cache for when Redis is unavailable. Holds encoded payloads
+        # like L1 below: entries are sized exactly and callers never share a cached object.
+        self._memory_cache = TTLLRUCache(MEMORY_CACHE_MAX_BYTES, on_remove=self._forget_memory_tags)
+        # Question-bank sets as sorted member tuples, bounded and expiring like the cache above
+        self._memory_sets = TTLLRUCache(MEMORY_CACHE_MAX_BYTES)
+        # tag -> keys, and key -> tags so entries leaving the fallback cache drop out of their tags
+        self._memory_tags: Dict[str, Set[str]] = {}
+        self._memory_key_tags: Dict[str, Set[str]] = {}
+        self._memory_hashes: Dict[str, Dict[str, Any]] = {}
+        
+        # Per-process L1 in front of Redis (L2) for hot prefixes, kept consistent across
+        # workers by pub/sub invalidation messages. Stores the raw Redis payload so callers
+        # never share (and mutate) a cached object.
+        self._l1 = TTLLRUCache(L1_CACHE_MAX_BYTES)
+        self._worker_id = uuid.uuid4().hex
+        self._invalidation_task: Optional[asyncio.Task] = None
+        self.cache_stats = {
+            "l2_hits": 0,
+            "l2_misses": 0,
+            "invalidations_sent": 0,
+            "invalidations_received": 0,
+            "bytes_written": 0,
+            "bytes_read": 0,
+        }
+        # Stale-while-revalidate bookkeeping (see get_or_compute)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._refreshing: Set[asyncio.Task] = set()
+        self.swr_stats = {
+            "fresh_hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "refresh_failures": 0,
+            "waited_for_peer": 0,
+            "peer_wait_timeouts": 0,
+        }
+        self.codec = PayloadCodec(CACHE_COMPRESSION_THRESHOLD)
+        self._rate_limit_script = None
+        self._lease_script = None
+        self._local_limits = LocalSlidingWindow()
         
+        # Shared asyncio connection pool; callers wait up to REDIS_POOL_TIMEOUT for a free connection
+        self.pool = redis.BlockingConnectionPool.from_url(
+            REDIS_URL,
+            # Cached payloads are binary (see utils/codec.py); string replies are decoded where used
+            decode_responses=False,
+            max_connections=REDIS_POOL_SIZE,
+            timeout=REDIS_POOL_TIMEOUT,
+            socket_timeout=REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+            health_check_interval=30
+        )
+        # Set while Redis is reachable; the supervisor swaps it out and back in
+        self.redis_client: Optional[redis.Redis] = None
+        self._supervisor_task: Optional[asyncio.Task] = None
+        self.connection_stats = {
+            "state": "disconnected",
+            "since": time.time(),
+            "connects": 0,
+            "disconnects": 0,
+            "probe_failures": 0,
+            "health_check_failures": 0,
+            "warmed_entries": 0,
+            "last_error": None,
+        }
+
+    async def connect(self) -> bool:
+        """Try Redis once and start the connection supervisor (called on app startup)"""
         try:
-            self.redis_client = redis.from_url(REDIS_URL, decode_responses=True)
-            # Test connection
-            self.redis_client.ping()
-            logger.info("Redis connection established successfully")
+            await self._on_connected(await self._probe())
+            connected = True
         except Exception as e:
             logger.error(f"Failed to connect to Redis: {e}")
-            logger.warning("Using in-memory cache as fallback")
-            self.redis_client = None
+            logger.warning("Using in-memory cache as fallback until Redis is reachable")
+            self.connection_stats["last_error"] = str(e)
+            connected = False
+        if self._supervisor_task is None or self._supervisor_task.done():
+            self._supervisor_task = asyncio.create_task(self._supervise())
+        return connected
+
+    async def close(self) -> None:
+        """Release pooled connections (called on app shutdown)"""
+        self.redis_client = None
+        for task in (self._supervisor_task, self._invalidation_task):
+            if task:
+                task.cancel()
+        self._supervisor_task = None
+        self._invalidation_task = None
+        await self.pool.disconnect()
+
+    async def _probe(self) -> redis.Redis:
+        client = redis.Redis(connection_pool=self.pool)
+        await client.ping()
+        return client
+
+    async def _on_connected(self, client: redis.Redis) -> None:
+        # Other workers' invalidations were missed while we were away
+        self._l1.clear()
+        self.redis_client = client
+        self._set_connection_state("connected")
+        self.connection_stats["connects"] += 1
+        logger.info("Redis connection established successfully")
+        if REDIS_WARM_ON_RECOVERY:
+            await self._warm_from_fallback()
+        if self._invalidation_task is None or self._invalidation_task.done():
+            self._invalidation_task = asyncio.create_task(self._listen_for_invalidations())
+
+    def _on_disconnected(self, error: Exception) -> None:
+        self.redis_client = None
+        self._set_connection_state("disconnected")
+        self.connection_stats["disconnects"] += 1
+        self.connection_stats["last_error"] = str(error)
+        logger.warning(f"Redis unreachable ({error}), using in-memory fallback")
+
+    def _set_connection_state(self, state: str) -> None:
+        self.connection_stats["state"] = state
+        self.connection_stats["since"] = time.time()
+
+    async def _supervise(self) -> None:
+        """Health-check Redis while connected; reprobe with jittered exponential backoff while not"""
+        delay = REDIS_REPROBE_MIN_DELAY
+        failures = 0
+        while True:
+            try:
+                client = self.redis_client
+                if client is None:
+                    await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+                    try:
+                        await self._on_connected(await self._probe())
+                        delay = REDIS_REPROBE_MIN_DELAY
+                        failures = 0
+                    except Exception as e:
+                        self.connection_stats["probe_failures"] += 1
+                        self.connection_stats["last_error"] = str(e)
+                        delay = min(delay * 2, REDIS_REPROBE_MAX_DELAY)
+                    continue
+
+                await asyncio.sleep(REDIS_HEALTH_CHECK_INTERVAL)
+                try:
+                    await client.ping()
+                    failures = 0
+                except Exception as e:
+                    failures += 1
+                    self.connection_stats["health_check_failures"] += 1
+                    if failures >= REDIS_FAILURE_THRESHOLD and self.redis_client is client:
+                        self._on_disconnected(e)
+                        delay = REDIS_REPROBE_MIN_DELAY
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Redis supervisor error: {e}")
+                await asyncio.sleep(REDIS_REPROBE_MIN_DELAY)
+
+    async def _warm_from_fallback(self) -> None:
+        """Copy entries written to the in-memory fallback while Redis was down into Redis"""
+        entries = list(self._memory_cache.items())
+        if not entries:
+            return
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for key, value, ttl in entries:
+                    # NX: another worker may already have written something newer
+                    pipe.set(key, value, ex=max(int(ttl), 1), nx=True)
+                for tag, keys in self._memory_tags.items():
+                    pipe.sadd(self._tag_key(tag), *keys)
+                    pipe.expire(self._tag_key(tag), CACHE_TTL_ANALYSIS)
+                await pipe.execute()
+            self.connection_stats["warmed_entries"] += len(entries)
+            logger.info(f"Warmed {len(entries)} fallback cache entries into Redis")
+            self._memory_cache.clear()
+        except Exception as e:
+            logger.error(f"Error warming Redis from fallback cache: {e}")
+
+    def get_connection_stats(self) -> Dict[str, Any]:
+        return {
+            **self.connection_stats,
+            "state_for_seconds": round(time.time() - self.connection_stats["since"], 1),
+            "fallback_entries": len(self._memory_cache),
+        }
 
     def _generate_cache_key(self, prefix: str, data: str) -> str:
         """Generate a consistent cache key from data"""
         hash_obj = hashlib.md5(data.encode())
         return f"{prefix}:{hash_obj.hexdigest()}"
 
+    def _l1_ttl(self, key: str) -> int:
+        """L1 TTL for a key's prefix; 0 means the prefix is not cached in L1"""
+        return L1_CACHE_TTLS.get(key.split(":", 1)[0], 0)
+
+    async def _publish_invalidation(self, keys: List[str] = None, patterns: List[str] = None) -> None:
+        """Tell other workers to drop their L1 copies"""
+        if not self.redis_client:
+            return
+        message = json.dumps({"origin": self._worker_id, "keys": keys or [], "patterns": patterns or []})
+        try:
+            await self.redis_client.publish(CACHE_INVALIDATION_CHANNEL, message)
+            self.cache_stats["invalidations_sent"] += 1
+        except Exception as e:
+            logger.error(f"Error publishing cache invalidation: {e}")
+
+    async def _listen_for_invalidations(self) -> None:
+        """Apply L1 invalidations published by other workers"""
+        delay = 1
+        while self.redis_client:
+            pubsub = self.redis_client.pubsub()
+            try:
+                await pubsub.subscribe(CACHE_INVALIDATION_CHANNEL)
+                delay = 1
+                while self.redis_client:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if not message:
+                        continue
+                    payload = json.loads(message["data"])
+                    if payload.get("origin") == self._worker_id:
+                        continue
+                    self.cache_stats["invalidations_received"] += 1
+                    for key in payload.get("keys", []):
+                        self._l1.delete(key)
+                    for pattern in payload.get("patterns", []):
+                        self._l1.delete_matching(pattern)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Invalidations may have been missed while disconnected
+                logger.error(f"Cache invalidation listener error, clearing L1: {e}")
+                self._l1.clear()
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
     async def get_cached(self, key: str) -> Optional[Dict]:
         """Get cached data"""
         if not self.redis_client:
             # Use in-memory cache as fallback
-            return self._memory_cache.get(key)
+            return self._memory_get(key)
+        
+        l1_ttl = self._l1_ttl(key)
+        if l1_ttl:
+            raw = self._l1.get(key)
+            if raw is not None:
+                return self.codec.decode(raw)
         
         try:
-            cached_data = self.redis_client.get(key)
+            cached_data = await self.redis_client.get(key)
             if cached_data:
-                return json.loads(cached_data)
+                self.cache_stats["l2_hits"] += 1
+                self.cache_stats["bytes_read"] += len(cached_data)
+                if l1_ttl:
+                    self._l1.set(key, cached_data, l1_ttl)
+                return self.codec.decode(cached_data)
+            self.cache_stats["l2_misses"] += 1
         except Exception as e:
             logger.error(f"Error getting cached data: {e}")
             # Fallback to in-memory cache
-            return self._memory_cache.get(key)
+            return self._memory_get(key)
+        # Entries written while Redis was failing only exist in memory
+        if key in self._memory_cache:
+            return self._memory_get(key)
         return None
 
-    async def set_cached(self, key: str, data: Dict, ttl: int = CACHE_TTL_ANALYSIS) -> bool:
-        """Set cached data with TTL"""
+    def _memory_get(self, key: str) -> Optional[Dict]:
+        raw = self._memory_cache.get(key)
+        return self.codec.decode(raw) if raw is not None else None
+
+    def _memory_set(self, key: str, data: Dict, ttl: int, tags: Optional[List[str]] = None) -> bool:
+        # Tags are registered after the set: replacing an entry drops the old one's tags first
+        stored = self._memory_cache.set(key, self.codec.encode(data), ttl)
+        if stored:
+            self._register_memory_tags(key, tags)
+        return stored
+
+    async def set_cached(self, key: str, data: Dict, ttl: int = CACHE_TTL_ANALYSIS, tags: Optional[List[str]] = None) -> bool:
+        """Set cached data with TTL, registering the key under each tag for invalidate_tags()"""
         if not self.redis_client:
             # Use in-memory cache as fallback
-            self._memory_cache[key] = data
-            logger.info(f"Stored in memory cache: {key}")
-            return True
+            return self._memory_set(key, data, ttl, tags)
         
         try:
-            self.redis_client.setex(key, ttl, json.dumps(data, default=str))
-            # Also store in memory as backup
-            self._memory_cache[key] = data
+            payload = self.codec.encode(data)
+            self.cache_stats["bytes_written"] += len(payload)
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.setex(key, ttl, payload)
+                for tag in tags or []:
+                    # Tag sets outlive their members; stale members are harmless on delete
+                    pipe.sadd(self._tag_key(tag), key)
+                    pipe.expire(self._tag_key(tag), max(ttl, CACHE_TTL_ANALYSIS))
+                await pipe.execute()
+            # Drop any copy written while Redis was failing so it can't shadow this one
+            self._memory_cache.delete(key)
+            l1_ttl = self._l1_ttl(key)
+            if l1_ttl:
+                self._l1.set(key, payload, min(l1_ttl, ttl))
+                await self._publish_invalidation(keys=[key])
             return True
         except Exception as e:
             logger.error(f"Error setting cached data: {e}")
+            self._l1.delete(key)
             # Fallback to in-memory cache
-            self._memory_cache[key] = data
+            return self._memory_set(key, data, ttl, tags)
+
+    async def _acquire_lock(self, key: str, ttl: int) -> Optional[str]:
+        """SET NX lock; returns the token to release it with, or None if held elsewhere"""
+        token = uuid.uuid4().hex
+        if not self.redis_client:
+            return token  # single worker without Redis; _inflight already dedupes
+        try:
+            if await self.redis_client.set(f"lock:{key}", token, nx=True, ex=ttl):
+                return token
+            return None
+        except Exception as e:
+            logger.error(f"Error acquiring lock for {key}: {e}")
+            return token
+
+    async def _release_lock(self, key: str, token: str) -> None:
+        if not self.redis_client:
+            return
+        try:
+            lock_key = f"lock:{key}"
+            held = await self.redis_client.get(lock_key)
+            if held is not None and held.decode() == token:
+                await self.redis_client.delete(lock_key)
+        except Exception as e:
+            logger.error(f"Error releasing lock for {key}: {e}")
+
+    async def _compute_and_store(self, key: str, compute: Callable[[], Awaitable[Any]], soft_ttl: int,
+                                 ttl: int, tags: Optional[List[str]]) -> Any:
+        value = await compute()
+        envelope = {"value": value, "fresh_until": time.time() + soft_ttl}
+        await self.set_cached(key, envelope, ttl, tags=tags)
+        return value
+
+    async def _refresh(self, key: str, compute: Callable[[], Awaitable[Any]], soft_ttl: int,
+                       ttl: int, tags: Optional[List[str]]) -> None:
+        """Background recompute of a stale entry, at most one across all workers"""
+        token = await self._acquire_lock(key, CACHE_REFRESH_LOCK_TTL)
+        if token is None:
+            return
+        try:
+            await self._compute_and_store(key, compute, soft_ttl, ttl, tags)
+            self.swr_stats["refreshes"] += 1
+        except Exception as e:
+            # Keep serving the stale value until the hard TTL
+            self.swr_stats["refresh_failures"] += 1
+            logger.error(f"Background refresh of {key} failed: {e}")
+        finally:
+            await self._release_lock(key, token)
+
+    async def _compute_on_miss(self, key: str, compute: Callable[[], Awaitable[Any]], soft_ttl: int,
+                               ttl: int, tags: Optional[List[str]]) -> Any:
+        """
+        Recompute a missing entry, only ever under the lock. If another worker holds it, wait for
+        its result; if that worker fails (releases the lock, or dies and lets it expire) without
+        storing one, the waiters race for the lock again and one of them computes.
+        """
+        token = await self._acquire_lock(key, CACHE_REFRESH_LOCK_TTL)
+        waited = token is None
+        if waited:
+            self.swr_stats["waited_for_peer"] += 1
+            deadline = time.monotonic() + CACHE_MISS_WAIT
+            while token is None:
+                if time.monotonic() >= deadline:
+                    self.swr_stats["peer_wait_timeouts"] += 1
+                    raise TimeoutError(f"Timed out waiting for another worker to compute {key}")
+                await asyncio.sleep(CACHE_MISS_POLL_INTERVAL)
+                envelope = await self.get_cached(key)
+                if envelope is not None:
+                    return envelope["value"]
+                token = await self._acquire_lock(key, CACHE_REFRESH_LOCK_TTL)
+        try:
+            if waited:
+                # The previous holder may have stored a value between our read and our lock
+                envelope = await self.get_cached(key)
+                if envelope is not None:
+                    return envelope["value"]
+            return await self._compute_and_store(key, compute, soft_ttl, ttl, tags)
+        finally:
+            await self._release_lock(key, token)
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]], soft_ttl: int,
+                             ttl: int = CACHE_TTL_ANALYSIS, tags: Optional[List[str]] = None) -> Any:
+        """
+        Stale-while-revalidate read-through cache.
+
+        Fresh (younger than soft_ttl): returned as is. Stale (older than soft_ttl, still within
+        the Redis TTL): returned immediately while one background task, under a Redis lock, refreshes
+        it. Missing: computed once - concurrent callers in this worker share the result, and callers
+        in other workers wait for it (up to CACHE_MISS_WAIT, then TimeoutError) instead of
+        stampeding the backend.
+        `compute` should raise rather than return a value that must not be cached.
+        """
+        envelope = await self.get_cached(key)
+        if envelope is not None:
+            if envelope.get("fresh_until", 0) > time.time():
+                self.swr_stats["fresh_hits"] += 1
+            else:
+                self.swr_stats["stale_hits"] += 1
+                if key not in self._inflight:
+                    self._track_refresh(key, asyncio.create_task(self._refresh(key, compute, soft_ttl, ttl, tags)))
+            return envelope["value"]
+
+        self.swr_stats["misses"] += 1
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+        task = asyncio.create_task(self._compute_on_miss(key, compute, soft_ttl, ttl, tags))
+        self._track_refresh(key, task)
+        return await asyncio.shield(task)
+
+    def _track_refresh(self, key: str, task: asyncio.Task) -> None:
+        self._inflight[key] = task
+        self._refreshing.add(task)
+
+        def done(finished: asyncio.Task) -> None:
+            self._refreshing.discard(finished)
+            if self._inflight.get(key) is finished:
+                del self._inflight[key]
+            if not finished.cancelled():
+                finished.exception()  # mark retrieved; callers awaiting it get the error
+
+        task.add_done_callback(done)
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{CacheKeys.TAG}:{tag}"
+
+    def _register_memory_tags(self, key: str, tags: Optional[List[str]]) -> None:
+        for tag in tags or []:
+            self._memory_tags.setdefault(tag, set()).add(key)
+            self._memory_key_tags.setdefault(key, set()).add(tag)
+
+    def _forget_memory_tags(self, key: str) -> None:
+        """Fallback cache on_remove hook: keeps the tag index no larger than the cache itself"""
+        for tag in self._memory_key_tags.pop(key, ()):
+            keys = self._memory_tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._memory_tags[tag]
+
+    async def delete_cached(self, key: str) -> bool:
+        """Delete a single cached entry"""
+        self._memory_cache.delete(key)
+        self._l1.delete(key)
+        if not self.redis_client:
+            return True
+        
+        try:
+            await self.redis_client.delete(key)
+            if self._l1_ttl(key):
+                await self._publish_invalidation(keys=[key])
             return True
+        except Exception as e:
+            logger.error(f"Error deleting cached data: {e}")
+            return False
+
+    async def _delete_in_batches(self, keys: List[str]) -> int:
+        """UNLINK keys in pipelined batches and drop them from every worker's L1"""
+        deleted = 0
+        for i in range(0, len(keys), INVALIDATION_BATCH_SIZE):
+            batch = keys[i:i + INVALIDATION_BATCH_SIZE]
+            deleted += await self.redis_client.unlink(*batch)
+            for key in batch:
+                self._l1.delete(key)
+            await self._publish_invalidation(keys=[key for key in batch if self._l1_ttl(key)])
+        return deleted
 
     async def invalidate(self, pattern: str) -> int:
-        """Invalidate cache entries matching pattern"""
+        """Invalidate cache entries matching pattern (prefer invalidate_tags for hot paths)"""
+        removed = self._memory_cache.delete_matching(pattern)
+        self._l1.delete_matching(pattern)
         if not self.redis_client:
-            return 0
+            return removed
         
+        await self._publish_invalidation(patterns=[pattern])
         try:
-            keys = self.redis_client.keys(pattern)
-            if keys:
-                return self.redis_client.delete(*keys)
+            # Incremental SCAN instead of KEYS so Redis is never blocked on the whole keyspace
+            deleted = 0
+            batch: List[str] = []
+            async for key in self.redis_client.scan_iter(match=pattern, count=INVALIDATION_SCAN_COUNT):
+                batch.append(key)
+                if len(batch) >= INVALIDATION_BATCH_SIZE:
+                    deleted += await self.redis_client.unlink(*batch)
+                    batch = []
+            if batch:
+                deleted += await self.redis_client.unlink(*batch)
+            return deleted
         except Exception as e:
             logger.error(f"Error invalidating cache: {e}")
-        return 0
+        return removed
+
+    async def invalidate_tags(self, *tags: str) -> int:
+        """Delete every entry registered under any of the given tags"""
+        removed = 0
+        for tag in tags:
+            for key in self._memory_tags.pop(tag, set()):
+                removed += int(self._memory_cache.delete(key))
+                self._l1.delete(key)
+        if not self.redis_client:
+            return removed
+        
+        deleted = 0
+        for tag in tags:
+            tag_key = self._tag_key(tag)
+            try:
+                batch: List[str] = []
+                async for key in self.redis_client.sscan_iter(tag_key, count=INVALIDATION_SCAN_COUNT):
+                    batch.append(key.decode())
+                    if len(batch) >= INVALIDATION_BATCH_SIZE:
+                        deleted += await self._delete_in_batches(batch)
+                        batch = []
+                if batch:
+                    deleted += await self._delete_in_batches(batch)
+                await self.redis_client.unlink(tag_key)
+            except Exception as e:
+                logger.error(f"Error invalidating cache tag {tag}: {e}")
+        return deleted
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Hit rates per cache tier and the Redis round trips L1 saved"""
+        l1 = self._l1.stats()
+        l2_lookups = self.cache_stats["l2_hits"] + self.cache_stats["l2_misses"]
+        return {
+            "l1": l1,
+            "l2": {
+                **self.cache_stats,
+                "hit_rate": round(self.cache_stats["l2_hits"] / l2_lookups, 3) if l2_lookups else 0.0,
+            },
+            "redis_round_trips_saved": l1["hits"],
+            "codec": self.codec.describe(),
+            "fallback": self._memory_cache.stats(),
+            "stale_while_revalidate": dict(self.swr_stats),
+        }
 
-    async def check_rate_limit(self, user_id: str, limit_type: str = "user") -> tuple[bool, int]:
-        """Check if user has exceeded rate limit"""
+    async def add_to_set(self, key: str, members: List[str], ttl: Optional[int] = None) -> int:
+        """Add members to a set, optionally refreshing its TTL"""
+        if not members:
+            return 0
         if not self.redis_client:
-            return True, 0  # Allow if Redis is down
+            # Like SADD without EXPIRE, a write with no ttl keeps the set's remaining TTL
+            current = self._memory_sets.get(key) or ()
+            merged = tuple(sorted(set(current).union(members)))
+            self._memory_sets.set(key, merged, ttl or self._memory_sets.ttl(key) or QUESTION_BANK_TTL)
+            return len(merged) - len(current)
         
         try:
-            key = f"rate_limit:{limit_type}:{user_id}"
-            current_count = self.redis_client.get(key)
-            
-            if current_count is None:
-                return True, 0
-            
-            current_count = int(current_count)
-            
-            # Define limits based on type
-            limits = {
-                "user": 5,  # 5 per day per user
-                "global": 100  # 100 per hour globally
-            }
-            
-            limit = limits.get(limit_type, 5)
-            return current_count < limit, current_count
-            
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.sadd(key, *members)
+                if ttl:
+                    pipe.expire(key, ttl)
+                return (await pipe.execute())[0]
         except Exception as e:
-            logger.error(f"Error checking rate limit: {e}")
-            return True, 0
+            logger.error(f"Error adding to set: {e}")
+            return 0
 
-    async def increment_counter(self, user_id: str, limit_type: str = "user") -> int:
-        """Increment rate limit counter"""
+    async def sample_sets(self, keys: List[str], count: int) -> Dict[str, List[str]]:
+        """Fetch set sizes and up to `count` random members for many sets in one round trip"""
+        if not keys:
+            return {}
         if not self.redis_client:
-            return 0
+            members = {key: self._memory_sets.get(key) or () for key in keys}
+            return {key: random.sample(found, min(count, len(found))) for key, found in members.items()}
         
         try:
-            key = f"rate_limit:{limit_type}:{user_id}"
-            
-            # Set TTL based on limit type
-            ttl = 86400 if limit_type == "user" else 3600  # 24h for user, 1h for global
-            
-            current_count = self.redis_client.incr(key)
-            if current_count == 1:  # First increment, set TTL
-                self.redis_client.expire(key, ttl)
-            
-            return current_count
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.srandmember(key, count)
+                results = await pipe.execute()
+            return {key: [m.decode() for m in members or []] for key, members in zip(keys, results)}
+        except Exception as e:
+            logger.error(f"Error sampling sets: {e}")
+            return {key: [] for key in keys}
+
+    async def get_set_sizes(self, keys: List[str]) -> Dict[str, int]:
+        """Get the cardinality of many sets in one round trip"""
+        if not keys:
+            return {}
+        if not self.redis_client:
+            return {key: len(self._memory_sets.get(key) or ()) for key in keys}
+        
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.scard(key)
+                return dict(zip(keys, await pipe.execute()))
+        except Exception as e:
+            logger.error(f"Error getting set sizes: {e}")
+            return {key: 0 for key in keys}
+
+    # Durable hashes (no TTL), used for the write-behind outbox. Entries written to memory while
+    # Redis was down are still visible, and removable, after it comes back.
+
+    async def put_hash_entry(self, key: str, field: str, data: Dict, memory_fallback: bool = True) -> bool:
+        """
+        Store a hash entry in Redis, or in this worker's memory while Redis is unavailable.
+        With memory_fallback=False, returns False instead, for callers with a durable alternative.
+        """
+        if self.redis_client:
+            try:
+                await self.redis_client.hset(key, field, self.codec.encode(data))
+                return True
+            except Exception as e:
+                logger.error(f"Error writing hash entry: {e}")
+        if not memory_fallback:
+            return False
+        self._memory_hashes.setdefault(key, {})[field] = data
+        return True
+
+    async def get_hash_entry(self, key: str, field: str) -> Optional[Dict]:
+        if field in self._memory_hashes.get(key, {}):
+            return self._memory_hashes[key][field]
+        if not self.redis_client:
+            return None
+        try:
+            raw = await self.redis_client.hget(key, field)
+            return self.codec.decode(raw) if raw is not None else None
+        except Exception as e:
+            logger.error(f"Error reading hash entry: {e}")
+            return None
+
+    async def scan_hash_entries(self, key: str, count: int) -> Dict[str, Dict]:
+        """Up to `count` entries, memory-held ones first"""
+        entries = dict(list(self._memory_hashes.get(key, {}).items())[:count])
+        if not self.redis_client or len(entries) >= count:
+            return entries
+        try:
+            async for field, raw in self.redis_client.hscan_iter(key, count=count):
+                entries.setdefault(field.decode(), self.codec.decode(raw))
+                if len(entries) >= count:
+                    break
+        except Exception as e:
+            logger.error(f"Error scanning hash entries: {e}")
+        return entries
+
+    async def delete_hash_entries(self, key: str, *fields: str) -> None:
+        memory = self._memory_hashes.get(key, {})
+        for field in fields:
+            memory.pop(field, None)
+        if self.redis_client and fields:
+            try:
+                await self.redis_client.hdel(key, *fields)
+            except Exception as e:
+                logger.error(f"Error deleting hash entries: {e}")
+
+    async def get_hash_size(self, key: str) -> int:
+        size = len(self._memory_hashes.get(key, {}))
+        if self.redis_client:
+            try:
+                size += await self.redis_client.hlen(key)
+            except Exception as e:
+                logger.error(f"Error getting hash size: {e}")
+        return size
+
+    # Fleet-wide counters: one Redis hash shared by every worker (nothing is kept while Redis is down)
+
+    async def increment_counters(self, key: str, counts: Dict[str, int]) -> None:
+        if not self.redis_client or not counts:
+            return
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for name, amount in counts.items():
+                    pipe.hincrby(key, name, amount)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Error incrementing counters: {e}")
+
+    async def get_counters(self, key: str) -> Optional[Dict[str, int]]:
+        """All counters in the hash, or None if Redis is unavailable"""
+        if not self.redis_client:
+            return None
+        try:
+            return {name.decode(): int(value) for name, value in (await self.redis_client.hgetall(key)).items()}
+        except Exception as e:
+            logger.error(f"Error reading counters: {e}")
+            return None
+
+    async def consume_rate_limits(self, checks: List[Tuple[str, RateLimit]]) -> Tuple[bool, List[Dict[str, int]]]:
+        """
+        Atomically check and consume one request against every (key, limit) in a single
+        round trip. Nothing is consumed unless all limits allow the request.
+        Returns (allowed, [{"limit", "remaining", "reset"}] in the order given).
+        """
+        if not checks:
+            return True, []
+        if not self.redis_client:
+            # Keep enforcing limits per worker rather than letting everything through
+            return self._local_limits.consume(checks)
+        
+        try:
+            if self._rate_limit_script is None:
+                self._rate_limit_script = self.redis_client.register_script(SLIDING_WINDOW_LUA)
+            args = [int(time.time() * 1000), uuid.uuid4().hex]
+            for _, rl in checks:
+                args.extend([rl.limit, rl.window * 1000])
+            allowed, counts = await self._rate_limit_script(keys=[key for key, _ in checks], args=args)
             
+            return bool(allowed), [
+                {
+                    "limit": rl.limit,
+                    "remaining": max(rl.limit - int(count), 0),
+                    "reset": max(int(reset_ms) // 1000, 1)
+                }
+                for (_, rl), (count, reset_ms) in zip(checks, counts)
+            ]
         except Exception as e:
-            logger.error(f"Error incrementing counter: {e}")
-            return 0
+            logger.error(f"Error applying rate limits: {e}")
+            return self._local_limits.consume(checks)
+
+    async def lease_tokens(self, key: str, requested: int, limit: int, window: int) -> Optional[Tuple[int, int]]:
+        """
+        Lease up to `requested` tokens from a shared per-window budget of `limit`.
+        Returns (granted, budget_remaining), or None if Redis is unavailable.
+        """
+        if not self.redis_client:
+            return None
+        
+        try:
+            if self._lease_script is None:
+                self._lease_script = self.redis_client.register_script(TOKEN_LEASE_LUA)
+            granted, remaining = await self._lease_script(keys=[key], args=[requested, limit, window])
+            return int(granted), int(remaining)
+        except Exception as e:
+            logger.error(f"Error leasing rate limit tokens: {e}")
+            return None
 
     async def store_agent_results(self, user_id: str, results: Dict) -> bool:
         """Store intermediate agent results"""
         key = f"agent_results:{user_id}:{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        return await self.set_cached(key, results, CACHE_TTL_INTERVIEW)
+        return await self.set_cached(key, results, CACHE_TTL_INTERVIEW, tags=[cache_tag("user", user_id)])
 
     async def get_agent_results(self, user_id: str, timestamp: str) -> Optional[Dict]:
         """Get stored agent results"""
@@ -137,7 +819,10 @@ class RedisService:
     async def store_interview_context(self, interview_id: str, context: Dict) -> bool:
         """Store interview context for follow-up questions"""
         key = f"interview_context:{interview_id}"
-        return await self.set_cached(key, context, CACHE_TTL_INTERVIEW)
+        tags = [cache_tag("interview", interview_id)]
+        if context.get("user_id"):
+            tags.append(cache_tag("user", context["user_id"]))
+        return await self.set_cached(key, context, CACHE_TTL_INTERVIEW, tags=tags)
 
     async def get_interview_context(self, interview_id: str) -> Optional[Dict]:
         """Get interview context for follow-up questions"""
@@ -147,7 +832,10 @@ class RedisService:
     async def cache_analysis(self, analysis_id: str, data: Dict) -> bool:
         """Cache analysis results"""
         key = f"analysis:{analysis_id}"
-        return await self.set_cached(key, data, CACHE_TTL_ANALYSIS)
+        tags = [cache_tag("analysis", analysis_id), cache_tag("prompt", PROMPT_VERSION)]
+        if data.get("user_id"):
+            tags.append(cache_tag("user", data["user_id"]))
+        return await self.set_cached(key, data, CACHE_TTL_ANALYSIS, tags=tags)
 
 # Global Redis service instance
 redis_service = RedisService()
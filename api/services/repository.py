@@ -0,0 +1,203 @@
+import hashlib
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+# List views only need these; the heavy text/JSONB columns come from the detail fetch
+ANALYSIS_SUMMARY_COLUMNS = "id,created_at,status,match_score,job_title,company"
+INTERVIEW_SUMMARY_COLUMNS = "id,analysis_id,created_at,status,overall_score"
+
+# Large inputs live in text_blobs (migrations/0003_text_blobs.sql); analyses keep only the hash.
+# Rows written before 0003 still carry the text inline and no hash.
+ANALYSIS_TEXT_FIELDS = {"resume_text": "resume_hash", "job_description": "job_description_hash"}
+
+# SQLSTATEs for a row the database refuses on its own merits: a malformed or out-of-range value,
+# or a constraint violation. Anything else (auth, permissions, missing tables, timeouts,
+# rate limits) is an environment problem and is retried rather than dead-lettered.
+PERMANENT_SQLSTATES = frozenset({
+    "22001",  # string_data_right_truncation
+    "22003",  # numeric_value_out_of_range
+    "22004",  # null_value_not_allowed
+    "22007",  # invalid_datetime_format
+    "22008",  # datetime_field_overflow
+    "22021",  # character_not_in_repertoire
+    "22023",  # invalid_parameter_value
+    "22P02",  # invalid_text_representation
+    "22P05",  # untranslatable_character
+    "23502",  # not_null_violation
+    "23503",  # foreign_key_violation
+    "23505",  # unique_violation
+    "23514",  # check_violation
+    "23P01",  # exclusion_violation
+})
+
+
+def text_hash(text: str) -> str:
+    """Content address of a text blob (text_blobs.hash in 0003_text_blobs.sql)"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class Repository(ABC):
+    """
+    Persistence interface for the schema in migrations/. Implemented over PostgREST
+    (SupabaseService) and directly over asyncpg (PostgresService); DATABASE_BACKEND picks one.
+
+    Rows come back as JSON-shaped dicts either way: ids as strings, timestamps as ISO 8601
+    strings, JSONB as Python objects, embedded relations under the related table's name.
+    Reads and single writes log failures and return None/False/[]; insert_batch,
+    store_text_blobs and externalize_texts raise, so callers can retry (see is_permanent_error).
+    """
+
+    async def close(self) -> None:
+        """Release pooled connections (called on app shutdown)"""
+
+    @abstractmethod
+    def is_permanent_error(self, error: Exception) -> bool:
+        """
+        True if the database rejected the data itself (see PERMANENT_SQLSTATES), so retrying the
+        same write won't help; False for anything a retry may fix
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_user(self, firebase_uid: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def create_user(self, user_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def create_analysis(self, analysis_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def insert_batch(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        """Idempotent bulk insert of rows that carry their own ids (duplicates are skipped)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def store_text_blobs(self, texts: List[str]) -> int:
+        """Make sure every text exists in text_blobs without resending stored ones; returns blobs written"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_text_blobs(self, hashes: List[str]) -> Dict[str, str]:
+        """hash -> text for the given blob hashes (missing ones are left out)"""
+        raise NotImplementedError
+
+    async def externalize_texts(self, rows: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Store the rows' resume/job description text as blobs and swap it for their hashes.
+        Returns (rows ready for analyses, blobs written).
+        """
+        texts = [row[field] for row in rows for field in ANALYSIS_TEXT_FIELDS if row.get(field)]
+        written = await self.store_text_blobs(texts)
+        stored = []
+        for row in rows:
+            row = dict(row)
+            for field, hash_field in ANALYSIS_TEXT_FIELDS.items():
+                text = row.pop(field, None)
+                if text:
+                    row[hash_field] = text_hash(text)
+            stored.append(row)
+        return stored, written
+
+    async def attach_texts(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Fill resume_text/job_description from text_blobs, for callers that actually need them"""
+        wanted = {
+            field: analysis.get(hash_field)
+            for field, hash_field in ANALYSIS_TEXT_FIELDS.items()
+            if not analysis.get(field) and analysis.get(hash_field)
+        }
+        if wanted:
+            blobs = await self.get_text_blobs(list(wanted.values()))
+            for field, digest in wanted.items():
+                analysis[field] = blobs.get(digest)
+        return analysis
+
+    @abstractmethod
+    async def get_analysis(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_analysis_detail(self, analysis_id: str, firebase_uid: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Analysis with its interviews (newest first), and whether firebase_uid owns it"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_interview_detail(self, interview_id: str, firebase_uid: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Interview with its questions (in order), and whether firebase_uid owns it"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_interview_with_analysis(self, interview_id: str) -> Optional[Dict[str, Any]]:
+        """Interview with questions(content, order_index) and analyses(synthesis_result) embedded"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def create_with_children(self, parent_table: str, parent: Dict[str, Any], child_table: str,
+                                   fk_column: str, children: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Insert a parent row and its children atomically (insert_with_children in
+        migrations/0001_initial.sql). Returns {"id": parent_id, "child_ids": [...]}, or None if nothing was written.
+        """
+        raise NotImplementedError
+
+    async def create_interview_with_questions(self, interview_data: Dict[str, Any], questions: List[str]) -> Optional[Dict[str, Any]]:
+        """Interview plus its ordered questions, all or nothing"""
+        return await self.create_with_children(
+            "interviews", interview_data, "questions", "interview_id",
+            [{"content": question, "order_index": i} for i, question in enumerate(questions)]
+        )
+
+    @abstractmethod
+    async def create_interview(self, interview_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_interview(self, interview_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def update_interview(self, interview_id: str, updates: Dict[str, Any]) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def add_questions(self, questions: List[Dict[str, Any]]) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_interview_questions(self, interview_id: str) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def create_response(self, response_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def update_response(self, response_id: str, updates: Dict[str, Any]) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_interview_responses(self, interview_id: str) -> List[Dict[str, Any]]:
+        """Responses for an interview, oldest first, each with its question embedded"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_user_analyses(self, user_id: str, limit: int = 5, after: Optional[Tuple[str, str]] = None) -> List[Dict[str, Any]]:
+        """Summary rows, newest first; pass the last row's (created_at, id) as `after` for the next page"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_user_interviews(self, user_id: str, limit: int = 5, after: Optional[Tuple[str, str]] = None) -> List[Dict[str, Any]]:
+        """Summary rows, newest first; pass the last row's (created_at, id) as `after` for the next page"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_user_stats(self, user_id: str) -> Dict[str, Any]:
+        """Trigger-maintained aggregates (see user_stats in migrations/0001_initial.sql); zeros for a new user"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_analysis_interviews(self, analysis_id: str) -> List[Dict[str, Any]]:
+        raise NotImplementedError
@@ -1,146 +1,380 @@
 import os
 import json
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
-from supabase import create_client, Client
+import httpx
 import logging
 import uuid
+from config import SUPABASE_POOL_SIZE, SUPABASE_TIMEOUT, SUPABASE_CONNECT_TIMEOUT, DATABASE_BACKEND, DATABASE_URL
+from services.repository import (
+    Repository, ANALYSIS_SUMMARY_COLUMNS, INTERVIEW_SUMMARY_COLUMNS, PERMANENT_SQLSTATES, text_hash
+)
 
 logger = logging.getLogger(__name__)
 
-class SupabaseService:
+# Statuses PostgREST uses for a rejected row (bad value, constraint violation); 401/403 (auth),
+# 404 (missing table), 408/429 and 5xx are retried whatever the body says
+ROW_REJECTED_STATUSES = (400, 409, 422)
+# PostgREST's own code for a malformed request body (e.g. batch rows with different keys)
+PERMANENT_POSTGREST_CODES = frozenset({"PGRST102"})
+
+
+def _keyset_params(limit: int, after: Optional[Tuple[str, str]]) -> Dict[str, str]:
+    """Newest-first page on (created_at, id), starting after the (created_at, id) cursor"""
+    params = {"order": "created_at.desc,id.desc", "limit": str(limit)}
+    if after:
+        created_at, row_id = after
+        params["or"] = f'(created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{row_id}))'
+    return params
+
+class SupabaseService(Repository):
+    """Async PostgREST client for the Supabase tables, over one pooled HTTP client per worker"""
+
     def __init__(self):
         self.url: str = os.environ.get("SUPABASE_URL")
         self.key: str = os.environ.get("SUPABASE_KEY")
-        self.client: Optional[Client] = None
+        self.client: Optional[httpx.AsyncClient] = None
         
         if self.url and self.key:
             try:
-                self.client = create_client(self.url, self.key)
+                self.client = httpx.AsyncClient(
+                    base_url=f"{self.url.rstrip('/')}/rest/v1",
+                    headers={
+                        "apikey": self.key,
+                        "Authorization": f"Bearer {self.key}",
+                        "Content-Type": "application/json"
+                    },
+                    # Applied to every call: no database request can stall a handler indefinitely
+                    timeout=httpx.Timeout(SUPABASE_TIMEOUT, connect=SUPABASE_CONNECT_TIMEOUT),
+                    limits=httpx.Limits(max_connections=SUPABASE_POOL_SIZE, max_keepalive_connections=SUPABASE_POOL_SIZE)
+                )
                 logger.info("Supabase client initialized")
             except Exception as e:
                 logger.error(f"Failed to initialize Supabase client: {e}")
         else:
             logger.warning("Supabase credentials not found. Database features will be disabled.")
 
-    def get_user(self, firebase_uid: str) -> Optional[Dict[str, Any]]:
+    async def close(self) -> None:
+        """Release pooled connections (called on app shutdown)"""
+        if self.client:
+            await self.client.aclose()
+
+    def is_permanent_error(self, error: Exception) -> bool:
+        """A row-level rejection: 400/409/422 carrying one of the SQLSTATEs in PERMANENT_SQLSTATES"""
+        if not isinstance(error, httpx.HTTPStatusError) or error.response.status_code not in ROW_REJECTED_STATUSES:
+            return False
+        try:
+            body = error.response.json()
+        except ValueError:
+            return False
+        code = body.get("code") if isinstance(body, dict) else None
+        return code in PERMANENT_SQLSTATES or code in PERMANENT_POSTGREST_CODES
+
+    async def _select(self, table: str, params: Dict[str, str]) -> List[Dict[str, Any]]:
+        response = await self.client.get(f"/{table}", params=params)
+        response.raise_for_status()
+        return response.json()
+
+    async def _insert(self, table: str, rows: Any) -> List[Dict[str, Any]]:
+        response = await self.client.post(f"/{table}", json=rows, headers={"Prefer": "return=representation"})
+        response.raise_for_status()
+        return response.json()
+
+    async def _rpc(self, function: str, args: Dict[str, Any]) -> Any:
+        response = await self.client.post(f"/rpc/{function}", json=args)
+        response.raise_for_status()
+        return response.json()
+
+    async def _update(self, table: str, params: Dict[str, str], updates: Dict[str, Any]) -> None:
+        response = await self.client.patch(f"/{table}", params=params, json=updates, headers={"Prefer": "return=minimal"})
+        response.raise_for_status()
+
+    async def get_user(self, firebase_uid: str) -> Optional[Dict[str, Any]]:
         if not self.client: return None
         try:
-            response = self.client.table("users").select("*").eq("firebase_uid", firebase_uid).execute()
-            if response.data:
-                return response.data[0]
+            data = await self._select("users", {"select": "*", "firebase_uid": f"eq.{firebase_uid}", "limit": "1"})
+            if data:
+                return data[0]
             return None
         except Exception as e:
             logger.error(f"Error fetching user: {e}")
             return None
 
-    def create_user(self, user_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    async def create_user(self, user_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         if not self.client: return None
         try:
-            response = self.client.table("users").insert(user_data).execute()
-            if response.data:
-                return response.data[0]
+            data = await self._insert("users", user_data)
+            if data:
+                return data[0]
             return None
         except Exception as e:
             logger.error(f"Error creating user: {e}")
             return None
 
-    def create_analysis(self, analysis_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    async def create_analysis(self, analysis_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         if not self.client: return None
         try:
-            response = self.client.table("analyses").insert(analysis_data).execute()
-            if response.data:
-                return response.data[0]
+            [row], _ = await self.externalize_texts([analysis_data])
+            data = await self._insert("analyses", row)
+            if data:
+                return data[0]
             return None
         except Exception as e:
             logger.error(f"Error creating analysis: {e}")
             return None
 
-    def get_analysis(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+    async def insert_batch(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        """
+        Idempotent bulk insert (rows carry their own ids; duplicates are skipped). Unlike the
+        other methods this raises httpx errors, so callers can tell retryable failures apart.
+        """
+        if not self.client:
+            raise RuntimeError("Supabase client not configured")
+        response = await self.client.post(
+            f"/{table}", json=rows, params={"on_conflict": "id"},
+            headers={"Prefer": "resolution=ignore-duplicates,return=minimal"}
+        )
+        response.raise_for_status()
+
+    async def store_text_blobs(self, texts: List[str]) -> int:
+        """Asks which hashes are stored, then sends only the missing text"""
+        if not self.client:
+            raise RuntimeError("Supabase client not configured")
+        blobs = {text_hash(text): text for text in texts if text}
+        if not blobs:
+            return 0
+        existing = await self._select("text_blobs", {"select": "hash", "hash": f"in.({','.join(blobs)})"})
+        stored = {row["hash"] for row in existing}
+        missing = [
+            {"hash": digest, "content": text, "size": len(text)}
+            for digest, text in blobs.items() if digest not in stored
+        ]
+        if missing:
+            # A concurrent writer may have stored the same blob since the check; identical content, so skip it
+            response = await self.client.post(
+                "/text_blobs", json=missing, params={"on_conflict": "hash"},
+                headers={"Prefer": "resolution=ignore-duplicates,return=minimal"}
+            )
+            response.raise_for_status()
+        return len(missing)
+
+    async def get_text_blobs(self, hashes: List[str]) -> Dict[str, str]:
+        hashes = [digest for digest in set(hashes) if digest]
+        if not self.client or not hashes: return {}
+        try:
+            data = await self._select("text_blobs", {"select": "hash,content", "hash": f"in.({','.join(hashes)})"})
+            return {row["hash"]: row["content"] for row in data}
+        except Exception as e:
+            logger.error(f"Error fetching text blobs: {e}")
+            return {}
+
+    async def get_analysis(self, analysis_id: str) -> Optional[Dict[str, Any]]:
         if not self.client: return None
         try:
-            response = self.client.table("analyses").select("*").eq("id", analysis_id).execute()
-            if response.data:
-                return response.data[0]
+            data = await self._select("analyses", {"select": "*", "id": f"eq.{analysis_id}"})
+            if data:
+                return data[0]
             return None
         except Exception as e:
             logger.error(f"Error fetching analysis: {e}")
             return None
 
-    def create_interview(self, interview_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    async def _get_owned(self, table: str, row_id: str, children: str, child_order: str, firebase_uid: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """
+        One round trip: the row, its embedded children and its owner's firebase_uid.
+        Returns (row without the owner embed, owned by firebase_uid).
+        """
+        data = await self._select(table, {
+            "select": f"*,{children}(*),users(firebase_uid)",
+            "id": f"eq.{row_id}",
+            f"{children}.order": child_order
+        })
+        if not data:
+            return None, False
+        row = data[0]
+        owner = row.pop("users", None) or {}
+        return row, owner.get("firebase_uid") == firebase_uid
+
+    async def get_analysis_detail(self, analysis_id: str, firebase_uid: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Analysis with its interviews (newest first) and an ownership check, in one query"""
+        if not self.client: return None, False
+        try:
+            return await self._get_owned("analyses", analysis_id, "interviews", "created_at.desc", firebase_uid)
+        except Exception as e:
+            logger.error(f"Error fetching analysis detail: {e}")
+            return None, False
+
+    async def get_interview_detail(self, interview_id: str, firebase_uid: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Interview with its questions and an ownership check, in one query"""
+        if not self.client: return None, False
+        try:
+            return await self._get_owned("interviews", interview_id, "questions", "order_index", firebase_uid)
+        except Exception as e:
+            logger.error(f"Error fetching interview detail: {e}")
+            return None, False
+
+    async def get_interview_with_analysis(self, interview_id: str) -> Optional[Dict[str, Any]]:
+        """Interview with its questions (in order) and its analysis's synthesis_result, in one query"""
+        if not self.client: return None
+        try:
+            data = await self._select("interviews", {
+                "select": "*,questions(content,order_index),analyses(synthesis_result)",
+                "id": f"eq.{interview_id}",
+                "questions.order": "order_index"
+            })
+            if data:
+                return data[0]
+            return None
+        except Exception as e:
+            logger.error(f"Error fetching interview with analysis: {e}")
+            return None
+
+    async def create_with_children(self, parent_table: str, parent: Dict[str, Any], child_table: str,
+                                   fk_column: str, children: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """One round trip: the insert_with_children RPC"""
+        if not self.client: return None
+        try:
+            return await self._rpc("insert_with_children", {
+                "parent_table": parent_table,
+                "parent": parent,
+                "child_table": child_table,
+                "fk_column": fk_column,
+                "children": children
+            })
+        except Exception as e:
+            logger.error(f"Error inserting {parent_table} with {child_table}: {e}")
+            return None
+
+    async def create_interview(self, interview_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         if not self.client: return None
         try:
-            response = self.client.table("interviews").insert(interview_data).execute()
-            if response.data:
-                return response.data[0]
+            data = await self._insert("interviews", interview_data)
+            if data:
+                return data[0]
             return None
         except Exception as e:
             logger.error(f"Error creating interview: {e}")
             return None
 
-    def get_interview(self, interview_id: str) -> Optional[Dict[str, Any]]:
+    async def get_interview(self, interview_id: str) -> Optional[Dict[str, Any]]:
         if not self.client: return None
         try:
-            response = self.client.table("interviews").select("*").eq("id", interview_id).execute()
-            if response.data:
-                return response.data[0]
+            data = await self._select("interviews", {"select": "*", "id": f"eq.{interview_id}"})
+            if data:
+                return data[0]
             return None
         except Exception as e:
             logger.error(f"Error fetching interview: {e}")
             return None
 
-    def update_interview(self, interview_id: str, updates: Dict[str, Any]) -> bool:
+    async def update_interview(self, interview_id: str, updates: Dict[str, Any]) -> bool:
         if not self.client: return False
         try:
-            self.client.table("interviews").update(updates).eq("id", interview_id).execute()
+            await self._update("interviews", {"id": f"eq.{interview_id}"}, updates)
             return True
         except Exception as e:
             logger.error(f"Error updating interview: {e}")
             return False
             
-    def add_questions(self, questions: List[Dict[str, Any]]) -> bool:
+    async def add_questions(self, questions: List[Dict[str, Any]]) -> bool:
         if not self.client: return False
         try:
-            self.client.table("questions").insert(questions).execute()
+            await self._insert("questions", questions)
             return True
         except Exception as e:
             logger.error(f"Error adding questions: {e}")
             return False
             
-    def get_interview_questions(self, interview_id: str) -> List[Dict[str, Any]]:
+    async def get_interview_questions(self, interview_id: str) -> List[Dict[str, Any]]:
         if not self.client: return []
         try:
-            response = self.client.table("questions").select("*").eq("interview_id", interview_id).order("order_index").execute()
-            return response.data or []
+            return await self._select("questions", {"select": "*", "interview_id": f"eq.{interview_id}", "order": "order_index"})
         except Exception as e:
             logger.error(f"Error fetching questions: {e}")
             return []
 
-    def get_user_analyses(self, user_id: str, limit: int = 5) -> List[Dict[str, Any]]:
+    async def create_response(self, response_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if not self.client: return None
+        try:
+            data = await self._insert("responses", response_data)
+            if data:
+                return data[0]
+            return None
+        except Exception as e:
+            logger.error(f"Error creating response: {e}")
+            return None
+
+    async def update_response(self, response_id: str, updates: Dict[str, Any]) -> bool:
+        if not self.client: return False
+        try:
+            await self._update("responses", {"id": f"eq.{response_id}"}, updates)
+            return True
+        except Exception as e:
+            logger.error(f"Error updating response: {e}")
+            return False
+
+    async def get_interview_responses(self, interview_id: str) -> List[Dict[str, Any]]:
+        """Responses for an interview, each with its question embedded"""
+        if not self.client: return []
+        try:
+            return await self._select("responses", {
+                "select": "*,questions!inner(interview_id,content,order_index)",
+                "questions.interview_id": f"eq.{interview_id}",
+                "order": "created_at"
+            })
+        except Exception as e:
+            logger.error(f"Error fetching interview responses: {e}")
+            return []
+
+    async def get_user_analyses(self, user_id: str, limit: int = 5, after: Optional[Tuple[str, str]] = None) -> List[Dict[str, Any]]:
+        """Summary rows, newest first; pass the last row's (created_at, id) as `after` for the next page"""
         if not self.client: return []
         try:
-            response = self.client.table("analyses").select("*").eq("user_id", user_id).order("created_at", desc=True).limit(limit).execute()
-            return response.data or []
+            return await self._select("analyses", {
+                "select": ANALYSIS_SUMMARY_COLUMNS, "user_id": f"eq.{user_id}", **_keyset_params(limit, after)
+            })
         except Exception as e:
             logger.error(f"Error fetching user analyses: {e}")
             return []
 
-    def get_user_interviews(self, user_id: str, limit: int = 5) -> List[Dict[str, Any]]:
+    async def get_user_interviews(self, user_id: str, limit: int = 5, after: Optional[Tuple[str, str]] = None) -> List[Dict[str, Any]]:
+        """Summary rows, newest first; pass the last row's (created_at, id) as `after` for the next page"""
         if not self.client: return []
         try:
-            response = self.client.table("interviews").select("*").eq("user_id", user_id).order("created_at", desc=True).limit(limit).execute()
-            return response.data or []
+            return await self._select("interviews", {
+                "select": INTERVIEW_SUMMARY_COLUMNS, "user_id": f"eq.{user_id}", **_keyset_params(limit, after)
+            })
         except Exception as e:
             logger.error(f"Error fetching user interviews: {e}")
             return []
 
-    def get_analysis_interviews(self, analysis_id: str) -> List[Dict[str, Any]]:
+    async def get_user_stats(self, user_id: str) -> Dict[str, Any]:
+        """Trigger-maintained aggregates (see user_stats in migrations/0001_initial.sql); zeros for a new user"""
+        stats = {"analysis_count": 0, "interview_count": 0, "score_sum": 0, "score_count": 0, "last_activity_at": None}
+        if not self.client: return stats
+        try:
+            data = await self._select("user_stats", {"select": "*", "user_id": f"eq.{user_id}"})
+            if data:
+                stats.update(data[0])
+        except Exception as e:
+            logger.error(f"Error fetching user stats: {e}")
+        return stats
+
+    async def get_analysis_interviews(self, analysis_id: str) -> List[Dict[str, Any]]:
         if not self.client: return []
         try:
-            response = self.client.table("interviews").select("*").eq("analysis_id", analysis_id).order("created_at", desc=True).execute()
-            return response.data or []
+            return await self._select("interviews", {"select": "*", "analysis_id": f"eq.{analysis_id}", "order": "created_at.desc"})
         except Exception as e:
             logger.error(f"Error fetching analysis interviews: {e}")
             return []
 
-supabase_service = SupabaseService()
+def create_repository() -> Repository:
+    """The persistence backend selected by DATABASE_BACKEND"""
+    if DATABASE_BACKEND == "postgres":
+        from services.postgres_service import PostgresService  # asyncpg is only needed for this backend
+        return PostgresService(DATABASE_URL)
+    return SupabaseService()
+
+
+# Keeps its original name; callers only rely on the Repository interface
+supabase_service = create_repository()
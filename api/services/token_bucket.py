@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, NamedTuple, Optional
+from services.redis_service import redis_service
+from utils.rate_limits import RateLimit
+from config import (
+    RATE_LIMIT_LEASE_FRACTION, RATE_LIMIT_LEASE_TIMEOUT, RATE_LIMIT_RECONCILE_INTERVAL, RATE_LIMIT_WORKERS
+)
+
+logger = logging.getLogger(__name__)
+
+TOKEN_LEASED = "leased"
+TOKEN_FALLBACK = "fallback"
+
+
+class BucketToken(NamedTuple):
+    kind: str  # TOKEN_LEASED or TOKEN_FALLBACK
+    window: int  # refunds are only honoured within the window the token was taken from
+
+
+class GlobalTokenBucket:
+    """
+    Per-worker share of a global fixed-window limit. Tokens are leased from a Redis budget
+    in batches, so most requests are admitted without any I/O; the bucket is topped up in the
+    background. Tokens leased but unspent when the window rolls over are dropped, so the global
+    limit is never exceeded (at worst under-used by one lease per worker).
+
+    While Redis is down (or a lease takes longer than RATE_LIMIT_LEASE_TIMEOUT) each worker
+    falls back to its own share, limit / RATE_LIMIT_WORKERS per window, counted locally. The
+    fleet stays within the limit only if RATE_LIMIT_WORKERS is at least the number of worker
+    processes across all instances; the share is on top of whatever was leased earlier in the
+    window.
+    """
+
+    def __init__(self, rate_limit: RateLimit, key: str):
+        self.rate_limit = rate_limit
+        self.key = key
+        self.lease_size = max(1, rate_limit.limit // max(RATE_LIMIT_LEASE_FRACTION, 1))
+        self.local_limit = max(1, rate_limit.limit // max(RATE_LIMIT_WORKERS, 1))
+        self._window: Optional[int] = None
+        self._tokens = 0
+        self._budget_remaining = rate_limit.limit
+        self._exhausted = False
+        self._fallback_used = 0
+        self._lease_lock: Optional[asyncio.Lock] = None
+        self._refill: Optional[asyncio.Task] = None
+        self._reconciler: Optional[asyncio.Task] = None
+        self.stats = {
+            "admitted_local": 0,   # served from leased tokens, no I/O
+            "admitted_fallback": 0,  # Redis unavailable, local share used
+            "rejected": 0,
+            "leases": 0,
+            "lease_timeouts": 0,   # lease too slow, request served from the fallback share
+            "tokens_leased": 0,
+            "tokens_dropped": 0,   # unspent at window rollover
+        }
+
+    def _current_window(self) -> int:
+        return int(time.time()) // self.rate_limit.window
+
+    def reset_in(self) -> int:
+        return self.rate_limit.window - int(time.time()) % self.rate_limit.window
+
+    def remaining(self) -> int:
+        return self._tokens + self._budget_remaining
+
+    def _roll(self) -> None:
+        window = self._current_window()
+        if window != self._window:
+            self.stats["tokens_dropped"] += self._tokens
+            self._window = window
+            self._tokens = 0
+            self._budget_remaining = self.rate_limit.limit
+            self._exhausted = False
+            self._fallback_used = 0
+
+    async def _lease(self) -> Optional[int]:
+        """Lease one batch for the current window; None if Redis is unavailable"""
+        window = self._window
+        result = await redis_service.lease_tokens(
+            f"{self.key}:{window}", self.lease_size, self.rate_limit.limit, self.rate_limit.window
+        )
+        if result is None:
+            return None
+        granted, budget_remaining = result
+        if window != self._window:
+            return 0  # window rolled over while the lease was in flight
+        self._tokens += granted
+        self._budget_remaining = budget_remaining
+        self._exhausted = budget_remaining == 0 and granted < self.lease_size
+        self.stats["leases"] += 1
+        self.stats["tokens_leased"] += granted
+        return granted
+
+    async def _lease_once(self) -> Optional[int]:
+        if self._lease_lock is None:
+            self._lease_lock = asyncio.Lock()
+        async with self._lease_lock:
+            if self._tokens > 0:
+                return self._tokens  # another request refilled while we waited
+            return await self._lease()
+
+    def _schedule_refill(self) -> asyncio.Task:
+        if self._refill is None or self._refill.done():
+            self._refill = asyncio.create_task(self._lease_once())
+        return self._refill
+
+    async def _wait_for_lease(self) -> Optional[int]:
+        """
+        Wait a bounded time for the shared in-flight lease. On timeout the lease keeps running
+        (its tokens land in the bucket) and this request is treated as if Redis were down.
+        """
+        try:
+            return await asyncio.wait_for(asyncio.shield(self._schedule_refill()), RATE_LIMIT_LEASE_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.stats["lease_timeouts"] += 1
+            return None
+        except Exception as e:
+            logger.error(f"Rate limit lease failed for {self.key}: {e}")
+            return None
+
+    def _ensure_reconciler(self) -> None:
+        if self._reconciler is None or self._reconciler.done():
+            self._reconciler = asyncio.create_task(self._reconcile())
+
+    async def _reconcile(self) -> None:
+        """Keep the bucket topped up and roll windows even when no requests arrive"""
+        while True:
+            await asyncio.sleep(RATE_LIMIT_RECONCILE_INTERVAL)
+            try:
+                self._roll()
+                if self._tokens <= self.lease_size // 2 and not self._exhausted:
+                    await self._lease_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Rate limit reconcile failed for {self.key}: {e}")
+
+    async def acquire(self) -> Optional[BucketToken]:
+        """
+        Take one token; only awaits Redis (for at most RATE_LIMIT_LEASE_TIMEOUT) when the local
+        bucket is empty. Returns the token to refund() with when admitted, None when rejected.
+        """
+        self._roll()
+        self._ensure_reconciler()
+
+        if self._tokens == 0 and not self._exhausted:
+            if await self._wait_for_lease() is None:
+                self._roll()
+                if self._tokens == 0 and self._fallback_used < self.local_limit:
+                    self._fallback_used += 1
+                    self.stats["admitted_fallback"] += 1
+                    return BucketToken(TOKEN_FALLBACK, self._window)
+
+        if self._tokens > 0:
+            self._tokens -= 1
+            self.stats["admitted_local"] += 1
+            if self._tokens <= self.lease_size // 2 and not self._exhausted:
+                self._schedule_refill()
+            return BucketToken(TOKEN_LEASED, self._window)
+
+        self.stats["rejected"] += 1
+        return None
+
+    def refund(self, token: BucketToken) -> None:
+        """Return a token taken for a request that was rejected by another limit"""
+        self._roll()
+        if token.window != self._window:
+            return  # taken from a window that has rolled over; crediting it would inflate this one
+        if token.kind == TOKEN_FALLBACK:
+            self._fallback_used = max(self._fallback_used - 1, 0)
+            self.stats["admitted_fallback"] -= 1
+        else:
+            self._tokens += 1
+            self.stats["admitted_local"] -= 1
+
+    async def close(self) -> None:
+        for task in (self._reconciler, self._refill):
+            if task and not task.done():
+                task.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.rate_limit.spec,
+            "lease_size": self.lease_size,
+            "local_limit": self.local_limit,
+            "fallback_used": self._fallback_used,
+            "tokens": self._tokens,
+            "budget_remaining": self._budget_remaining,
+            **self.stats,
+        }
@@ -0,0 +1,75 @@
+import logging
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+from services.redis_service import redis_service
+from services.supabase_service import supabase_service
+from utils.cache_keys import CacheKeys
+from config import CACHE_TTL_USER
+
+logger = logging.getLogger(__name__)
+
+# Users resolved during the current request, keyed by firebase_uid (see request_scope())
+_request_users: ContextVar[Optional[Dict[str, Dict[str, Any]]]] = ContextVar("request_users", default=None)
+
+
+def request_scope() -> None:
+    """Start a fresh per-request memo; called by the HTTP middleware in main.py"""
+    _request_users.set({})
+
+
+class UserResolver:
+    """
+    firebase_uid -> users row, checked in order: request memo, per-process L1 and Redis
+    (both via RedisService), then Supabase. Missing users are never cached, since they are
+    created right after first sign-in.
+    """
+
+    def __init__(self):
+        self.stats = {"request_hits": 0, "cache_hits": 0, "db_lookups": 0}
+
+    def _key(self, firebase_uid: str) -> str:
+        return f"{CacheKeys.USER}:{firebase_uid}"
+
+    def _memoize(self, user: Dict[str, Any]) -> None:
+        memo = _request_users.get()
+        if memo is not None:
+            memo[user["firebase_uid"]] = user
+
+    async def resolve(self, firebase_uid: str) -> Optional[Dict[str, Any]]:
+        memo = _request_users.get()
+        if memo is not None and firebase_uid in memo:
+            self.stats["request_hits"] += 1
+            return memo[firebase_uid]
+
+        user = await redis_service.get_cached(self._key(firebase_uid))
+        if user is not None:
+            self.stats["cache_hits"] += 1
+        else:
+            self.stats["db_lookups"] += 1
+            user = await supabase_service.get_user(firebase_uid)
+            if user is None:
+                return None
+            await redis_service.set_cached(self._key(firebase_uid), user, CACHE_TTL_USER)
+        self._memoize(user)
+        return user
+
+    async def create_user(self, user_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Create the row and cache it (write-through)"""
+        user = await supabase_service.create_user(user_data)
+        if user:
+            await redis_service.set_cached(self._key(user["firebase_uid"]), user, CACHE_TTL_USER)
+            self._memoize(user)
+        return user
+
+    async def invalidate(self, firebase_uid: str) -> None:
+        """Call after any write to a users row"""
+        memo = _request_users.get()
+        if memo is not None:
+            memo.pop(firebase_uid, None)
+        await redis_service.delete_cached(self._key(firebase_uid))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats)
+
+
+user_resolver = UserResolver()
@@ -1,11 +1,24 @@
 # Redis cache key patterns
 class CacheKeys:
     ANALYSIS = "analysis"
+    JOB_ANALYSIS = "job_analysis"
     AGENT_RESULTS = "agent_results"
     INTERVIEW_CONTEXT = "interview_context"
+    QUESTION_BANK = "question_bank"
+    INTERVIEW_PREFETCH = "interview_prefetch"
+    INTERVIEW_PREFETCH_STATS = "stats:interview_prefetch"
+    ANSWER_SCORE = "answer_score"
+    TAG = "tag"
+    ANALYSIS_OUTBOX = "outbox:analyses"
+    ANALYSIS_DEAD_LETTER = "outbox:analyses:dead"
+    USER = "user"  # L1 TTL for this prefix is set in L1_CACHE_TTLS
     RATE_LIMIT_USER = "rate_limit:user"
     RATE_LIMIT_GLOBAL = "rate_limit:global"
 
+def cache_tag(kind: str, value: str) -> str:
+    """Invalidation tag name, e.g. user:<id> or prompt:<version>"""
+    return f"{kind}:{value}"
+
 # Response parsing utilities
 def parse_agent_output(output: str) -> dict:
     """Parse agent output string to dictionary"""
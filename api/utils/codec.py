@@ -0,0 +1,108 @@
+# Compact encoding for cached payloads
+#
+# Layout: MAGIC (3 bytes) | version | serializer id | compression id | body
+# Entries without the header are legacy `json.dumps` text and are still decoded.
+import json
+import zlib
+from typing import Any, Dict
+
+try:
+    import msgpack
+except ImportError:  # optional, falls back to orjson/json
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # optional, falls back to zlib
+    zstandard = None
+
+MAGIC = b"\xffPF"  # 0xff never starts UTF-8 JSON text
+VERSION = 1
+
+SERIALIZER_JSON = ord("j")
+SERIALIZER_ORJSON = ord("o")
+SERIALIZER_MSGPACK = ord("m")
+
+COMPRESSION_NONE = ord("n")
+COMPRESSION_ZLIB = ord("d")
+COMPRESSION_ZSTD = ord("z")
+
+
+def _serialize(data: Any, serializer: int) -> bytes:
+    if serializer == SERIALIZER_MSGPACK:
+        return msgpack.packb(data, default=str, use_bin_type=True)
+    if serializer == SERIALIZER_ORJSON:
+        return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, default=str, separators=(",", ":")).encode()
+
+
+def _deserialize(body: bytes, serializer: int) -> Any:
+    if serializer == SERIALIZER_MSGPACK:
+        if msgpack is None:
+            raise ValueError("Cached entry needs msgpack, which is not installed")
+        return msgpack.unpackb(body, raw=False, strict_map_key=False)
+    if serializer == SERIALIZER_ORJSON and orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+class PayloadCodec:
+    """Binary serializer plus zstd/zlib compression above a size threshold"""
+
+    def __init__(self, compression_threshold: int = 1024, zstd_level: int = 3, zlib_level: int = 6):
+        self.compression_threshold = compression_threshold
+        self.serializer = (
+            SERIALIZER_MSGPACK if msgpack is not None
+            else SERIALIZER_ORJSON if orjson is not None
+            else SERIALIZER_JSON
+        )
+        self.compression = COMPRESSION_ZSTD if zstandard is not None else COMPRESSION_ZLIB
+        self.zstd_level = zstd_level
+        self.zlib_level = zlib_level
+        self._zstd_compressor = zstandard.ZstdCompressor(level=zstd_level) if zstandard else None
+        self._zstd_decompressor = zstandard.ZstdDecompressor() if zstandard else None
+
+    def encode(self, data: Any) -> bytes:
+        body = _serialize(data, self.serializer)
+        compression = COMPRESSION_NONE
+        if len(body) >= self.compression_threshold:
+            if self.compression == COMPRESSION_ZSTD:
+                compressed = self._zstd_compressor.compress(body)
+            else:
+                compressed = zlib.compress(body, self.zlib_level)
+            if len(compressed) < len(body):
+                body, compression = compressed, self.compression
+        return MAGIC + bytes((VERSION, self.serializer, compression)) + body
+
+    def decode(self, raw: Any) -> Any:
+        if isinstance(raw, str):
+            raw = raw.encode()
+        if not raw.startswith(MAGIC):
+            # Legacy entry written as json.dumps(..., default=str)
+            return json.loads(raw)
+
+        version, serializer, compression = raw[3], raw[4], raw[5]
+        if version != VERSION:
+            raise ValueError(f"Unsupported cache payload version {version}")
+        body = raw[6:]
+        if compression == COMPRESSION_ZSTD:
+            if self._zstd_decompressor is None:
+                raise ValueError("Cached entry needs zstandard, which is not installed")
+            body = self._zstd_decompressor.decompress(body)
+        elif compression == COMPRESSION_ZLIB:
+            body = zlib.decompress(body)
+        return _deserialize(body, serializer)
+
+    def describe(self) -> Dict[str, Any]:
+        names = {SERIALIZER_MSGPACK: "msgpack", SERIALIZER_ORJSON: "orjson", SERIALIZER_JSON: "json",
+                 COMPRESSION_ZSTD: "zstd", COMPRESSION_ZLIB: "zlib"}
+        return {
+            "serializer": names[self.serializer],
+            "compression": names[self.compression],
+            "compression_threshold": self.compression_threshold,
+        }
@@ -0,0 +1,31 @@
+# Lightweight in-process latency tracking for /metrics
+from collections import deque
+from typing import Deque, Dict
+
+
+class LatencyRecorder:
+    """Keeps the most recent samples and reports count and percentiles in milliseconds"""
+
+    def __init__(self, max_samples: int = 2048):
+        self._samples: Deque[float] = deque(maxlen=max_samples)
+        self.count = 0
+
+    def record(self, value_ms: float) -> None:
+        self._samples.append(value_ms)
+        self.count += 1
+
+    def percentile(self, pct: float) -> float:
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+        return round(ordered[index], 1)
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": round(max(self._samples), 1) if self._samples else 0.0,
+        }
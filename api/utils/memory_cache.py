@@ -0,0 +1,128 @@
+# Bounded in-process cache used when Redis is unavailable
+import json
+import time
+import fnmatch
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+
+def estimate_size(key: str, value: Any) -> int:
+    """Approximate footprint of an entry, measured as its serialized size"""
+    if isinstance(value, (bytes, str)):
+        return len(key) + len(value)
+    try:
+        payload = json.dumps(value, default=str, separators=(",", ":"))
+    except (TypeError, ValueError):
+        payload = str(value)
+    return len(key) + len(payload.encode())
+
+
+class TTLLRUCache:
+    """
+    LRU cache bounded by total entry size in bytes, with per-entry TTLs.
+
+    Values are kept by reference and sized once on set, so store immutable ones
+    (RedisService stores encoded payloads) rather than objects a caller may mutate.
+    `on_remove(key)` runs whenever an entry leaves the cache (replaced, evicted, expired,
+    deleted or cleared), for callers that index keys elsewhere.
+    """
+
+    def __init__(self, max_bytes: int, on_remove: Optional[Callable[[str], None]] = None):
+        self.max_bytes = max_bytes
+        self.on_remove = on_remove
+        self._entries: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return self._live(key) is not None
+
+    def _live(self, key: str) -> Optional[Tuple[Any, float, int]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            return None
+        return entry
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[2]
+            if self.on_remove:
+                self.on_remove(key)
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._live(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def ttl(self, key: str) -> Optional[float]:
+        """Remaining TTL in seconds of a live entry, without touching its LRU position"""
+        entry = self._live(key)
+        return entry[1] - time.monotonic() if entry is not None else None
+
+    def set(self, key: str, value: Any, ttl: float) -> bool:
+        size = estimate_size(key, value)
+        self._remove(key)
+        if size > self.max_bytes or ttl <= 0:
+            return False
+
+        self._entries[key] = (value, time.monotonic() + ttl, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+        return True
+
+    def delete(self, key: str) -> bool:
+        existed = key in self._entries
+        self._remove(key)
+        return existed
+
+    def delete_matching(self, pattern: str) -> int:
+        """Delete entries whose key matches a Redis-style glob pattern"""
+        keys = [key for key in self._entries if fnmatch.fnmatchcase(key, pattern)]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def items(self) -> Iterator[Tuple[str, Any, float]]:
+        """Live entries as (key, value, remaining TTL in seconds), oldest first"""
+        now = time.monotonic()
+        for key, (value, expires_at, _) in list(self._entries.items()):
+            if expires_at > now:
+                yield key, value, expires_at - now
+
+    def clear(self) -> None:
+        keys = list(self._entries) if self.on_remove else []
+        self._entries.clear()
+        self.bytes = 0
+        for key in keys:
+            self.on_remove(key)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,26 @@
+# Opaque keyset cursors for lists ordered by (created_at DESC, id DESC)
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+
+def encode_cursor(row: Dict[str, Any]) -> str:
+    """Cursor pointing just after `row`"""
+    raw = json.dumps([row["created_at"], row["id"]], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[str, str]]:
+    """
+    (created_at, id) from a cursor, or None if it is malformed. Both parts are parsed and
+    re-serialized, since SupabaseService splices them into a PostgREST filter.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        created_at = datetime.fromisoformat(str(created_at).replace("Z", "+00:00"))
+        return created_at.isoformat(), str(uuid.UUID(str(row_id)))
+    except (ValueError, TypeError):
+        return None
@@ -0,0 +1,65 @@
+# Rate limit spec parsing ("5/day", "100/hour", "30/5minutes")
+import re
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, NamedTuple, Tuple
+
+WINDOW_SECONDS = {
+    "second": 1,
+    "minute": 60,
+    "hour": 3600,
+    "day": 86400,
+}
+
+SPEC_PATTERN = re.compile(r"^\s*(\d+)\s*/\s*(\d*)\s*(second|minute|hour|day)s?\s*$", re.IGNORECASE)
+
+
+class RateLimit(NamedTuple):
+    limit: int
+    window: int  # seconds
+    spec: str
+
+
+def parse_rate_limit(spec: str) -> RateLimit:
+    """Parse a "<count>/<period>" spec into a request count and window in seconds"""
+    match = SPEC_PATTERN.match(spec or "")
+    if not match:
+        raise ValueError(f"Invalid rate limit spec: {spec!r}")
+    count, multiplier, unit = match.groups()
+    return RateLimit(int(count), int(multiplier or 1) * WINDOW_SECONDS[unit.lower()], spec)
+
+
+class LocalSlidingWindow:
+    """In-process sliding-window limiter, used while Redis is unreachable"""
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._hits: "OrderedDict[str, Deque[float]]" = OrderedDict()
+
+    def _window(self, key: str, window: int, now: float) -> Deque[float]:
+        hits = self._hits.get(key)
+        if hits is None:
+            hits = self._hits[key] = deque()
+            while len(self._hits) > self.max_keys:
+                self._hits.popitem(last=False)
+        self._hits.move_to_end(key)
+        while hits and hits[0] <= now - window:
+            hits.popleft()
+        return hits
+
+    def consume(self, checks: List[Tuple[str, RateLimit]]) -> Tuple[bool, List[Dict[str, int]]]:
+        """Same contract as RedisService.consume_rate_limits: all limits or nothing"""
+        now = time.monotonic()
+        windows = [self._window(key, rl.window, now) for key, rl in checks]
+        allowed = all(len(hits) < rl.limit for hits, (_, rl) in zip(windows, checks))
+        if allowed:
+            for hits in windows:
+                hits.append(now)
+        return allowed, [
+            {
+                "limit": rl.limit,
+                "remaining": max(rl.limit - len(hits), 0),
+                "reset": max(int(hits[0] + rl.window - now), 1) if hits else rl.window
+            }
+            for hits, (_, rl) in zip(windows, checks)
+        ]
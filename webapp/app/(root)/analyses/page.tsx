@@ -36,6 +36,36 @@ export default function AnalysesPage() {
   const [isLoading, setIsLoading] = useState(true);
   const [searchQuery, setSearchQuery] = useState("");
   const [filter, setFilter] = useState("all"); // all, high_match, recent
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
+
+  const fetchPage = async (cursor: string | null) => {
+    const idToken = await auth.currentUser?.getIdToken();
+    const params = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+    const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000"}/analyses${params}`, {
+      headers: {
+        "Authorization": `Bearer ${idToken}`,
+      },
+    });
+
+    if (!response.ok) throw new Error("Failed to fetch analyses");
+
+    return response.json() as Promise<{ items: Analysis[]; next_cursor: string | null }>;
+  };
+
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setIsLoadingMore(true);
+    try {
+      const page = await fetchPage(nextCursor);
+      setAnalyses((current) => [...current, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (error) {
+      console.error("Error fetching analyses:", error);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
 
   useEffect(() => {
     const unsubscribe = onAuthStateChanged(auth, async (currentUser) => {
@@ -52,18 +82,10 @@ export default function AnalysesPage() {
       });
 
       try {
-        const idToken = await currentUser.getIdToken();
-        const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000"}/analyses`, {
-          headers: {
-            "Authorization": `Bearer ${idToken}`,
-          },
-        });
-
-        if (!response.ok) throw new Error("Failed to fetch analyses");
-
-        const data = await response.json();
-        setAnalyses(data);
-        setFilteredAnalyses(data);
+        const page = await fetchPage(null);
+        setAnalyses(page.items);
+        setFilteredAnalyses(page.items);
+        setNextCursor(page.next_cursor);
       } catch (error) {
         console.error("Error fetching analyses:", error);
       } finally {
@@ -244,6 +266,19 @@ export default function AnalysesPage() {
             )}
           </AnimatePresence>
         </div>
+
+        {nextCursor && (
+          <div className="mt-8 flex justify-center">
+            <button
+              onClick={loadMore}
+              disabled={isLoadingMore}
+              className="inline-flex items-center gap-2 px-6 py-3 rounded-xl border border-white/10 text-zinc-300 hover:bg-white/5 hover:text-white transition-colors disabled:opacity-50"
+            >
+              {isLoadingMore && <Loader2 className="w-4 h-4 animate-spin" />}
+              Load more
+            </button>
+          </div>
+        )}
       </main>
     </div>
   );
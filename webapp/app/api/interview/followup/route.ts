@@ -1,8 +1,17 @@
 import { NextRequest, NextResponse } from "next/server";
-import { db } from "@/lib/firebase/admin";
 
+// Non-streaming fallback. Live interviews should connect directly to the backend
+// WebSocket at `${NEXT_PUBLIC_API_URL}/ws/interview/{id}?token=...` to stream follow-ups.
 export async function POST(request: NextRequest) {
   try {
+    const authHeader = request.headers.get("Authorization");
+    if (!authHeader || !authHeader.startsWith("Bearer ")) {
+      return NextResponse.json(
+        { error: "Unauthorized: No token provided" },
+        { status: 401 }
+      );
+    }
+
     // Parse request body
     const { interview_id, conversation_history } = await request.json();
 
@@ -13,40 +22,28 @@ export async function POST(request: NextRequest) {
       );
     }
 
-    // Fetch interview from Firestore
-    const interviewRef = db.collection("interviews").doc(interview_id);
-    const interviewSnap = await interviewRef.get();
+    // Forward to FastAPI
+    const backendUrl = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
+    const response = await fetch(`${backendUrl}/interview/followup`, {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+        "Authorization": authHeader,
+      },
+      body: JSON.stringify({ interview_id, conversation_history }),
+    });
+
+    const data = await response.json();
 
-    if (!interviewSnap.exists) {
+    if (!response.ok) {
       return NextResponse.json(
-        { error: "Interview not found" },
-        { status: 404 }
+        { error: data.detail || "Failed to generate follow-up question" },
+        { status: response.status }
       );
     }
 
-    const interview = interviewSnap.data();
-
-    // TODO: Call Python backend for dynamic follow-up generation
-    // For now, we'll create a simple follow-up based on conversation
-    const lastMessage = conversation_history[conversation_history.length - 1];
-    const messageCount = conversation_history.length;
-
-    let followupQuestion = "";
-
-    if (messageCount <= 2) {
-      followupQuestion = "That's interesting! Can you tell me more about that experience?";
-    } else if (messageCount <= 4) {
-      followupQuestion = "How did you handle any challenges that came up during that project?";
-    } else if (messageCount <= 6) {
-      followupQuestion = "What would you do differently if you had to approach that problem again?";
-    } else if (messageCount <= 8) {
-      followupQuestion = "That's a great example! How does this experience relate to the role you're applying for?";
-    } else {
-      followupQuestion = "Thank you for sharing that with me. Do you have any questions about the role or our company?";
-    }
-
     return NextResponse.json({
-      followup_question: followupQuestion,
+      followup_question: data.followup_question,
     });
   } catch (error) {
     console.error("Error generating follow-up:", error);